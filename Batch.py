@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import os
+import time
+import contextlib
+from multiprocessing import Pool
+from typing import Iterable, Iterator
+
+from Sudoku import Sudoku
+from BitBoard import BitBoard
+from DLX import DancingLinks
+from PuzzleIO import parseLine,formatLine
+from Budget import SOLVED,UNSATISFIABLE
+
+METHODS=("CP","GA","SA","DLX")
+
+#status of a puzzle whose solver raised an exception
+ERROR="error"
+
+def _solveBitBoard(values:bytes,propagation:str="forward",seed:int=None,limit:int=None,timeout:float=None,max_nodes:int=None,
+                   restarts:str=None,restart_base:int=100)->tuple[bytes,bool,dict,str]:
+    """
+    Function that solves a puzzle directly on a 'BitBoard', without building 'Cell' objects.
+
+    Args:
+        values (bytes): the cell values.
+        propagation (str, optional): propagation level. Defaults to "forward".
+        seed (int, optional): random seed of the search order. Defaults to None.
+        limit (int, optional): count the solutions up to 'limit' (2 checks uniqueness), None to stop at the first one. Defaults to None.
+        timeout (float, optional): seconds before the search stops. Defaults to None.
+        max_nodes (int, optional): assigned nodes before the search stops. Defaults to None.
+        restarts (str, optional): restart policy of the seeded search (see BitBoard.solve), not used with 'limit'. Defaults to None.
+        restart_base (int, optional): backtracks of the first run of the restart policy. Defaults to 100.
+
+    Returns:
+        tuple[bytes,bool,dict,str]: solution values (the first one found, or the best board), 'True' if solved, solver counters and status (see Budget).
+    """
+    bitboard=BitBoard(values,propagation,seed)
+    if limit is None:
+        restored_nodes,assigned_nodes=bitboard.solve(None,timeout,max_nodes,restarts,restart_base)
+        counters={"restored_nodes":restored_nodes,"assigned_nodes":assigned_nodes}
+        if restarts is not None:
+            counters["restarts"]=bitboard.restarts
+    else:
+        n_solutions,_=bitboard.countSolutions(limit,timeout=timeout,max_nodes=max_nodes)
+        counters={"restored_nodes":bitboard.restored_nodes,"assigned_nodes":bitboard.assigned_nodes,"solutions":n_solutions}
+    counters.update(bitboard.counters)
+    return bytes(bitboard.value),bitboard.isSolved(),counters,bitboard.status
+
+def _solveDLX(values:bytes)->tuple[bytes,bool,dict,str]:
+    """
+    Function that solves a puzzle directly on a 'DancingLinks' matrix, without building 'Cell' objects.
+
+    Args:
+        values (bytes): the cell values.
+
+    Returns:
+        tuple[bytes,bool,dict,str]: solution values, 'True' if solved, solver counters and status (see Budget).
+    """
+    dlx=DancingLinks(values)
+    restored_nodes,assigned_nodes=dlx.solve()
+    counters={"restored_nodes":restored_nodes,"assigned_nodes":assigned_nodes}
+    counters.update(dlx.counters)
+    solved=dlx.isSolved()
+    return bytes(dlx.value),solved,counters,SOLVED if solved else UNSATISFIABLE
+
+def solveOne(index:int,puzzle:str|bytes,method:str="CP",options:dict=None)->dict:
+    """
+    Function that solves a single puzzle and measures it. The solver output is discarded.
+    CP with the "bitmask" backend and DLX run directly on the cell values.
+    An exception of the solver does not propagate: the puzzle gets the ERROR status, so that one bad puzzle does not stop a batch.
+
+    Args:
+        index (int): position of the puzzle in the input.
+        puzzle (str|bytes): puzzle line (see PuzzleIO) or the cell values.
+        method (str, optional): "CP", "GA", "SA" or "DLX". Defaults to "CP".
+        options (dict, optional): keyword arguments of the solver. Defaults to None.
+
+    Returns:
+        dict: index, puzzle and solution lines, 'solved' (every unit holds all the digits), status, wall time, cpu time and solver
+            counters. With the ERROR status the solution is the puzzle itself (None if it cannot be parsed) and 'error' holds the exception.
+    """
+    options=options or {}
+
+    values=None
+    start_time=time.perf_counter()
+    start_cpu=time.process_time()
+    try:
+        values=parseLine(puzzle) if isinstance(puzzle,str) else bytes(puzzle)
+        return _solve(index,values,method,options)
+    except Exception as e:
+        line=formatLine(values) if values is not None else str(puzzle)
+        return {"index":index,"puzzle":line,"solution":line if values is not None else None,"solved":False,"status":ERROR,
+                "time":time.perf_counter()-start_time,"cpu_time":time.process_time()-start_cpu,"counters":{},
+                "error":type(e).__name__+": "+str(e)}
+
+def _solve(index:int,values:bytes,method:str,options:dict)->dict:
+    """
+    Function that solves a single puzzle and measures it, see 'solveOne'.
+    """
+    if method=="DLX" or (method=="CP" and options.get("backend")=="bitmask"):
+        start_time=time.perf_counter()
+        start_cpu=time.process_time()
+
+        if method=="DLX":
+            solution,solved,counters,status=_solveDLX(values)
+        else:
+            solution,solved,counters,status=_solveBitBoard(values,options.get("propagation","forward"),options.get("seed"),options.get("limit"),
+                                                           options.get("timeout"),options.get("max_nodes"),
+                                                           options.get("restarts"),options.get("restart_base",100))
+
+        execution_time=time.perf_counter()-start_time
+        cpu_time=time.process_time()-start_cpu
+
+        return {"index":index,"puzzle":formatLine(values),"solution":formatLine(solution),"solved":solved,"status":status,
+                "time":execution_time,"cpu_time":cpu_time,"counters":counters}
+
+    sudoku=Sudoku.fromValues(values)
+
+    with open(os.devnull,"w") as devnull, contextlib.redirect_stdout(devnull):
+
+        start_time=time.perf_counter()
+        start_cpu=time.process_time()
+
+        if method=="CP":
+            restored_nodes,assigned_nodes=sudoku.sudokuSolverCP(**options)
+            counters={"restored_nodes":restored_nodes,"assigned_nodes":assigned_nodes}
+            counters.update(getattr(sudoku,"propagation_counts",{}))
+        elif method=="GA":
+            restarts,generations=sudoku.sudokuSolverGA(**options)
+            counters={"restarts":restarts,"generations":generations}
+        elif method=="SA":
+            restarts,iterations=sudoku.sudokuSolverSA(**options)
+            counters={"restarts":restarts,"iterations":iterations}
+        else:
+            raise ValueError("Expected a method in "+str(METHODS)+", found "+str(method))
+
+        execution_time=time.perf_counter()-start_time
+        cpu_time=time.process_time()-start_cpu
+
+        solved=sudoku.checkSudoku()
+
+    status=sudoku.solver_status["status"]
+
+    return {"index":index,"puzzle":formatLine(values),"solution":sudoku.toLine(),"solved":solved,"status":status,
+            "time":execution_time,"cpu_time":cpu_time,"counters":counters}
+
+def _solveTask(task:tuple)->dict:
+    """
+    Pool entry point: unpacks a (index, puzzle, method, options) task for 'solveOne'.
+    """
+    return solveOne(*task)
+
+def solveMany(puzzles:Iterable[str|bytes], method:str="CP", workers:int=None, chunksize:int=64, ordered:bool=True, **options)->Iterator[dict]:
+    """
+    Function that solves many puzzles across a pool of worker processes. Results are streamed back as soon as they are available,
+    in input order or in completion order.
+
+    Args:
+        puzzles (Iterable[str|bytes]): puzzle lines or cell values (see PuzzleIO), consumed lazily.
+        method (str, optional): "CP", "GA", "SA" or "DLX". Defaults to "CP".
+        workers (int, optional): number of processes, 'None' for one per core. With 1 worker the puzzles are solved in this process. Defaults to None.
+        chunksize (int, optional): number of puzzles sent to a worker at a time. Defaults to 64.
+        ordered (bool, optional): 'True' to yield results in input order, 'False' in completion order. Defaults to True.
+        **options: keyword arguments of the solver (e.g. backend and propagation for CP).
+
+    Yields:
+        dict: the result of 'solveOne' for each puzzle.
+    """
+    if method not in METHODS:
+        raise ValueError("Expected a method in "+str(METHODS)+", found "+str(method))
+
+    if workers is None:
+        workers=os.cpu_count() or 1
+
+    tasks=((index,puzzle,method,options) for index,puzzle in enumerate(puzzles))
+
+    if workers<=1:
+        for task in tasks:
+            yield _solveTask(task)
+        return
+
+    with Pool(workers) as pool:
+        if ordered:
+            results=pool.imap(_solveTask,tasks,chunksize)
+        else:
+            results=pool.imap_unordered(_solveTask,tasks,chunksize)
+        yield from results
@@ -0,0 +1,255 @@
+"""
+Reproducible benchmarks.
+
+Every puzzle of examples/{easy,normal,medium,hard} is solved by each configuration 'repeats' times with fixed seeds.
+Each run happens in a fresh process, so a run can be stopped by a timeout and does not inherit the memory of the previous
+ones. The results (machine metadata, every run and a summary per configuration and puzzle) are saved as JSON and can be
+compared with a stored baseline to find regressions.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+import tracemalloc
+import multiprocessing
+
+from Sudoku import Sudoku
+from Batch import solveOne,ERROR
+from Race import raceProcesses
+
+DIFFICULTIES=("easy","normal","medium","hard")
+
+#default configurations: (name, method, solver options)
+CONFIGURATIONS=(
+    ("CP-set","CP",{"backend":"set"}),
+    ("CP-forward","CP",{"backend":"bitmask","propagation":"forward"}),
+    ("CP-forward-luby","CP",{"backend":"bitmask","propagation":"forward","seed":0,"restarts":"luby"}),
+    ("CP-hidden","CP",{"backend":"bitmask","propagation":"hidden"}),
+    ("CP-pointing","CP",{"backend":"bitmask","propagation":"pointing"}),
+    ("GA","GA",{"backend":"numpy","presolve":"pointing"}),
+    ("SA","SA",{}),
+    ("DLX","DLX",{}),
+)
+
+#methods that always take a seed, the others only when their options have one
+SEEDED_METHODS=("GA","SA")
+
+def findPuzzles(root:str="examples",difficulties:tuple=DIFFICULTIES)->list[tuple[str,str,bytes]]:
+    """
+    Function that reads the example puzzles, in order of difficulty and number.
+
+    Args:
+        root (str, optional): examples directory. Defaults to "examples".
+        difficulties (tuple, optional): subdirectories to read. Defaults to DIFFICULTIES.
+
+    Returns:
+        list[tuple[str,str,bytes]]: name, difficulty and the 81 cell values of each puzzle.
+    """
+    puzzles=[]
+    for difficulty in difficulties:
+        folder=os.path.join(root,difficulty)
+        files=[f for f in os.listdir(folder) if f.endswith(".txt")]
+        #easy2 before easy10
+        files.sort(key=lambda f: (len(f),f))
+        for f in files:
+            puzzles.append((f[:-4],difficulty,Sudoku(os.path.join(folder,f)).toValues()))
+    return puzzles
+
+def machineInfo()->dict:
+    """
+    Function that describes the machine and the code being measured.
+
+    Returns:
+        dict: python version, platform, processor, number of cpus, NumPy version and git commit (None when not available).
+    """
+    try:
+        import numpy
+        numpy_version=numpy.__version__
+    except ImportError:
+        numpy_version=None
+
+    try:
+        commit=subprocess.run(["git","rev-parse","HEAD"],capture_output=True,text=True,timeout=10).stdout.strip() or None
+    except (OSError,subprocess.SubprocessError):
+        commit=None
+
+    return {"python":sys.version.split()[0],"implementation":platform.python_implementation(),"platform":platform.platform(),
+            "machine":platform.machine(),"processor":platform.processor(),"cpu_count":os.cpu_count(),
+            "numpy":numpy_version,"commit":commit,"date":time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+def _run(values:bytes,method:str,options:dict,trace_memory:bool,results):
+    """
+    Run process: solves the puzzle and puts the 'solveOne' result (with 'peak_memory' when traced) or the error in 'results'.
+    """
+    try:
+        if trace_memory:
+            tracemalloc.start()
+        result=solveOne(0,values,method,options)
+        if trace_memory:
+            result["peak_memory"]=tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.put((result,None))
+    except Exception as e:
+        results.put((None,type(e).__name__+": "+str(e)))
+
+def runOnce(values:bytes,method:str,options:dict,timeout:float=None,trace_memory:bool=False)->dict:
+    """
+    Function that solves a puzzle once in a new process.
+
+    Args:
+        values (bytes): the cell values.
+        method (str): "CP", "GA", "SA" or "DLX".
+        options (dict): solver options.
+        timeout (float, optional): seconds before the run is stopped, None for no limit. Defaults to None.
+        trace_memory (bool, optional): 'True' to measure the peak of the memory allocated by the solver (tracemalloc slows the run down). Defaults to False.
+
+    Returns:
+        dict: 'status' ("solved", "unsolved", "timeout" or "error"), time, cpu_time, counters, peak_memory (traced runs) and error.
+    """
+    results=multiprocessing.Queue()
+    process=multiprocessing.Process(target=_run,args=(values,method,options,trace_memory,results),daemon=True)
+    deadline=None if timeout is None else time.perf_counter()+timeout
+    outcome=[]
+    if not raceProcesses([process],results,outcome.append,deadline):
+        return {"status":"timeout","error":"timeout"}
+    if not outcome:
+        #the process exited without a result (e.g. crashed)
+        return {"status":ERROR,"error":"exit code "+str(process.exitcode)}
+
+    result,error=outcome[0]
+    if result is None:
+        return {"status":ERROR,"error":error}
+    if result["status"]==ERROR:
+        return {"status":ERROR,"error":result["error"]}
+
+    run={"status":"solved" if result["solved"] else "unsolved","time":result["time"],"cpu_time":result["cpu_time"],"counters":result["counters"]}
+    if "peak_memory" in result:
+        run["peak_memory"]=result["peak_memory"]
+    return run
+
+def _summarize(runs:list[dict],peak_memory:int)->dict:
+    """
+    Function that summarizes the repeats of a configuration on a puzzle: medians of the times and of the counters.
+    """
+    finished=[run for run in runs if "time" in run]
+    summary={"runs":len(runs),"solved":sum(run["status"]=="solved" for run in runs),
+             "timeouts":sum(run["status"]=="timeout" for run in runs),"peak_memory":peak_memory}
+    if finished:
+        summary["time"]=statistics.median(run["time"] for run in finished)
+        summary["time_min"]=min(run["time"] for run in finished)
+        summary["cpu_time"]=statistics.median(run["cpu_time"] for run in finished)
+        summary["counters"]={key:statistics.median(run["counters"][key] for run in finished) for key in finished[0]["counters"]}
+    return summary
+
+def runBenchmark(puzzles:list[tuple[str,str,bytes]],configurations:tuple=CONFIGURATIONS,repeats:int=3,seed:int=0,
+                 timeout:float=60,memory:bool=True,progress=None)->dict:
+    """
+    Function that runs every configuration 'repeats' times on every puzzle. Repeat n uses the seed 'seed'+n.
+    With 'memory' an additional traced run (same seed as repeat 0, time not recorded) measures the peak memory.
+
+    Args:
+        puzzles (list[tuple[str,str,bytes]]): name, difficulty and cell values of each puzzle (see findPuzzles).
+        configurations (tuple, optional): (name, method, solver options) of each configuration. Defaults to CONFIGURATIONS.
+        repeats (int, optional): timed runs per configuration and puzzle. Defaults to 3.
+        seed (int, optional): seed of the first repeat. Defaults to 0.
+        timeout (float, optional): seconds before a run is stopped, None for no limit. Defaults to 60.
+        memory (bool, optional): 'True' to measure the peak memory. Defaults to True.
+        progress (callable, optional): function called with every run record. Defaults to None.
+
+    Returns:
+        dict: 'machine' (see machineInfo), 'settings', 'runs' (one record per timed run) and 'summary' ('summary[configuration][puzzle]').
+    """
+    results={"machine":machineInfo(),
+             "settings":{"repeats":repeats,"seed":seed,"timeout":timeout,"memory":memory,
+                         "configurations":[{"name":name,"method":method,"options":options} for name,method,options in configurations]},
+             "runs":[],"summary":{}}
+
+    for name,method,options in configurations:
+        results["summary"][name]={}
+        for puzzle,difficulty,values in puzzles:
+
+            def seeded(repeat:int)->dict:
+                if method in SEEDED_METHODS or "seed" in options:
+                    return dict(options,seed=seed+repeat)
+                return options
+
+            runs=[]
+            for repeat in range(repeats):
+                run=runOnce(values,method,seeded(repeat),timeout)
+                run.update(configuration=name,puzzle=puzzle,difficulty=difficulty,repeat=repeat)
+                runs.append(run)
+                if progress is not None:
+                    progress(run)
+
+            peak_memory=None
+            if memory:
+                peak_memory=runOnce(values,method,seeded(0),timeout,trace_memory=True).get("peak_memory")
+
+            results["runs"]+=runs
+            results["summary"][name][puzzle]=dict(_summarize(runs,peak_memory),difficulty=difficulty)
+
+    return results
+
+def compare(results:dict,baseline:dict,threshold:float=0.2,metric:str="time",min_time:float=0.005)->list[dict]:
+    """
+    Function that compares the summary of 'results' with the one of 'baseline'. A configuration regresses on a puzzle when
+    it solves fewer runs, or when its median 'metric' grows by more than 'threshold' (relative) and by more than 'min_time' seconds,
+    so that the noise of very short runs is ignored.
+
+    Args:
+        results (dict): results of runBenchmark.
+        baseline (dict): stored results of runBenchmark.
+        threshold (float, optional): allowed relative slowdown. Defaults to 0.2.
+        metric (str, optional): "time" or "cpu_time". Defaults to "time".
+        min_time (float, optional): allowed absolute slowdown in seconds. Defaults to 0.005.
+
+    Returns:
+        list[dict]: configuration, puzzle, baseline and current values and reason of every regression.
+    """
+    if metric not in ("time","cpu_time"):
+        raise ValueError("Expected 'time' or 'cpu_time' metric, found "+str(metric))
+
+    regressions=[]
+    for name,puzzles in results["summary"].items():
+        for puzzle,current in puzzles.items():
+            old=baseline.get("summary",{}).get(name,{}).get(puzzle)
+            if old is None:
+                continue
+
+            if current["solved"]/current["runs"]<old["solved"]/old["runs"]:
+                regressions.append({"configuration":name,"puzzle":puzzle,"baseline":old["solved"]/old["runs"],
+                                    "current":current["solved"]/current["runs"],"reason":"solved rate"})
+            elif metric in old and metric in current:
+                if current[metric]>old[metric]*(1+threshold) and current[metric]-old[metric]>min_time:
+                    regressions.append({"configuration":name,"puzzle":puzzle,"baseline":old[metric],
+                                        "current":current[metric],"reason":metric})
+    return regressions
+
+def save(results:dict,path:str):
+    """
+    Function that writes benchmark results as JSON.
+
+    Args:
+        results (dict): results of runBenchmark.
+        path (str): file path.
+    """
+    with open(path,"w") as f:
+        json.dump(results,f,indent=1)
+
+def load(path:str)->dict:
+    """
+    Function that reads benchmark results written by 'save'.
+
+    Args:
+        path (str): file path.
+
+    Returns:
+        dict: benchmark results.
+    """
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,673 @@
+from __future__ import annotations
+
+import random
+import itertools
+from functools import lru_cache
+
+from Units import boxSize,unitTables
+from Budget import Budget,SOLVED,TIMEOUT,UNSATISFIABLE
+
+class _MaskTable(dict):
+    """
+    Table of a function of the masks, filled on first access. Used instead of a list over all the masks on the boards
+    with more than 9 digits (2^16 entries on a 16x16 board, 2^25 on a 25x25 one): a lookup keeps the cost of a list lookup
+    and only the masks that actually occur are stored.
+    """
+
+    def __init__(self,function):
+        self.function=function
+
+    def __missing__(self,m:int):
+        value=self[m]=self.function(m)
+        return value
+
+@lru_cache(maxsize=None)
+def maskTables(size:int=9)->tuple:
+    """
+    Function that returns the mask tables of the boards with 'size' digits, built on first use.
+
+    Args:
+        size (int, optional): number of digits. Defaults to 9.
+
+    Returns:
+        tuple: BIT, FULL_MASK, POPCOUNT, LOWEST_DIGIT and DIGITS of the boards with 'size' digits (see the 9x9 tables below).
+    """
+    bit=[0]+[1<<(d-1) for d in range(1,size+1)]
+    full_mask=(1<<size)-1
+
+    def popcount(m:int)->int:
+        return bin(m).count("1")
+    def lowestDigit(m:int)->int:
+        return (m & -m).bit_length()
+    def digits(m:int)->tuple[int]:
+        return tuple(d for d in range(1,size+1) if m & bit[d])
+
+    if size>9:
+        return bit,full_mask,_MaskTable(popcount),_MaskTable(lowestDigit),_MaskTable(digits)
+    masks=range(full_mask+1)
+    return bit,full_mask,[popcount(m) for m in masks],[lowestDigit(m) for m in masks],[digits(m) for m in masks]
+
+#9x9 tables:
+#   BIT:          bit associated to each digit (BIT[0] is the empty mask)
+#   FULL_MASK:    mask with all the 9 digits
+#   POPCOUNT:     number of digits in a mask
+#   LOWEST_DIGIT: lowest digit in a mask (0 for the empty mask)
+#   DIGITS:       digits in a mask, in increasing order
+BIT,FULL_MASK,POPCOUNT,LOWEST_DIGIT,DIGITS=maskTables(9)
+
+#propagation levels, from the weakest to the strongest. Each level also applies the rules of the previous ones:
+#   forward:  a placed value is removed from its peers (forward checking)
+#   naked:    a cell with a single candidate is assigned
+#   hidden:   a digit with a single place in a row, col or square is assigned there
+#   pairs:    naked pairs and hidden pairs in a row, col or square
+#   pointing: pointing (square->line) and box-line (line->square) reductions
+PROPAGATION_LEVELS=("forward","naked","hidden","pairs","pointing")
+
+FORWARD,NAKED,HIDDEN,PAIRS,POINTING=range(len(PROPAGATION_LEVELS))
+
+#restart policies of the randomized search, the n-th restart happens after cutoff(n) backtracks:
+#   luby:      base*(1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8...), the universal sequence of Luby, Sinclair and Zuckerman
+#   geometric: base*GEOMETRIC_FACTOR^n
+RESTART_POLICIES=("luby","geometric")
+GEOMETRIC_FACTOR=1.5
+
+def luby(n:int)->int:
+    """
+    Function that returns the n-th term of the Luby sequence (n from 1).
+
+    Args:
+        n (int): position in the sequence.
+
+    Returns:
+        int: a power of 2.
+    """
+    while True:
+        k=n.bit_length()
+        #n=2^k-1 ends a block: the block doubles its last term
+        if n==(1<<k)-1:
+            return 1<<(k-1)
+        #otherwise the sequence repeats from the start of the block
+        n-=(1<<(k-1))-1
+
+def restartCutoffs(policy:str,base:int):
+    """
+    Generator of the backtrack cutoffs of a restart policy.
+
+    Args:
+        policy (str): one of RESTART_POLICIES.
+        base (int): backtracks of the first run.
+
+    Yields:
+        int: backtracks allowed to each run.
+    """
+    n=1
+    while True:
+        if policy=="luby":
+            yield base*luby(n)
+        else:
+            yield int(base*GEOMETRIC_FACTOR**(n-1))
+        n+=1
+
+class BitBoard:
+
+    def __init__(self,_values:list[int],propagation:str="forward",seed:int=None):
+        """
+        bitmask sudoku board constructor. The board is stored as flat lists of one element per cell: 'value' (0 for empty cells)
+        and 'domain' (mask of the candidates of each cell, bit d-1 for digit d). The box size is given by the number of cells
+        (81 for a 9x9 board, 256 for 16x16, 625 for 25x25).
+
+        Args:
+            _values (list[int]): the cell values in row-major order, 0 for empty cells.
+            propagation (str, optional): propagation level, one of PROPAGATION_LEVELS. Defaults to "forward".
+            seed (int, optional): random seed of the search order. With a seed, ties between min domain cells are broken at random
+                and the candidates of a cell are tried in random order. None for the deterministic order. Defaults to None.
+        """
+        n=boxSize(len(_values))
+        if propagation not in PROPAGATION_LEVELS:
+            raise ValueError("Expected a propagation level in "+str(PROPAGATION_LEVELS)+", found "+str(propagation))
+
+        self.size=n*n
+        self.bit,self.full_mask,self.popcount,self.lowest_digit,self.digits=maskTables(self.size)
+        tables=unitTables(n)
+        self.peer_indexes=tables.peer_indexes
+        self.unit_indexes=tables.unit_indexes
+        self.intersection_indexes=tables.intersection_indexes
+
+        self.value=[int(x) for x in _values]
+        if max(self.value)>self.size:
+            raise ValueError("Expected values up to "+str(self.size)+", found "+str(max(self.value)))
+        self.domain=[0 if x else self.full_mask for x in self.value]
+        self.level=PROPAGATION_LEVELS.index(propagation)
+        self.rng=random.Random(seed) if seed is not None else None
+
+        #MRV bucket queue: buckets[n] holds the empty cells with n candidates
+        self.buckets=[set() for _ in range(self.size+1)]
+        self.buckets[self.size].update(k for k in range(len(self.value)) if not self.value[k])
+
+        #undo log: pairs (cell, previous domain), previous domain -1 for an assignment
+        self.trail=[]
+
+        #assigned cells whose value was not yet removed from their peers
+        self.queue=[k for k in range(len(self.value)) if self.value[k]]
+
+        #number of deductions made by each propagation rule
+        self.counters={"naked_singles":0,"hidden_singles":0,"naked_pairs":0,"hidden_pairs":0,"pointing":0,"box_line":0}
+
+    def __assign(self,k:int,value:int):
+        """
+        Function that assigns 'value' to the empty cell 'k' and queues it for forward checking.
+
+        Args:
+            k (int): flat cell index.
+            value (int): value to be assigned.
+        """
+        self.value[k]=value
+        self.buckets[self.popcount[self.domain[k]]].remove(k)
+        self.trail.append(k)
+        self.trail.append(-1)
+        self.queue.append(k)
+
+    def __restrict(self,k:int,mask:int)->bool:
+        """
+        Function that restricts the domain of the empty cell 'k' to the digits in 'mask'.
+        With naked singles enabled a cell left with one candidate is assigned.
+
+        Args:
+            k (int): flat cell index.
+            mask (int): digits allowed.
+
+        Returns:
+            bool: 'False' if the domain becomes empty, 'True' otherwise.
+        """
+        old=self.domain[k]
+        new=old & mask
+        if new==old:
+            return True
+        if new==0:
+            return False
+
+        popcount=self.popcount
+        self.domain[k]=new
+        self.buckets[popcount[old]].remove(k)
+        self.buckets[popcount[new]].add(k)
+        self.trail.append(k)
+        self.trail.append(old)
+
+        if self.level>=NAKED and popcount[new]==1:
+            self.counters["naked_singles"]+=1
+            self.__assign(k,self.lowest_digit[new])
+        return True
+
+    def __undo(self,mark:int):
+        """
+        Function that reverts the assignments and domain changes made after the trail had length 'mark'.
+
+        Args:
+            mark (int): trail length to restore.
+        """
+        trail=self.trail
+        domain=self.domain
+        buckets=self.buckets
+        popcount=self.popcount
+        while len(trail)>mark:
+            old=trail.pop()
+            k=trail.pop()
+            if old<0:
+                self.value[k]=0
+                buckets[popcount[domain[k]]].add(k)
+            else:
+                buckets[popcount[domain[k]]].remove(k)
+                domain[k]=old
+                buckets[popcount[old]].add(k)
+        self.queue.clear()
+
+    def __forwardCheck(self)->bool:
+        """
+        Function that removes the value of every queued cell from the domain of its empty peers.
+
+        Returns:
+            bool: 'False' if a peer holds the same value or is left with an empty domain, 'True' otherwise.
+        """
+        cells_value=self.value
+        domain=self.domain
+        queue=self.queue
+        peer_indexes=self.peer_indexes
+        while queue:
+            k=queue.pop()
+            value=cells_value[k]
+            bit=self.bit[value]
+            for p in peer_indexes[k]:
+                if cells_value[p]:
+                    if cells_value[p]==value:
+                        return False
+                elif domain[p] & bit:
+                    if not self.__restrict(p,~bit):
+                        return False
+        return True
+
+    def __hiddenSingles(self)->bool:
+        """
+        Function that assigns every digit that has a single place in a row, col or square.
+
+        Returns:
+            bool: 'False' if a digit has no place in a unit, 'True' otherwise.
+        """
+        cells_value=self.value
+        domain=self.domain
+        bit=self.bit
+        full_mask=self.full_mask
+        for unit in self.unit_indexes:
+            once=0
+            twice=0
+            placed=0
+            for p in unit:
+                if cells_value[p]:
+                    placed|=bit[cells_value[p]]
+                else:
+                    twice|=once & domain[p]
+                    once|=domain[p]
+            if (once|placed)!=full_mask:
+                return False
+
+            singles=once & ~twice & ~placed
+            if singles:
+                for p in unit:
+                    if not cells_value[p] and domain[p] & singles:
+                        digits=domain[p] & singles
+                        #two digits can only be placed in the same cell
+                        if self.popcount[digits]>1:
+                            return False
+                        self.counters["hidden_singles"]+=1
+                        self.__assign(p,self.lowest_digit[digits])
+        return True
+
+    def __pairs(self)->bool:
+        """
+        Function that applies naked pairs (two cells of a unit with the same two candidates) and
+        hidden pairs (two digits that can only be placed in the same two cells of a unit).
+
+        Returns:
+            bool: 'False' if a domain becomes empty, 'True' otherwise.
+        """
+        cells_value=self.value
+        domain=self.domain
+        counters=self.counters
+        popcount=self.popcount
+        for unit in self.unit_indexes:
+
+            #naked pairs
+            seen={}
+            for p in unit:
+                if not cells_value[p] and popcount[domain[p]]==2:
+                    pair=domain[p]
+                    if pair in seen:
+                        q=seen[pair]
+                        for x in unit:
+                            if x!=p and x!=q and not cells_value[x] and domain[x] & pair:
+                                counters["naked_pairs"]+=1
+                                if not self.__restrict(x,~pair):
+                                    return False
+                                #forward check the naked single before going on
+                                if self.queue:
+                                    return True
+                    else:
+                        seen[pair]=p
+
+            #hidden pairs
+            once=0
+            twice=0
+            thrice=0
+            for p in unit:
+                if not cells_value[p]:
+                    thrice|=twice & domain[p]
+                    twice|=once & domain[p]
+                    once|=domain[p]
+            doubles=twice & ~thrice
+            if popcount[doubles]>=2:
+                places={}
+                while doubles:
+                    bit=doubles & -doubles
+                    doubles^=bit
+                    cells=tuple(p for p in unit if not cells_value[p] and domain[p] & bit)
+                    if cells in places:
+                        pair=places[cells] | bit
+                        for p in cells:
+                            if domain[p]!=pair and not cells_value[p]:
+                                counters["hidden_pairs"]+=1
+                                if not self.__restrict(p,pair):
+                                    return False
+                                #forward check the naked single before going on
+                                if self.queue:
+                                    return True
+                    else:
+                        places[cells]=bit
+        return True
+
+    def __intersections(self)->bool:
+        """
+        Function that applies pointing (a digit of a square confined to one line is removed from the rest of the line)
+        and box-line reduction (a digit of a line confined to one square is removed from the rest of the square).
+
+        Returns:
+            bool: 'False' if a domain becomes empty, 'True' otherwise.
+        """
+        cells_value=self.value
+        domain=self.domain
+        counters=self.counters
+        for segment,line_rest,square_rest in self.intersection_indexes:
+            segment_mask=0
+            for p in segment:
+                if not cells_value[p]:
+                    segment_mask|=domain[p]
+            if not segment_mask:
+                continue
+
+            line_mask=0
+            for p in line_rest:
+                if not cells_value[p]:
+                    line_mask|=domain[p]
+            square_mask=0
+            for p in square_rest:
+                if not cells_value[p]:
+                    square_mask|=domain[p]
+
+            #pointing
+            pointing=segment_mask & ~square_mask & line_mask
+            if pointing:
+                for p in line_rest:
+                    if not cells_value[p] and domain[p] & pointing:
+                        counters["pointing"]+=1
+                        if not self.__restrict(p,~pointing):
+                            return False
+                        #forward check the naked single before going on
+                        if self.queue:
+                            return True
+
+            #box-line reduction
+            box_line=segment_mask & ~line_mask & square_mask
+            if box_line:
+                for p in square_rest:
+                    if not cells_value[p] and domain[p] & box_line:
+                        counters["box_line"]+=1
+                        if not self.__restrict(p,~box_line):
+                            return False
+                        #forward check the naked single before going on
+                        if self.queue:
+                            return True
+        return True
+
+    def __propagate(self)->bool:
+        """
+        Function that applies the rules of the selected propagation level until no rule changes the board (fixpoint).
+
+        Returns:
+            bool: 'False' if a contradiction is found, 'True' otherwise.
+        """
+        level=self.level
+        trail=self.trail
+        while True:
+            if not self.__forwardCheck():
+                return False
+            if level<HIDDEN:
+                return True
+
+            mark=len(trail)
+            if not self.__hiddenSingles():
+                return False
+            if len(trail)>mark:
+                continue
+            if level<PAIRS:
+                return True
+
+            if not self.__pairs():
+                return False
+            if len(trail)>mark:
+                continue
+            if level<POINTING:
+                return True
+
+            if not self.__intersections():
+                return False
+            if len(trail)==mark:
+                return True
+
+    def isSolved(self)->bool:
+        """
+        Function that checks if every row, col and square holds all the digits.
+
+        Returns:
+            bool: 'True' if the board is a solution, 'False' otherwise.
+        """
+        cells_value=self.value
+        bit=self.bit
+        for unit in self.unit_indexes:
+            digits=0
+            for p in unit:
+                digits|=bit[cells_value[p]]
+            if digits!=self.full_mask:
+                return False
+        return True
+
+    def presolve(self)->bool:
+        """
+        Function that runs the selected propagation level to fixpoint without search. Forced cells are left in 'value'
+        and the candidates of the other empty cells in 'domain'.
+
+        Returns:
+            bool: 'False' if a contradiction is found (the puzzle has no solution), 'True' otherwise.
+        """
+        return self.__propagate()
+
+    def __minDomain(self)->int:
+        """
+        Function that returns an empty cell with minimum domain, by looking up the first non empty bucket.
+        With a seed the cell is a random one of the bucket, reached by skipping the cells before it rather than by copying the bucket.
+
+        Returns:
+            int: flat index of the min domain cell, -1 if the board is full.
+        """
+        for bucket in self.buckets:
+            if bucket:
+                if self.rng is not None:
+                    return next(itertools.islice(bucket,self.rng.randrange(len(bucket)),None))
+                return next(iter(bucket))
+        return -1
+
+    def __search(self,limit:int,observer=None,solutions:list=None,budget:Budget=None,cutoffs=None)->tuple[int,int]:
+        """
+        CP and backtracking on the bitmask board, stopped at the 'limit'-th solution. At every node the selected propagation
+        level is run to fixpoint, then the empty cell with minimum domain is assigned its candidates in increasing order
+        (random order with a seed). After a solution the search goes on as if its last assignment had failed.
+        The number of solutions found is saved in 'n_solutions' and the first solution is left in 'value'.
+        The outcome is saved in 'status' (see Budget): when the budget runs out before a solution, the board with the most
+        assigned cells found so far is left in 'value'. With 'cutoffs' the search is restarted from the root (with a new random
+        order) every time a run reaches its backtrack cutoff, and the number of restarts is saved in 'restarts'.
+
+        Args:
+            limit (int): number of solutions after which the search stops.
+            observer (SolverObserver, optional): receives the assignments, backtracks and propagations (see Observer). Defaults to None.
+            solutions (list, optional): list where the values of every solution are appended, None to keep only the first one. Defaults to None.
+            budget (Budget, optional): deadline and maximum number of assigned nodes, None for no limit. Defaults to None.
+            cutoffs (Iterator[int], optional): backtracks allowed to each run (see restartCutoffs), None to never restart.
+                Only with limit=1. Defaults to None.
+
+        Returns:
+            tuple[int,int]: restored nodes and assigned nodes.
+        """
+        restored_nodes=0
+        assigned_nodes=0
+        self.n_solutions=0
+        self.restarts=0
+        self.status=UNSATISFIABLE
+
+        domain=self.domain
+        trail=self.trail
+        rng=self.rng
+
+        #initial constraint propagation
+        if not self.__propagate():
+            self.__undo(0)
+            return restored_nodes,assigned_nodes
+        if observer is not None:
+            observer.propagated(len(trail)//2)
+
+        k=self.__minDomain()
+        if k<0:
+            #the deductions are forced: the only solution
+            self.n_solutions=1
+            self.status=SOLVED
+            if solutions is not None:
+                solutions.append(bytes(self.value))
+            return restored_nodes,assigned_nodes
+
+        first=None
+
+        #board with the fewest empty cells, kept only with a budget
+        best=None
+        best_empty=len(self.value)
+
+        #restarts go back to the board after the initial propagation
+        root=len(trail)
+        if cutoffs is not None:
+            cutoff=next(cutoffs)
+            backtracks=0
+            max_depth=0
+
+        #stack of [cell, candidates not yet assigned, trail length before the assignment]
+        visited_cells=[[k,domain[k],len(trail)]]
+
+        while visited_cells:
+
+            frame=visited_cells[-1]
+            k,candidates,mark=frame
+
+            #the previous value assigned to the cell failed (or gave a solution)
+            if len(trail)>mark:
+                restored_nodes+=1
+                if observer is not None:
+                    observer.backtracked(k)
+                self.__undo(mark)
+
+                if cutoffs is not None:
+                    backtracks+=1
+                    max_depth=max(max_depth,len(visited_cells))
+                    if backtracks>=cutoff:
+                        self.restarts+=1
+                        if observer is not None:
+                            observer.searchRestarted(self.restarts,max_depth,cutoff)
+                        self.__undo(root)
+                        k=self.__minDomain()
+                        visited_cells=[[k,domain[k],len(trail)]]
+                        cutoff=next(cutoffs)
+                        backtracks=0
+                        max_depth=0
+                        continue
+
+            if not candidates:
+                visited_cells.pop()
+                continue
+
+            if budget is not None and budget.exhausted(assigned_nodes):
+                self.status=TIMEOUT
+                break
+
+            assigned_nodes+=1
+
+            #assign the lowest (or a random) value not previously assigned
+            if rng is None:
+                value=self.lowest_digit[candidates]
+            else:
+                value=rng.choice(self.digits[candidates])
+            frame[1]=candidates ^ self.bit[value]
+            self.__assign(k,value)
+            if observer is not None:
+                observer.nodeAssigned(k,value)
+
+            propagated=self.__propagate()
+            if observer is not None:
+                observer.propagated((len(trail)-mark)//2-1)
+            if not propagated:
+                continue
+
+            k=self.__minDomain()
+
+            #solution found
+            if k<0:
+                self.n_solutions+=1
+                if solutions is not None:
+                    solutions.append(bytes(self.value))
+                if self.n_solutions>=limit:
+                    break
+                if first is None:
+                    first=bytes(self.value)
+                continue
+
+            if budget is not None:
+                n_empty=sum(map(len,self.buckets))
+                if n_empty<best_empty:
+                    best_empty=n_empty
+                    best=bytes(self.value)
+
+            visited_cells.append([k,domain[k],len(trail)])
+
+        if self.n_solutions:
+            self.status=SOLVED
+            #the search went on after the first solution
+            if first is not None:
+                self.value[:]=first
+        elif best is not None:
+            self.value[:]=best
+
+        return restored_nodes,assigned_nodes
+
+    def solve(self,observer=None,timeout:float=None,max_nodes:int=None,restarts:str=None,restart_base:int=100):
+        """
+        CP and backtracking on the bitmask board, stopped at the first solution (see countSolutions to go on).
+        At every node the selected propagation level is run to fixpoint, then the empty cell with minimum domain is assigned
+        its candidates in increasing order (random order with a seed). The outcome is saved in 'status' (see Budget).
+        With a restart policy the randomized search is restarted after a growing number of backtracks, which cuts the long
+        runs of an unlucky order; the number of restarts is saved in 'restarts'.
+
+        Args:
+            observer (SolverObserver, optional): receives the assignments, backtracks and propagations (see Observer). Defaults to None.
+            timeout (float, optional): seconds before the search stops, None for no limit. Defaults to None.
+            max_nodes (int, optional): assigned nodes before the search stops, None for no limit. Defaults to None.
+            restarts (str, optional): restart policy, one of RESTART_POLICIES. Needs a seed. None to never restart. Defaults to None.
+            restart_base (int, optional): backtracks of the first run of the restart policy. Defaults to 100.
+
+        Returns:
+            tuple[int,int]: restored nodes and assigned nodes.
+        """
+        cutoffs=None
+        if restarts is not None:
+            if restarts not in RESTART_POLICIES:
+                raise ValueError("Expected a restart policy in "+str(RESTART_POLICIES)+", found "+str(restarts))
+            if self.rng is None:
+                raise ValueError("Restarts need a seeded search order")
+            cutoffs=restartCutoffs(restarts,restart_base)
+        self.budget=Budget.of(timeout,max_nodes)
+        return self.__search(1,observer,None,self.budget,cutoffs)
+
+    def countSolutions(self,limit:int=2,keep_solutions:bool=False,observer=None,timeout:float=None,max_nodes:int=None)->tuple[int,list[bytes]]:
+        """
+        Function that counts the solutions of the board with the search of 'solve', stopping as soon as 'limit' solutions
+        are found: 'limit=2' checks that the puzzle has a unique solution. The first solution is left in 'value' and the
+        restored and assigned nodes are saved in 'restored_nodes' and 'assigned_nodes'. When the budget runs out ('status' is
+        "timeout", or "solved" with 'budget.reason' set) the count is only a lower bound.
+
+        Args:
+            limit (int, optional): number of solutions after which the search stops. Defaults to 2.
+            keep_solutions (bool, optional): 'True' to return the values of the solutions found. Defaults to False.
+            observer (SolverObserver, optional): receives the assignments, backtracks and propagations (see Observer). Defaults to None.
+            timeout (float, optional): seconds before the search stops, None for no limit. Defaults to None.
+            max_nodes (int, optional): assigned nodes before the search stops, None for no limit. Defaults to None.
+
+        Returns:
+            tuple[int,list[bytes]]: number of solutions (at most 'limit') and their values (empty without 'keep_solutions').
+        """
+        if limit<1:
+            raise ValueError("Expected a positive limit, found "+str(limit))
+        solutions=[] if keep_solutions else None
+        self.budget=Budget.of(timeout,max_nodes)
+        self.restored_nodes,self.assigned_nodes=self.__search(limit,observer,solutions,self.budget)
+        return self.n_solutions,solutions or []
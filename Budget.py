@@ -0,0 +1,64 @@
+"""
+Solver budgets and result status.
+
+A budget stops a solver at a wall-clock deadline or after a number of nodes (CP assignments, GA generations), so that a
+pathological puzzle cannot keep a worker busy forever. A stopped solver reports the best board found so far:
+
+    solved:         a solution was found
+    timeout:        the deadline or the node budget ran out first ('reason' is "deadline" or "budget")
+    unsatisfiable:  the search space was exhausted without a solution
+"""
+from __future__ import annotations
+
+import time
+
+SOLVED="solved"
+TIMEOUT="timeout"
+UNSATISFIABLE="unsatisfiable"
+
+STATUSES=(SOLVED,TIMEOUT,UNSATISFIABLE)
+
+class Budget:
+
+    def __init__(self,timeout:float=None,max_nodes:int=None):
+        """
+        budget constructor. The deadline is counted from now.
+
+        Args:
+            timeout (float, optional): seconds before the deadline, None for no deadline. Defaults to None.
+            max_nodes (int, optional): nodes (assignments or generations) allowed, None for no limit. Defaults to None.
+        """
+        self.deadline=time.perf_counter()+timeout if timeout is not None else None
+        self.max_nodes=max_nodes
+        #"deadline" or "budget" once exhausted
+        self.reason=None
+
+    @staticmethod
+    def of(timeout:float=None,max_nodes:int=None)->Budget:
+        """
+        Function that returns a budget, or None when there is no limit (so the solvers skip the checks).
+
+        Returns:
+            Budget: the budget, None without timeout and max_nodes.
+        """
+        if timeout is None and max_nodes is None:
+            return None
+        return Budget(timeout,max_nodes)
+
+    def exhausted(self,nodes:int)->bool:
+        """
+        Function that checks whether the budget ran out after 'nodes' nodes, and records why in 'reason'.
+
+        Args:
+            nodes (int): nodes made so far.
+
+        Returns:
+            bool: 'True' if the solver must stop.
+        """
+        if self.max_nodes is not None and nodes>=self.max_nodes:
+            self.reason="budget"
+            return True
+        if self.deadline is not None and time.perf_counter()>=self.deadline:
+            self.reason="deadline"
+            return True
+        return False
@@ -0,0 +1,190 @@
+"""
+Solution cache keyed by the canonical form of the puzzles (see Canonical).
+
+A puzzle is canonicalized, the solution of its canonical form is looked up and mapped back through the inverse transform,
+so a solution is reused by every puzzle equivalent under the sudoku symmetries. The cache keeps the most recently used
+solutions in memory and can also store all of them in a SQLite file that survives restarts.
+Solutions are stored under a 'variant' as well (e.g. the solver and its options), so that a puzzle with several solutions
+only gets the one its solver would have found.
+Only 9x9 puzzles are cached: the larger boards, and the grids too sparse to canonicalize (see Canonical.MAX_BEAM), are never
+found and never stored.
+The cache is not thread safe, but its SQLite connection may be used by a thread other than the one that opened it, as long
+as one thread at a time uses the cache.
+"""
+from __future__ import annotations
+
+import time
+import sqlite3
+from collections import OrderedDict
+
+from Canonical import canonicalize,toCanonical,fromCanonical
+from Portfolio import isSolutionOf
+
+class SolutionCache:
+
+    def __init__(self,capacity:int=4096,path:str=None):
+        """
+        solution cache constructor.
+
+        Args:
+            capacity (int, optional): canonical solutions kept in memory, the least recently used ones are evicted. Defaults to 4096.
+            path (str, optional): SQLite file of the persistent store, None to keep the cache in memory only. Defaults to None.
+        """
+        self.capacity=capacity
+        self.memory=OrderedDict()
+
+        self.db=None
+        if path is not None:
+            self.db=sqlite3.connect(path,check_same_thread=False)
+            columns=[row[1] for row in self.db.execute("PRAGMA table_info(solutions)")]
+            if columns and "variant" not in columns:
+                #store of a version without variants: its solutions cannot be told apart
+                self.db.execute("DROP TABLE solutions")
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (puzzle BLOB, variant TEXT, solution BLOB NOT NULL, PRIMARY KEY (puzzle, variant))")
+            self.db.commit()
+
+        self.counters={"hits":0,"memory_hits":0,"disk_hits":0,"misses":0,"stores":0,"evictions":0,"skipped":0,
+                       "canonicalizations":0,"canonicalization_time":0.0}
+
+    def __canonicalize(self,values:bytes)->tuple[bytes,tuple]:
+        """
+        Function that canonicalizes a puzzle, None (counted as skipped) for the grids too sparse to canonicalize.
+        """
+        start_time=time.perf_counter()
+        result=canonicalize(values)
+        self.counters["canonicalizations"]+=1
+        self.counters["canonicalization_time"]+=time.perf_counter()-start_time
+        if result is None:
+            self.counters["skipped"]+=1
+        return result
+
+    def __remember(self,key:tuple,solution:bytes):
+        """
+        Function that puts a canonical solution in memory under (canonical puzzle, variant) as the most recently used one,
+        evicting the least recently used.
+        """
+        self.memory[key]=solution
+        self.memory.move_to_end(key)
+        while len(self.memory)>self.capacity:
+            self.memory.popitem(last=False)
+            self.counters["evictions"]+=1
+
+    def __lookup(self,canonical:bytes,transform:tuple,variant:str)->bytes:
+        """
+        Function that looks up a canonical puzzle in memory, then in the store, and maps its solution back with 'transform'.
+        """
+        key=(canonical,variant)
+        solution=self.memory.get(key)
+        if solution is not None:
+            self.memory.move_to_end(key)
+            self.counters["memory_hits"]+=1
+        elif self.db is not None:
+            row=self.db.execute("SELECT solution FROM solutions WHERE puzzle=? AND variant=?",(canonical,variant)).fetchone()
+            if row is not None:
+                solution=bytes(row[0])
+                self.__remember(key,solution)
+                self.counters["disk_hits"]+=1
+
+        if solution is None:
+            self.counters["misses"]+=1
+            return None
+        self.counters["hits"]+=1
+        return fromCanonical(solution,transform)
+
+    def __store(self,values:bytes,solution:bytes,canonical:bytes,transform:tuple,variant:str)->bool:
+        """
+        Function that stores the solution of a puzzle under its canonical form, if it solves the puzzle.
+        """
+        if not isSolutionOf(values,solution):
+            return False
+
+        canonical_solution=toCanonical(solution,transform)
+
+        self.__remember((canonical,variant),canonical_solution)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?,?,?)",(canonical,variant,canonical_solution))
+            self.db.commit()
+        self.counters["stores"]+=1
+        return True
+
+    def get(self,values:bytes,variant:str="")->bytes:
+        """
+        Function that looks up the solution of a puzzle.
+
+        Args:
+            values (bytes): the 81 cell values of the puzzle.
+            variant (str, optional): variant the solution was stored under. Defaults to "".
+
+        Returns:
+            bytes: the 81 values of the solution, None on a miss.
+        """
+        if len(values)!=81:
+            return None
+        canonical=self.__canonicalize(bytes(values))
+        if canonical is None:
+            return None
+        return self.__lookup(*canonical,variant)
+
+    def put(self,values:bytes,solution:bytes,variant:str="")->bool:
+        """
+        Function that stores the solution of a puzzle. Solutions that do not solve the puzzle are not stored.
+
+        Args:
+            values (bytes): the 81 cell values of the puzzle.
+            solution (bytes): the 81 cell values of its solution.
+            variant (str, optional): variant the solution is stored under. Defaults to "".
+
+        Returns:
+            bool: 'True' if the solution was stored.
+        """
+        values=bytes(values)
+        solution=bytes(solution)
+        #no canonicalization for solutions that would not be stored
+        if len(values)!=81 or not isSolutionOf(values,solution):
+            return False
+        canonical=self.__canonicalize(values)
+        if canonical is None:
+            return False
+        return self.__store(values,solution,*canonical,variant)
+
+    def solve(self,values:bytes,solver,variant:str="")->tuple[bytes,bool]:
+        """
+        Function that returns the cached solution of a puzzle, or solves it with 'solver' and stores the solution.
+
+        Args:
+            values (bytes): the 81 cell values of the puzzle.
+            solver (callable): function from the puzzle values to the solution values.
+            variant (str, optional): variant the solution is looked up and stored under. Defaults to "".
+
+        Returns:
+            tuple[bytes,bool]: the 81 values of the solution and 'True' if it came from the cache.
+        """
+        values=bytes(values)
+        canonical=self.__canonicalize(values) if len(values)==81 else None
+        if canonical is None:
+            return bytes(solver(values)),False
+        solution=self.__lookup(*canonical,variant)
+        if solution is not None:
+            return solution,True
+        solution=bytes(solver(values))
+        self.__store(values,solution,*canonical,variant)
+        return solution,False
+
+    def stats(self)->dict:
+        """
+        Function that reports the cache counters, the hit rate and the mean canonicalization cost.
+
+        Returns:
+            dict: counters, 'hit_rate', 'canonicalization_mean' (seconds) and 'size' (solutions in memory).
+        """
+        stats=dict(self.counters)
+        lookups=stats["hits"]+stats["misses"]
+        stats["hit_rate"]=stats["hits"]/lookups if lookups else 0.0
+        stats["canonicalization_mean"]=stats["canonicalization_time"]/stats["canonicalizations"] if stats["canonicalizations"] else 0.0
+        stats["size"]=len(self.memory)
+        return stats
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db=None
@@ -0,0 +1,179 @@
+"""
+Canonical form of a puzzle under the sudoku symmetries.
+
+Two puzzles are equivalent when one can be turned into the other by a transposition, a permutation of the bands (groups of
+3 rows) and of the rows inside each band, a permutation of the stacks (groups of 3 cols) and of the cols inside each stack,
+and a relabeling of the digits. Equivalent puzzles have solutions that are mapped into each other by the same transform.
+
+The canonical form is the minimal grid in row-major order, over all the transforms, with the digits relabeled in order
+of first appearance (1, 2, 3...) and empty cells as 0. It is found row by row, keeping only the partial transforms that
+give the minimal rows so far (the beam). On very sparse grids almost every transform ties and the beam grows to hundreds of
+thousands of transforms (seconds of work), so the search gives up past MAX_BEAM of them.
+"""
+from __future__ import annotations
+
+import itertools
+from functools import lru_cache
+
+_PERMUTATIONS=tuple(itertools.permutations(range(3)))
+
+#partial transforms kept by 'canonicalize' before it gives up: the example puzzles need at most a few thousand, a grid
+#with 1 to 3 clues tens or hundreds of thousands
+MAX_BEAM=10000
+
+#all the 1296 col orders that keep the stacks: the stacks are permuted and so are the cols inside each stack
+COL_ORDERS=tuple(tuple(3*stacks[s]+inner[s][c] for s in range(3) for c in range(3))
+                 for stacks in _PERMUTATIONS for inner in itertools.product(_PERMUTATIONS,repeat=3))
+
+@lru_cache(maxsize=None)
+def _firstRowOrders(mask:int)->tuple[tuple[int,...],tuple[tuple[int,...],...]]:
+    """
+    Function that finds the col orders that give the minimal first row for a row with the full cells in 'mask' (bit c for col c).
+    The digits of a row are distinct, so its relabeled form only depends on where its full cells end up.
+
+    Returns:
+        tuple: the minimal pattern (1 for full cells) and the col orders that give it.
+    """
+    best=None
+    orders=[]
+    for cols in COL_ORDERS:
+        pattern=tuple(mask>>c & 1 for c in cols)
+        if best is None or pattern<best:
+            best=pattern
+            orders=[cols]
+        elif pattern==best:
+            orders.append(cols)
+    return best,tuple(orders)
+
+def _relabel(row:bytes,cols:tuple,mapping:list[int],label:int)->tuple[tuple[int,...],list[int],int]:
+    """
+    Function that relabels a row read in 'cols' order. The digits not yet in 'mapping' get the next labels.
+
+    Returns:
+        tuple: relabeled row, updated copy of the mapping and next free label.
+    """
+    mapping=mapping[:]
+    out=[]
+    for c in cols:
+        v=row[c]
+        if v:
+            if not mapping[v]:
+                mapping[v]=label
+                label+=1
+            out.append(mapping[v])
+        else:
+            out.append(0)
+    return tuple(out),mapping,label
+
+def canonicalize(values:bytes,max_beam:int=MAX_BEAM)->tuple[bytes,tuple]:
+    """
+    Function that computes the canonical form of a puzzle and the transform that produces it.
+
+    Args:
+        values (bytes): the 81 cell values, 0 for empty cells.
+        max_beam (int, optional): partial transforms kept at most, None for no limit. Defaults to MAX_BEAM.
+
+    Returns:
+        tuple[bytes,tuple]: the 81 canonical values and the transform (transposed, row order, col order, digit mapping),
+            to be used with toCanonical and fromCanonical. None if more than 'max_beam' partial transforms tie.
+    """
+    values=bytes(values)
+    grids=(tuple(values[r*9:r*9+9] for r in range(9)),
+           tuple(bytes(values[c*9+r] for c in range(9)) for r in range(9)))
+
+    #first row: any row of either grid, with the col orders that give its minimal pattern
+    best=None
+    firsts=[]
+    for transposed,grid in enumerate(grids):
+        for r in range(9):
+            mask=sum(1<<c for c in range(9) if grid[r][c])
+            pattern,orders=_firstRowOrders(mask)
+            if best is None or pattern<best:
+                best=pattern
+                firsts=[]
+            if pattern==best:
+                firsts.append((transposed,r,orders))
+    if max_beam is not None and sum(len(orders) for _,_,orders in firsts)>max_beam:
+        return None
+    beam=[]
+    for transposed,r,orders in firsts:
+        for cols in orders:
+            row,mapping,label=_relabel(grids[transposed][r],cols,[0]*10,1)
+            beam.append((transposed,(r,),cols,mapping,label))
+    canonical=[_relabel(grids[beam[0][0]][beam[0][1][0]],beam[0][2],[0]*10,1)[0]]
+
+    #next rows: the rest of the band of the first row, then the rows of the other bands
+    for k in range(1,9):
+        best=None
+        next_beam=[]
+        for transposed,rows,cols,mapping,label in beam:
+            grid=grids[transposed]
+            if k%3:
+                band=rows[-1]//3
+                candidates=[r for r in range(3*band,3*band+3) if r not in rows]
+            else:
+                used={r//3 for r in rows}
+                candidates=[r for r in range(9) if r//3 not in used]
+            for r in candidates:
+                row,new_mapping,new_label=_relabel(grid[r],cols,mapping,label)
+                if best is None or row<best:
+                    best=row
+                    next_beam=[]
+                if row==best:
+                    if max_beam is not None and len(next_beam)>=max_beam:
+                        return None
+                    next_beam.append((transposed,rows+(r,),cols,new_mapping,new_label))
+        beam=next_beam
+        canonical.append(best)
+
+    transposed,rows,cols,mapping,label=beam[0]
+
+    #digits missing from the puzzle get the remaining labels in increasing order
+    for d in range(1,10):
+        if not mapping[d]:
+            mapping[d]=label
+            label+=1
+
+    return bytes(v for row in canonical for v in row),(bool(transposed),rows,cols,tuple(mapping))
+
+def toCanonical(values:bytes,transform:tuple)->bytes:
+    """
+    Function that applies a transform of 'canonicalize' to a board (e.g. the solution of the original puzzle).
+
+    Args:
+        values (bytes): the 81 cell values.
+        transform (tuple): transform returned by 'canonicalize'.
+
+    Returns:
+        bytes: the 81 transformed values.
+    """
+    transposed,rows,cols,mapping=transform
+    out=bytearray(81)
+    for i,r in enumerate(rows):
+        for j,c in enumerate(cols):
+            out[i*9+j]=mapping[values[c*9+r] if transposed else values[r*9+c]]
+    return bytes(out)
+
+def fromCanonical(values:bytes,transform:tuple)->bytes:
+    """
+    Function that applies the inverse of a transform of 'canonicalize' (e.g. to the solution of the canonical puzzle).
+
+    Args:
+        values (bytes): the 81 canonical cell values.
+        transform (tuple): transform returned by 'canonicalize'.
+
+    Returns:
+        bytes: the 81 values in the frame of the original puzzle.
+    """
+    transposed,rows,cols,mapping=transform
+    inverse=[0]*10
+    for d in range(1,10):
+        inverse[mapping[d]]=d
+    out=bytearray(81)
+    for i,r in enumerate(rows):
+        for j,c in enumerate(cols):
+            if transposed:
+                out[c*9+r]=inverse[values[i*9+j]]
+            else:
+                out[r*9+c]=inverse[values[i*9+j]]
+    return bytes(out)
@@ -4,7 +4,10 @@ INITIAL_DOMAIN=set([x for x in range(1,10)])
 
 class Cell:
     
-    def __init__(self,_i:int,_j:int,_value:int=0):
+    #no per-cell __dict__: the GA creates and copies millions of cells
+    __slots__=("value","i","j","isEmpty","domain","visitedDomain")
+    
+    def __init__(self,_i:int,_j:int,_value:int=0,_size:int=9):
         """
         sudoku cell constructor. All cells have row and col indexes (ints), value (int) and isEmpty (bool).
         Empty cells have in addition 'domain' and 'visitedDomain'.
@@ -13,6 +16,7 @@ class Cell:
             _i (int): row index of the cell.
             _j (int): col index of the cell.
             _value (int, optional): value of the cell. Defaults to 0 for empty cells.
+            _size (int, optional): number of digits of the board, the initial domain of an empty cell is 1.._size. Defaults to 9.
         """
         
         self.value =int(_value)
@@ -23,9 +27,31 @@ class Cell:
             self.isEmpty=False
         else:
             self.isEmpty=True
-            self.domain=set(INITIAL_DOMAIN)
+            self.domain=set(INITIAL_DOMAIN) if _size==9 else set(range(1,_size+1))
             self.visitedDomain=set()
             
+    def clone(self,domains:bool=True)->Cell:
+        """
+        Function that copies the cell without going through copy.deepcopy.
+
+        Args:
+            domains (bool, optional): 'True' to copy 'domain' and 'visitedDomain' of an empty cell, 'False' for a cell that only
+                keeps indexes, value and isEmpty (the GA individuals never use the domains). Defaults to True.
+
+        Returns:
+            Cell: the copy.
+        """
+        cell=Cell.__new__(Cell)
+        cell.value=self.value
+        cell.i=self.i
+        cell.j=self.j
+        cell.isEmpty=self.isEmpty
+        #the empty cells of the GA children have no domain
+        if domains and self.isEmpty and hasattr(self,"domain"):
+            cell.domain=set(self.domain)
+            cell.visitedDomain=set(self.visitedDomain)
+        return cell
+    
     def __str__(self):
         """
         toString function.
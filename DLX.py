@@ -0,0 +1,259 @@
+"""
+Exact cover solver (Algorithm X on dancing links).
+
+A sudoku with box size n and size=n*n digits is the exact cover of 4*size^2 constraints (324 on a 9x9 board) by the size^3
+candidate placements (cell, digit). Each placement covers one constraint of each kind:
+
+    cell:       the cell holds a digit
+    row-digit:  the row holds the digit
+    col-digit:  the col holds the digit
+    box-digit:  the square holds the digit
+
+The matrix is a toroidal doubly linked list stored in flat integer lists ('L', 'R', 'U', 'D' and 'C', the column of each
+node), allocated once by the constructor: the search only relinks existing nodes and never allocates. Node 0 is the root,
+nodes 1..4*size^2 are the column headers and the 4 nodes of placement p=cell*size+digit-1 are 'first_node'+4*p .. +3.
+"""
+from __future__ import annotations
+
+from Units import boxSize,unitTables
+
+class DancingLinks:
+
+    def __init__(self,_values:list[int]):
+        """
+        dancing links board constructor. The givens are selected at once, so the search starts from the empty cells.
+
+        Args:
+            _values (list[int]): the cell values in row-major order (81 for a 9x9 board, 256 for 16x16...), 0 for empty cells.
+        """
+        n=boxSize(len(_values))
+        size=n*n
+        n_cells=size*size
+        self.size=size
+
+        self.value=[int(x) for x in _values]
+        if max(self.value)>size:
+            raise ValueError("Expected values up to "+str(size)+", found "+str(max(self.value)))
+
+        n_columns=4*n_cells
+        self.first_node=1+n_columns
+        n_nodes=self.first_node+4*size*n_cells
+
+        #column headers linked in a ring with the root, each column an empty vertical ring
+        L=list(range(-1,n_nodes-1))
+        R=list(range(1,n_nodes+1))
+        L[0]=n_columns
+        R[n_columns]=0
+        U=list(range(n_nodes))
+        D=list(range(n_nodes))
+        C=list(range(n_nodes))
+
+        #S[c]: number of nodes in column c
+        S=[0]*(1+n_columns)
+
+        box_of=unitTables(n).box_of
+        node=self.first_node
+        for k in range(n_cells):
+            r,c=divmod(k,size)
+            b=box_of[r][c]
+            for d in range(size):
+                columns=(1+k,1+n_cells+r*size+d,1+2*n_cells+c*size+d,1+3*n_cells+b*size+d)
+                for t,column in enumerate(columns):
+                    x=node+t
+                    #horizontal ring of the 4 nodes of the placement
+                    L[x]=node+(t+3)%4
+                    R[x]=node+(t+1)%4
+                    #append to the bottom of the column
+                    C[x]=column
+                    U[x]=U[column]
+                    D[x]=column
+                    D[U[column]]=x
+                    U[column]=x
+                    S[column]+=1
+                node+=4
+
+        self.L=L
+        self.R=R
+        self.U=U
+        self.D=D
+        self.C=C
+        self.S=S
+
+        #placements of the search, one per level
+        self.selected=[0]*n_cells
+        self.level=0
+
+        #number of link updates made by the covers
+        self.counters={"updates":0}
+
+        #the givens are selected first: two givens that share a constraint make the puzzle unsatisfiable
+        self.consistent=True
+        for k,x in enumerate(self.value):
+            if x:
+                node=self.first_node+4*(k*size+x-1)
+                if any(R[L[C[node+t]]]!=C[node+t] for t in range(4)):
+                    self.consistent=False
+                    break
+                for t in range(4):
+                    self.__cover(C[node+t])
+
+    def __cover(self,c:int):
+        """
+        Function that removes column 'c' from the header ring and the rows of its nodes from the other columns.
+
+        Args:
+            c (int): column header node.
+        """
+        L=self.L
+        R=self.R
+        U=self.U
+        D=self.D
+        C=self.C
+        S=self.S
+        #each row has 4 nodes: 3 updates per row of the column
+        self.counters["updates"]+=3*S[c]
+        R[L[c]]=R[c]
+        L[R[c]]=L[c]
+        i=D[c]
+        while i!=c:
+            j=R[i]
+            while j!=i:
+                D[U[j]]=D[j]
+                U[D[j]]=U[j]
+                S[C[j]]-=1
+                j=R[j]
+            i=D[i]
+
+    def __uncover(self,c:int):
+        """
+        Function that reverts '__cover(c)', relinking the nodes in the reverse order.
+
+        Args:
+            c (int): column header node.
+        """
+        L=self.L
+        R=self.R
+        U=self.U
+        D=self.D
+        C=self.C
+        S=self.S
+        i=U[c]
+        while i!=c:
+            j=L[i]
+            while j!=i:
+                S[C[j]]+=1
+                D[U[j]]=j
+                U[D[j]]=j
+                j=L[j]
+            i=U[i]
+        R[L[c]]=c
+        L[R[c]]=c
+
+    def __chooseColumn(self)->int:
+        """
+        Function that returns the column with the fewest nodes (the constraint with the fewest placements left).
+
+        Returns:
+            int: column header node, 0 if every column is covered.
+        """
+        R=self.R
+        S=self.S
+        c=R[0]
+        best=c
+        best_size=S[c] if c else 0
+        while c:
+            if S[c]<best_size:
+                best=c
+                best_size=S[c]
+                if best_size==0:
+                    break
+            c=R[c]
+        return best
+
+    def isSolved(self)->bool:
+        """
+        Function that checks if every constraint is covered.
+
+        Returns:
+            bool: 'True' if the board is a solution, 'False' otherwise.
+        """
+        return self.consistent and self.R[0]==0
+
+    def solve(self,observer=None):
+        """
+        Algorithm X: the column with the fewest nodes is covered and its rows (placements) are tried in order.
+        The solution is left in 'value'.
+
+        Args:
+            observer (SolverObserver, optional): receives the assignments and backtracks (see Observer). Defaults to None.
+
+        Returns:
+            tuple[int,int]: restored nodes and assigned nodes.
+        """
+        restored_nodes=0
+        assigned_nodes=0
+
+        if not self.consistent:
+            return restored_nodes,assigned_nodes
+
+        R=self.R
+        L=self.L
+        D=self.D
+        C=self.C
+        selected=self.selected
+        first_node=self.first_node
+        size=self.size
+        level=0
+
+        c=self.__chooseColumn()
+        if c==0:
+            return restored_nodes,assigned_nodes
+        self.__cover(c)
+        r=D[c]
+
+        while True:
+
+            #every row of column 'c' failed: back to the previous level
+            if r==c:
+                self.__uncover(c)
+                if level==0:
+                    break
+                level-=1
+                r=selected[level]
+                c=C[r]
+                restored_nodes+=1
+                if observer is not None:
+                    observer.backtracked((r-first_node)//4//size)
+                j=L[r]
+                while j!=r:
+                    self.__uncover(C[j])
+                    j=L[j]
+                r=D[r]
+                continue
+
+            #select the placement of row 'r'
+            selected[level]=r
+            level+=1
+            assigned_nodes+=1
+            if observer is not None:
+                k,d=divmod((r-first_node)//4,size)
+                observer.nodeAssigned(k,d+1)
+            j=R[r]
+            while j!=r:
+                self.__cover(C[j])
+                j=R[j]
+
+            #solution found
+            if R[0]==0:
+                break
+
+            c=self.__chooseColumn()
+            self.__cover(c)
+            r=D[c]
+
+        self.level=level
+        for node in selected[:level]:
+            k,d=divmod((node-first_node)//4,size)
+            self.value[k]=d+1
+
+        return restored_nodes,assigned_nodes
@@ -0,0 +1,430 @@
+"""
+Genetic algorithm on a NumPy population.
+
+The whole population is a single (P, size, size) uint8 array and the given cells are a shared (size, size) mask, so
+initialization, fitness, selection, crossover and mutation are vectorized over the population. Digit sets are masks of
+the bits 1..size: uint16 on the boards up to 15 digits (9x9), uint32 above (16x16, 25x25).
+"""
+from __future__ import annotations
+
+import math
+import time
+
+import numpy as np
+
+from Observer import lap
+from Units import boxSize
+from Budget import Budget,SOLVED,TIMEOUT
+
+#number of ones in each 16-bit mask
+POPCOUNT=np.zeros(1,dtype=np.uint8)
+for _ in range(16):
+    POPCOUNT=np.concatenate((POPCOUNT,POPCOUNT+1))
+
+#random pairs tried by a mutation to find a swap allowed by the domains
+SWAP_ATTEMPTS=10
+
+def maskType(size:int)->type:
+    """
+    Function that returns the integer type of the digit masks of the boards with 'size' digits.
+
+    Args:
+        size (int): number of digits.
+
+    Returns:
+        type: np.uint16 or np.uint32.
+    """
+    return np.uint16 if size<16 else np.uint32
+
+def popcount(masks:np.ndarray)->np.ndarray:
+    """
+    Function that counts the digits in each mask.
+
+    Args:
+        masks (np.ndarray): uint16 or uint32 masks.
+
+    Returns:
+        np.ndarray: uint8 digit counts.
+    """
+    if masks.dtype==np.uint16:
+        return POPCOUNT[masks]
+    return POPCOUNT[masks & 0xFFFF]+POPCOUNT[masks>>16]
+
+def nthDigit(masks:np.ndarray,n:np.ndarray,size:int)->np.ndarray:
+    """
+    Function that returns the 'n'-th digit (from the lowest, starting from 0) of each mask.
+
+    Args:
+        masks (np.ndarray): masks of the bits 1..size.
+        n (np.ndarray): index of the digit in each mask, lower than its number of digits.
+        size (int): number of digits.
+
+    Returns:
+        np.ndarray: uint8 digits.
+    """
+    bits=(masks[:,None]>>np.arange(1,size+1,dtype=masks.dtype)) & 1
+    return (np.argmax(np.cumsum(bits,axis=1)>n[:,None],axis=1)+1).astype(np.uint8)
+
+class GAPopulation:
+
+    def __init__(self,_values,seed:int=None,domains=None):
+        """
+        genetic algorithm population constructor.
+
+        Args:
+            _values: the cell values of the puzzle in row-major order (81 for a 9x9 board, 256 for 16x16...), 0 for empty cells.
+            seed (int, optional): random seed, None for a random run. Defaults to None.
+            domains (optional): the candidate masks of a CP presolve (bit d-1 for digit d, see BitBoard), 0 for the givens.
+                Initialization and mutation only use the candidates of each cell. None for no restriction. Defaults to None.
+        """
+        size=boxSize(len(_values))**2
+        self.size=size
+        self.mask_type=maskType(size)
+        self.row_indexes=np.arange(size,dtype=np.uint8)
+
+        #fitness of a solution
+        self.target=2*size*size
+
+        self.givens=np.frombuffer(bytes(_values),dtype=np.uint8).reshape(size,size).copy()
+        self.given_mask=self.givens!=0
+        self.rng=np.random.default_rng(seed)
+
+        #digits missing from each row and the cols of its empty cells
+        self.missing=[np.setdiff1d(np.arange(1,size+1,dtype=np.uint8),self.givens[r]) for r in range(size)]
+        self.empty_cols=[np.flatnonzero(~self.given_mask[r]) for r in range(size)]
+
+        #rows with at least 2 empty cells can be mutated, 'free_cols[r]' lists their empty cols (padded)
+        self.free_count=np.array([len(cols) for cols in self.empty_cols])
+        self.mutable_rows=np.flatnonzero(self.free_count>=2)
+        self.free_cols=np.zeros((size,size),dtype=np.intp)
+        for r in range(size):
+            self.free_cols[r,:len(self.empty_cols[r])]=self.empty_cols[r]
+
+        #digits allowed in each empty cell, as masks of the bits 1..size
+        if domains is None:
+            self.domains=None
+            self.allowed=np.where(self.given_mask,0,(1<<(size+1))-2).astype(self.mask_type)
+        else:
+            self.domains=np.array(domains,dtype=self.mask_type).reshape(size,size)<<1
+            self.allowed=self.domains
+
+        self.population=None
+        self.fitness=None
+
+    def randomize(self,population_size:int):
+        """
+        Function that creates a random population: the empty cells of each row get a random permutation of the digits missing from the row.
+        With domains, the cells of a row are filled from the most constrained one and each takes a random digit still missing
+        from the row among its candidates (any missing digit if none is left).
+
+        Args:
+            population_size (int): number of individuals.
+        """
+        size=self.size
+        mask_type=self.mask_type
+        population=np.broadcast_to(self.givens,(population_size,size,size)).copy()
+        for r in range(size):
+            if not len(self.missing[r]):
+                continue
+            if self.domains is None:
+                rows=np.broadcast_to(self.missing[r],(population_size,len(self.missing[r])))
+                population[:,r,self.empty_cols[r]]=self.rng.permuted(rows,axis=1)
+                continue
+
+            #digits still missing from the row of each individual
+            left=np.full(population_size,np.bitwise_or.reduce(np.left_shift(mask_type(1),self.missing[r],dtype=mask_type)),dtype=mask_type)
+            for c in sorted(self.empty_cols[r],key=lambda c: popcount(self.domains[r,c])):
+                candidates=left & self.domains[r,c]
+                candidates=np.where(candidates==0,left,candidates)
+                n=(self.rng.random(population_size)*popcount(candidates)).astype(np.intp)
+                digits=nthDigit(candidates,n,size)
+                population[:,r,c]=digits
+                left^=np.left_shift(mask_type(1),digits,dtype=mask_type)
+        self.population=population
+        self.score()
+
+    @staticmethod
+    def fitnessOf(population:np.ndarray)->np.ndarray:
+        """
+        Function that computes the fitness of every individual: the number of distinct digits in each col and square.
+
+        Args:
+            population (np.ndarray): (P, size, size) array of boards.
+
+        Returns:
+            np.ndarray: (P,) fitness, 2*size*size (162 on a 9x9 board) for a solution.
+        """
+        size=population.shape[-1]
+        n=math.isqrt(size)
+        mask_type=maskType(size)
+        bits=np.left_shift(mask_type(1),population,dtype=mask_type)
+        cols=np.bitwise_or.reduce(bits,axis=1)
+        squares=np.bitwise_or.reduce(np.bitwise_or.reduce(bits.reshape(-1,n,n,n,n),axis=4),axis=2)
+        return popcount(cols).sum(axis=1,dtype=np.int32)+popcount(squares).sum(axis=(1,2),dtype=np.int32)
+
+    def score(self):
+        """
+        Function that updates the fitness of the population.
+        """
+        self.fitness=GAPopulation.fitnessOf(self.population)
+
+    def select(self,n_random:int,n_best:int)->np.ndarray:
+        """
+        Selection function: 'n_random' random individuals plus the 'n_best' fittest ones.
+
+        Args:
+            n_random (int): number of random individuals.
+            n_best (int): number of fittest individuals.
+
+        Returns:
+            np.ndarray: selected individuals (copies).
+        """
+        size=len(self.population)
+        selected=[self.rng.choice(size,min(n_random,size),replace=False)]
+        if n_best>0:
+            n_best=min(n_best,size)
+            selected.append(np.argpartition(-self.fitness,n_best-1)[:n_best])
+        return self.population[np.concatenate(selected)]
+
+    def crossover(self,parents:np.ndarray,n:int,n_children:int)->np.ndarray:
+        """
+        Crossover function: random pairs of distinct parents generate 'n_children' children each.
+        A child takes the rows before a random crossover row from parent 1 and the others from parent 2.
+
+        Args:
+            parents (np.ndarray): parent boards.
+            n (int): total number of children.
+            n_children (int): children per pair of parents.
+
+        Returns:
+            np.ndarray: (n, size, size) children.
+        """
+        n_parents=len(parents)
+        n_pairs=-(-n//n_children)
+        parent1=self.rng.integers(n_parents,size=n_pairs)
+        parent2=(parent1+self.rng.integers(1,n_parents,size=n_pairs))%n_parents
+        parent1=np.repeat(parent1,n_children)[:n]
+        parent2=np.repeat(parent2,n_children)[:n]
+
+        #at least one row from parent1 and at least one row from parent 2
+        crossover_row_index=self.rng.integers(1,self.size,size=n,dtype=np.uint8)
+        from_parent1=self.row_indexes[None,:,None]<crossover_row_index[:,None,None]
+
+        return np.where(from_parent1,parents[parent1],parents[parent2])
+
+    def mutate(self,n_individuals:int,n_rows:int,n_cells_per_row:int):
+        """
+        Mutation function: swaps 2 random empty cells in random rows of random individuals.
+        With domains, only swaps that keep both digits among the candidates of their new cells are made.
+
+        Args:
+            n_individuals (int): number of individuals to mutate.
+            n_rows (int): number of rows to mutate per individual.
+            n_cells_per_row (int): number of swaps per row.
+        """
+        if len(self.mutable_rows)==0 or n_individuals<=0:
+            return
+        population=self.population
+        rng=self.rng
+        individuals=rng.choice(len(population),min(n_individuals,len(population)),replace=False)
+        for _ in range(n_rows):
+            rows=self.mutable_rows[rng.integers(len(self.mutable_rows),size=len(individuals))]
+            free=self.free_count[rows]
+            for _ in range(n_cells_per_row):
+                pending=np.arange(len(individuals))
+                for _ in range(SWAP_ATTEMPTS if self.domains is not None else 1):
+                    ind=individuals[pending]
+                    row=rows[pending]
+                    #2 distinct random empty cells of the row
+                    cell1=(rng.random(len(pending))*free[pending]).astype(np.intp)
+                    cell2=(rng.random(len(pending))*(free[pending]-1)).astype(np.intp)
+                    cell2+=cell2>=cell1
+                    col1=self.free_cols[row,cell1]
+                    col2=self.free_cols[row,cell2]
+
+                    digit1=population[ind,row,col1]
+                    digit2=population[ind,row,col2]
+                    allowed=(self.allowed[row,col2]>>digit1 & self.allowed[row,col1]>>digit2 & 1).astype(bool)
+
+                    population[ind[allowed],row[allowed],col1[allowed]]=digit2[allowed]
+                    population[ind[allowed],row[allowed],col2[allowed]]=digit1[allowed]
+
+                    pending=pending[~allowed]
+                    if not len(pending):
+                        break
+
+    def best(self)->tuple[int,np.ndarray]:
+        """
+        Function that returns the fittest individual.
+
+        Returns:
+            tuple[int,np.ndarray]: fitness and (size, size) board.
+        """
+        index=int(np.argmax(self.fitness))
+        return int(self.fitness[index]),self.population[index]
+
+    def __keepBest(self,fit:int,board:np.ndarray):
+        """
+        Function that keeps a copy of 'board' if it is the fittest individual found so far.
+        """
+        if fit>self.best_fit:
+            self.best_fit=fit
+            self.best_board=board.copy()
+
+    def step(self,population_size:int,n_random:int,n_best:int,n_children:int,n_mutations:int,n_rows_swap:int,n_cells_per_row_swap:int,observer=None):
+        """
+        Function that replaces the population with the next generation: selection, crossover, mutation and fitness.
+
+        Args:
+            population_size (int): number of individuals.
+            n_random (int): number of random individuals selected.
+            n_best (int): number of fittest individuals selected.
+            n_children (int): children per pair of parents.
+            n_mutations (int): number of individuals to mutate.
+            n_rows_swap (int): number of rows to mutate per individual.
+            n_cells_per_row_swap (int): number of swaps per row.
+            observer (SolverObserver, optional): receives the time of each phase. Defaults to None.
+        """
+        if observer is not None:
+            start=time.perf_counter()
+
+        parents=self.select(n_random,n_best)
+
+        if observer is not None:
+            start=lap(observer,"selection",start)
+
+        children=self.crossover(parents,population_size-len(parents),n_children)
+
+        self.population=np.concatenate((parents,children))
+
+        if observer is not None:
+            start=lap(observer,"crossover",start)
+
+        self.mutate(n_mutations,n_rows_swap,n_cells_per_row_swap)
+
+        if observer is not None:
+            start=lap(observer,"mutation",start)
+
+        self.score()
+
+        if observer is not None:
+            lap(observer,"fitness",start)
+
+    def emigrants(self,n:int)->np.ndarray:
+        """
+        Function that returns copies of the 'n' fittest individuals.
+
+        Args:
+            n (int): number of individuals.
+
+        Returns:
+            np.ndarray: (n, size, size) boards.
+        """
+        n=min(n,len(self.population))
+        return self.population[np.argpartition(-self.fitness,n-1)[:n]]
+
+    def immigrate(self,boards:np.ndarray):
+        """
+        Function that replaces the least fit individuals with 'boards'.
+
+        Args:
+            boards (np.ndarray): (n, size, size) boards.
+        """
+        n=min(len(boards),len(self.population))
+        if n==0:
+            return
+        worst=np.argpartition(self.fitness,n-1)[:n]
+        self.population[worst]=boards[:n]
+        self.fitness[worst]=GAPopulation.fitnessOf(boards[:n])
+
+    def solve(self, population_size:int=3000, selection_rate:float=0.25, random_selection_rate:float=0.25, n_children:int=4, mutation_rate:float=0.3, n_rows_swap:int=3, n_cells_per_row_swap:int=1, n_generations_no_improvement:int=30, migration=None, observer=None, budget:Budget=None):
+        """
+        Genetic Algorithm with the same steps and parameters as 'Sudoku.sudokuSolverGA'. The solution is left in 'solution'
+        ('None' if the run is stopped by 'migration' or by the budget). The fittest individual of all the restarts is kept
+        in 'best_board' and 'best_fit', and the outcome in 'status' (see Budget, None when stopped by 'migration').
+
+        Args:
+            migration (callable, optional): function called with the population and the total generations after every generation.
+                It can exchange individuals and returns 'False' to stop the run. Defaults to None.
+            observer (SolverObserver, optional): receives the generation, restart and solution events and the time of each phase
+                (see Observer). Defaults to None.
+            budget (Budget, optional): deadline and maximum number of generations, None for no limit. Defaults to None.
+
+        Returns:
+            tuple[int,int]: number of restarts (iterations) and total generations.
+        """
+        iteration=1
+        total_generations=1
+
+        n_random=int(population_size*random_selection_rate)
+        n_best=int(population_size*selection_rate)
+        n_mutations=int(population_size*mutation_rate)
+
+        self.solution=None
+        self.status=None
+        self.best_fit=-1
+        self.best_board=None
+
+        while True:
+
+            #initial generation
+            if observer is not None:
+                start=time.perf_counter()
+            self.randomize(population_size)
+            if observer is not None:
+                lap(observer,"initialization",start)
+
+            best_fit,board=self.best()
+            self.__keepBest(best_fit,board)
+            if best_fit==self.target:
+                if observer is not None:
+                    observer.solutionFound(iteration,0)
+                self.solution=board.copy()
+                self.status=SOLVED
+                return iteration,total_generations
+
+            generation=1
+
+            restart=0
+
+            while True:
+
+                self.step(population_size,n_random,n_best,n_children,n_mutations,n_rows_swap,n_cells_per_row_swap,observer)
+
+                if migration is not None and not migration(self,total_generations):
+                    return iteration,total_generations
+
+                fit,board=self.best()
+                self.__keepBest(fit,board)
+
+                if observer is not None:
+                    observer.generationCompleted(iteration,generation,fit,float(self.fitness.mean()),restart)
+
+                if fit==self.target:
+                    if observer is not None:
+                        observer.solutionFound(iteration,generation)
+                    self.solution=board.copy()
+                    self.status=SOLVED
+                    return iteration,total_generations
+
+                if budget is not None and budget.exhausted(total_generations):
+                    self.status=TIMEOUT
+                    return iteration,total_generations
+
+                if fit>best_fit:
+                    best_fit=fit
+                    restart=0
+
+                generation+=1
+
+                restart+=1
+
+                total_generations+=1
+
+                if restart>n_generations_no_improvement:
+
+                    if observer is not None:
+                        observer.restartTriggered(iteration,best_fit)
+
+                    iteration+=1
+                    break
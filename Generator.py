@@ -0,0 +1,169 @@
+"""
+Puzzle generator with difficulty grading.
+
+A puzzle is made in three steps:
+
+    grid:     a random full grid, solved by the seeded bitmask CP search from the empty board.
+    removal:  the clues are removed one at a time in random order, putting back every clue whose removal gives a
+              second solution (see BitBoard.countSolutions), so the puzzle keeps the grid as its unique solution.
+    grading:  the puzzle is graded by the weakest propagation level that solves it without search, like the folders
+              of 'examples': "easy" (naked singles), "normal" (hidden singles), "medium" (pairs and pointing),
+              "hard" (search needed, the search nodes of the "pointing" level are reported).
+
+Every puzzle depends only on its seed, so the puzzles are the same with any number of worker processes.
+"""
+from __future__ import annotations
+
+import os
+import random
+import contextlib
+from multiprocessing import Pool
+from typing import Iterator
+
+from BitBoard import BitBoard
+from PuzzleIO import formatLine
+
+DIFFICULTIES=("easy","normal","medium","hard")
+
+#propagation level that grades a puzzle when it solves it without search
+GRADING_LEVELS=(("easy","naked"),("normal","hidden"),("medium","pointing"))
+
+def randomGrid(seed:int,n:int=3)->bytes:
+    """
+    Function that builds a random full grid.
+
+    Args:
+        seed (int): random seed.
+        n (int, optional): box size (3 for 9x9, 4 for 16x16). Defaults to 3.
+
+    Returns:
+        bytes: the cell values of the grid in row-major order.
+    """
+    bitboard=BitBoard([0]*n**4,"hidden",seed)
+    bitboard.solve()
+    return bytes(bitboard.value)
+
+def removeClues(grid:bytes,seed:int,min_clues:int=0,propagation:str="hidden")->bytes:
+    """
+    Function that removes the clues of a full grid in random order, as long as the puzzle keeps a unique solution.
+
+    Args:
+        grid (bytes): the cell values of a full grid.
+        seed (int): random seed of the removal order.
+        min_clues (int, optional): clues below which no more clues are removed. Defaults to 0.
+        propagation (str, optional): propagation level of the uniqueness checks. Defaults to "hidden".
+
+    Returns:
+        bytes: the cell values of the puzzle, 0 for empty cells.
+    """
+    puzzle=bytearray(grid)
+    order=list(range(len(puzzle)))
+    random.Random(seed).shuffle(order)
+
+    clues=len(puzzle)
+    for k in order:
+        if clues<=min_clues:
+            break
+        puzzle[k]=0
+        if BitBoard(puzzle,propagation).countSolutions(2)[0]==1:
+            clues-=1
+        else:
+            puzzle[k]=grid[k]
+    return bytes(puzzle)
+
+def grade(puzzle:bytes)->dict:
+    """
+    Function that grades a puzzle with the propagation and search counters of the bitmask CP solver.
+
+    Args:
+        puzzle (bytes): the cell values of the puzzle.
+
+    Returns:
+        dict: 'difficulty' (one of DIFFICULTIES), 'propagation' (level used for the counters), restored and assigned nodes
+            and the deductions of each propagation rule.
+    """
+    restored_nodes,assigned_nodes=0,0
+    for difficulty,propagation in GRADING_LEVELS:
+        bitboard=BitBoard(puzzle,propagation)
+        if bitboard.presolve() and bitboard.isSolved():
+            break
+    else:
+        #the strongest level needs search: graded by its search nodes
+        difficulty="hard"
+        bitboard=BitBoard(puzzle,propagation)
+        restored_nodes,assigned_nodes=bitboard.solve()
+
+    report={"difficulty":difficulty,"propagation":propagation,"restored_nodes":restored_nodes,"assigned_nodes":assigned_nodes}
+    report.update(bitboard.counters)
+    return report
+
+def generateOne(seed:int,n:int=3,min_clues:int=0)->dict:
+    """
+    Function that generates and grades a puzzle.
+
+    Args:
+        seed (int): random seed, the puzzle only depends on it.
+        n (int, optional): box size. Defaults to 3.
+        min_clues (int, optional): clues below which no more clues are removed. Defaults to 0.
+
+    Returns:
+        dict: seed, puzzle and solution lines, number of clues and the counters of 'grade'.
+    """
+    grid=randomGrid(seed,n)
+    puzzle=removeClues(grid,seed,min_clues)
+    result={"seed":seed,"puzzle":formatLine(puzzle),"solution":formatLine(grid),"clues":len(puzzle)-puzzle.count(0)}
+    result.update(grade(puzzle))
+    return result
+
+def _generateTask(task:tuple)->dict:
+    """
+    Pool entry point: unpacks a (seed, n, min_clues) task for 'generateOne'.
+    """
+    return generateOne(*task)
+
+def generatePuzzles(count:int,seed:int=0,workers:int=None,n:int=3,min_clues:int=0,difficulties:tuple=DIFFICULTIES,
+                    chunksize:int=16)->Iterator[dict]:
+    """
+    Function that generates puzzles across a pool of worker processes and streams them back as soon as they are graded.
+    Puzzle i is generated from seed 'seed'+i; the puzzles of the other difficulties are skipped.
+
+    Args:
+        count (int): number of puzzles to generate.
+        seed (int, optional): seed of the first puzzle. Defaults to 0.
+        workers (int, optional): number of processes, 'None' for one per core. With 1 worker the puzzles are generated in this process. Defaults to None.
+        n (int, optional): box size. Defaults to 3.
+        min_clues (int, optional): clues below which no more clues are removed. Defaults to 0.
+        difficulties (tuple, optional): difficulties of the puzzles to keep. Defaults to DIFFICULTIES.
+        chunksize (int, optional): number of seeds sent to a worker at a time. Defaults to 16.
+
+    Yields:
+        dict: the result of 'generateOne' for each puzzle, in seed order.
+    """
+    for difficulty in difficulties:
+        if difficulty not in DIFFICULTIES:
+            raise ValueError("Expected difficulties in "+str(DIFFICULTIES)+", found "+str(difficulty))
+
+    if workers is None:
+        workers=os.cpu_count() or 1
+
+    filtered=any(difficulty not in difficulties for difficulty in DIFFICULTIES)
+
+    with contextlib.ExitStack() as stack:
+        pool=stack.enter_context(Pool(workers)) if workers>1 else None
+
+        found=0
+        next_seed=seed
+        while found<count:
+            #the seeds are sent in rounds, with more seeds than missing puzzles when some difficulties are skipped
+            missing=count-found
+            size=max(missing,workers*chunksize) if filtered else missing
+            tasks=[(s,n,min_clues) for s in range(next_seed,next_seed+size)]
+            next_seed+=size
+
+            results=map(_generateTask,tasks) if pool is None else pool.imap(_generateTask,tasks,chunksize)
+            for result in results:
+                if result["difficulty"] in difficulties:
+                    found+=1
+                    yield result
+                    if found>=count:
+                        return
@@ -0,0 +1,145 @@
+"""
+Island model genetic algorithm.
+
+K subpopulations ('GAPopulation') evolve in separate processes with independent random seeds. Every 'migration_interval'
+generations each island sends copies of its fittest individuals to another island (the next one on a ring, or a random one),
+where they replace the least fit individuals. The first island that finds a solution stops all the others.
+
+All the islands share one budget: the deadline is the same for every island and each island may run 'max_generations'
+generations. When the budget runs out the fittest board of all the islands is returned with the "timeout" status.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import multiprocessing
+
+import numpy as np
+
+from GAPopulation import GAPopulation
+from Observer import SolverObserver
+from Budget import Budget,SOLVED,TIMEOUT
+from Race import raceProcesses
+
+TOPOLOGIES=("ring","random")
+
+#seconds the islands are given past the deadline to report their fittest board
+DEADLINE_GRACE=5.0
+
+class _SolutionRecorder(SolverObserver):
+    """
+    Observer of an island that keeps the generation at which the solution was found.
+    """
+
+    def __init__(self):
+        self.generation=None
+
+    def solutionFound(self,iteration:int,generation:int):
+        self.generation=generation
+
+def _island(index:int,values:bytes,seed,parameters:dict,inboxes:list,results,stop,
+            n_islands:int,migration_interval:int,n_migrants:int,topology:str,budget:Budget):
+    """
+    Island process: runs a 'GAPopulation' and exchanges migrants through the inboxes until a solution is found by any island
+    or the budget runs out. Puts (index, iteration, generation of the solution or None, total generations, status, reason,
+    best fitness, best board values or None) in 'results', the best board being the solution of a solved island.
+    """
+    #migrants left in the inboxes must not keep the process alive
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+
+    population=GAPopulation(values,seed)
+
+    def migration(population:GAPopulation,total_generations:int)->bool:
+        if stop.is_set():
+            return False
+
+        if n_islands>1 and total_generations%migration_interval==0:
+            if topology=="ring":
+                target=(index+1)%n_islands
+            else:
+                target=(index+1+int(population.rng.integers(n_islands-1)))%n_islands
+            inboxes[target].put(population.emigrants(n_migrants))
+
+        while True:
+            try:
+                boards=inboxes[index].get_nowait()
+            except queue.Empty:
+                break
+            population.immigrate(boards)
+        return True
+
+    recorder=_SolutionRecorder()
+    iteration,total_generations=population.solve(migration=migration,budget=budget,observer=recorder,**parameters)
+
+    if population.solution is not None:
+        stop.set()
+        results.put((index,iteration,recorder.generation,total_generations,SOLVED,None,population.best_fit,population.solution.tobytes()))
+    else:
+        board=population.best_board.tobytes() if population.best_board is not None else None
+        reason=budget.reason if population.status==TIMEOUT else None
+        results.put((index,iteration,None,total_generations,population.status,reason,population.best_fit,board))
+
+def solveIslands(values:bytes,n_islands:int=None,migration_interval:int=10,n_migrants:int=5,topology:str="ring",seed:int=None,
+                 timeout:float=None,max_generations:int=None,**parameters)->dict:
+    """
+    Function that solves a puzzle with the island model genetic algorithm.
+
+    Args:
+        values (bytes): the cell values of the puzzle, 0 for empty cells.
+        n_islands (int, optional): number of islands (processes), 'None' for one per core. Defaults to None.
+        migration_interval (int, optional): generations between two migrations. Defaults to 10.
+        n_migrants (int, optional): individuals sent at every migration. Defaults to 5.
+        topology (str, optional): "ring" or "random". Defaults to "ring".
+        seed (int, optional): random seed from which the seeds of the islands are derived. Defaults to None.
+        timeout (float, optional): seconds before every island stops, None for no limit. Defaults to None.
+        max_generations (int, optional): generations (over all the restarts) of each island before it stops, None for no limit. Defaults to None.
+        **parameters: GAPopulation.solve parameters (population_size, mutation_rate...), used by every island.
+
+    Returns:
+        dict: 'status' ("solved" or "timeout", see Budget), 'reason' ("deadline" or "budget" for a timeout), 'solution' (cell
+            values, None if no island found it), 'board' (the solution, or the fittest board of all the islands on a timeout),
+            'island' (index of the winner or of the fittest island), its 'iteration' and 'total_generations', and the 'generation'
+            of the solution in its last iteration (None on a timeout).
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError("Expected a topology in "+str(TOPOLOGIES)+", found "+str(topology))
+
+    if n_islands is None:
+        n_islands=os.cpu_count() or 1
+
+    seeds=np.random.SeedSequence(seed).spawn(n_islands)
+
+    #one budget for all the islands, its deadline is an absolute perf_counter value
+    budget=Budget.of(timeout,max_generations)
+
+    inboxes=[multiprocessing.Queue() for _ in range(n_islands)]
+    results=multiprocessing.Queue()
+    stop=multiprocessing.Event()
+
+    islands=[multiprocessing.Process(target=_island,args=(index,bytes(values),seeds[index],parameters,inboxes,results,stop,
+                                                         n_islands,migration_interval,n_migrants,topology,budget),daemon=True)
+             for index in range(n_islands)]
+
+    winner={"status":None,"reason":None,"solution":None,"board":None,"island":None,"iteration":None,"generation":None,"total_generations":None}
+    best_fit=-1
+
+    def handle(result:tuple)->bool:
+        nonlocal winner,best_fit
+        index,iteration,generation,total_generations,status,reason,fit,board=result
+        if status==SOLVED:
+            winner={"status":SOLVED,"reason":None,"solution":board,"board":board,"island":index,
+                    "iteration":iteration,"generation":generation,"total_generations":total_generations}
+            return True
+        if fit>best_fit:
+            best_fit=fit
+            winner={"status":status,"reason":reason,"solution":None,"board":board,"island":index,
+                    "iteration":iteration,"generation":None,"total_generations":total_generations}
+        return False
+
+    #the islands stop at the deadline by themselves, the race only ends those that missed it by more than the grace period
+    deadline=budget.deadline+DEADLINE_GRACE if budget is not None and budget.deadline is not None else None
+    if not raceProcesses(islands,results,handle,deadline,stop.set):
+        winner.update(status=TIMEOUT,reason="deadline")
+
+    return winner
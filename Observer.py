@@ -0,0 +1,139 @@
+"""
+Solver instrumentation.
+
+The CP, GA and SA solvers take an optional 'observer' and call its methods on the events of the search. Without an observer
+a solver only pays an 'is not None' check per event and the phase timers are never read, so the hot loops keep their speed.
+Subclass 'SolverObserver' and override the events of interest, e.g. to export them to a metrics pipeline.
+"""
+from __future__ import annotations
+
+import time
+
+def lap(observer:SolverObserver,phase:str,start:float)->float:
+    """
+    Function that reports the time elapsed since 'start' as a phase of 'observer'.
+
+    Args:
+        observer (SolverObserver): observer of the solver.
+        phase (str): phase name.
+        start (float): perf_counter value at the start of the phase.
+
+    Returns:
+        float: perf_counter value at the end of the phase, the start of the next one.
+    """
+    now=time.perf_counter()
+    observer.phaseTimed(phase,now-start)
+    return now
+
+class SolverObserver:
+    """
+    Observer that ignores every event. Cells are given as flat indexes (row*size+col, row*9+col on a 9x9 board).
+    """
+
+    def nodeAssigned(self,cell:int,value:int):
+        """CP and DLX: 'value' is tried in the empty 'cell'."""
+
+    def backtracked(self,cell:int):
+        """CP and DLX: the value tried in 'cell' failed and is undone."""
+
+    def propagated(self,n:int):
+        """CP: the propagation after an assignment made 'n' domain reductions and forced assignments."""
+
+    def generationCompleted(self,iteration:int,generation:int,max_fitness:int,avg_fitness:float,stagnation:int):
+        """GA: a generation is complete, 'stagnation' generations passed since the best fitness last improved."""
+
+    def chainCompleted(self,iteration:int,chain:int,fitness:int,temperature:float,stagnation:int):
+        """SA: a chain of moves at 'temperature' is complete, 'stagnation' chains passed since the best fitness last improved."""
+
+    def restartTriggered(self,iteration:int,best_fitness:int):
+        """GA: the population of restart 'iteration' is stuck at 'best_fitness' and a new random population is created.
+        SA: the annealing of restart 'iteration' is stuck at 'best_fitness' and the temperature is reset (reheat)."""
+
+    def searchRestarted(self,run:int,max_depth:int,cutoff:int):
+        """CP (restart policy): run 'run' used up its 'cutoff' backtracks, 'max_depth' is the deepest level it reached."""
+
+    def solutionFound(self,iteration:int,generation:int):
+        """GA: a solution was found at 'generation' of restart 'iteration' (generation 0 for the initial population).
+        Island GA: the same event of the winning island. SA: a solution was found in chain 'generation' of restart 'iteration'."""
+
+    def phaseTimed(self,phase:str,seconds:float):
+        """GA: a phase ("initialization", "selection", "crossover", "mutation", "fitness") of a generation took 'seconds'."""
+
+class MetricsObserver(SolverObserver):
+    """
+    Observer that counts the events, sums the time of each phase and keeps the fitness of every generation.
+    """
+
+    def __init__(self):
+        self.counters={"assigned_nodes":0,"backtracks":0,"propagations":0,"generations":0,"chains":0,"restarts":0,"search_restarts":0}
+        self.phase_times={}
+        self.history=[]
+
+    def nodeAssigned(self,cell:int,value:int):
+        self.counters["assigned_nodes"]+=1
+
+    def backtracked(self,cell:int):
+        self.counters["backtracks"]+=1
+
+    def propagated(self,n:int):
+        self.counters["propagations"]+=n
+
+    def generationCompleted(self,iteration:int,generation:int,max_fitness:int,avg_fitness:float,stagnation:int):
+        self.counters["generations"]+=1
+        self.history.append((iteration,generation,max_fitness,avg_fitness))
+
+    def chainCompleted(self,iteration:int,chain:int,fitness:int,temperature:float,stagnation:int):
+        self.counters["chains"]+=1
+
+    def restartTriggered(self,iteration:int,best_fitness:int):
+        self.counters["restarts"]+=1
+
+    def searchRestarted(self,run:int,max_depth:int,cutoff:int):
+        self.counters["search_restarts"]+=1
+
+    def phaseTimed(self,phase:str,seconds:float):
+        self.phase_times[phase]=self.phase_times.get(phase,0.0)+seconds
+
+    def metrics(self)->dict:
+        """
+        Function that returns the collected metrics.
+
+        Returns:
+            dict: event counters, total seconds of each phase and (iteration, generation, max fitness, avg fitness) of every generation.
+        """
+        return {"counters":dict(self.counters),"phase_times":dict(self.phase_times),"history":list(self.history)}
+
+class PrintObserver(SolverObserver):
+    """
+    Observer that prints the progress of the GA and of the SA on stdout.
+    """
+
+    def __init__(self,target:int=162):
+        """
+        Args:
+            target (int, optional): fitness of a solution, 2*size*size. Defaults to 162 (9x9 board).
+        """
+        self.target=target
+
+    def generationCompleted(self,iteration:int,generation:int,max_fitness:int,avg_fitness:float,stagnation:int):
+        print("max:",max_fitness,"/",self.target,"",
+              "average:", "{:3.2f}".format(avg_fitness),
+              " generation:",generation,
+              " restart: ",stagnation )
+
+    def chainCompleted(self,iteration:int,chain:int,fitness:int,temperature:float,stagnation:int):
+        print("score:",fitness,"/",self.target,"",
+              "temperature:", "{:.4f}".format(temperature),
+              " chain:",chain,
+              " restart: ",iteration )
+
+    def restartTriggered(self,iteration:int,best_fitness:int):
+        print("\nreached a possible local minimum")
+        print("best fitness for this iteration:",best_fitness)
+        print("\nrestarting... ")
+
+    def solutionFound(self,iteration:int,generation:int):
+        if generation==0:
+            print("solution found at initial generation (generation 0)")
+        else:
+            print("\nsolution found at regeneration "+str(iteration)+" at generation "+str(generation))
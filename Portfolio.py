@@ -0,0 +1,97 @@
+"""
+Portfolio solver.
+
+Runtimes of the solvers vary a lot from puzzle to puzzle, so several configurations (CP with different propagation levels
+and search orders, the GA...) race on the same puzzle in separate processes. The first solution that is verified against
+the puzzle wins and the other processes are terminated.
+"""
+from __future__ import annotations
+
+import time
+import multiprocessing
+
+from Batch import solveOne,METHODS,ERROR
+from BitBoard import BitBoard
+from PuzzleIO import parseLine
+from Race import raceProcesses
+
+#default configurations: (name, method, solver options)
+CONFIGURATIONS=(
+    ("CP-forward","CP",{"backend":"bitmask","propagation":"forward"}),
+    ("CP-hidden","CP",{"backend":"bitmask","propagation":"hidden"}),
+    ("CP-pointing","CP",{"backend":"bitmask","propagation":"pointing"}),
+    ("CP-hidden-random","CP",{"backend":"bitmask","propagation":"hidden","seed":1}),
+    ("CP-pointing-random","CP",{"backend":"bitmask","propagation":"pointing","seed":2}),
+    ("DLX","DLX",{}),
+    ("GA","GA",{"backend":"numpy","presolve":"pointing","seed":0}),
+)
+
+def _engine(name:str,values:bytes,method:str,options:dict,results):
+    """
+    Engine process: solves the puzzle with one configuration and puts (name, 'solveOne' result or None, error or None) in 'results'.
+    """
+    try:
+        results.put((name,solveOne(0,values,method,options),None))
+    except Exception as e:
+        results.put((name,None,type(e).__name__+": "+str(e)))
+
+def isSolutionOf(values:bytes,solution:bytes)->bool:
+    """
+    Function that checks that 'solution' keeps the givens of the puzzle and that every row, col and square holds all the digits.
+
+    Args:
+        values (bytes): the cell values of the puzzle.
+        solution (bytes): the cell values of the solution.
+
+    Returns:
+        bool: 'True' if 'solution' solves the puzzle.
+    """
+    if len(solution)!=len(values) or any(v!=0 and v!=s for v,s in zip(values,solution)):
+        return False
+    return BitBoard(solution).isSolved()
+
+def solvePortfolio(puzzle:str|bytes,configurations:tuple=CONFIGURATIONS,timeout:float=None)->dict:
+    """
+    Function that races the configurations on a puzzle, one process each, and returns the first verified solution.
+    The remaining processes are terminated as soon as a winner is found, the timeout expires or every engine failed.
+
+    Args:
+        puzzle (str|bytes): puzzle line (see PuzzleIO) or the cell values.
+        configurations (tuple, optional): (name, method, solver options) of each engine. Defaults to CONFIGURATIONS.
+        timeout (float, optional): seconds before giving up, None to wait for the engines. Defaults to None.
+
+    Returns:
+        dict: 'solution' (puzzle line, None if not solved), 'engine' (name of the winner), 'time' (wall time to the first solution),
+            'result' (the 'solveOne' result of the winner) and 'failures' (engines that ended without a valid solution, with the reason).
+    """
+    values=parseLine(puzzle) if isinstance(puzzle,str) else bytes(puzzle)
+
+    for name,method,options in configurations:
+        if method not in METHODS:
+            raise ValueError("Expected a method in "+str(METHODS)+" for engine "+name+", found "+str(method))
+
+    start_time=time.perf_counter()
+    deadline=None if timeout is None else start_time+timeout
+
+    results=multiprocessing.Queue()
+    engines=[multiprocessing.Process(target=_engine,args=(name,values,method,options,results),daemon=True)
+             for name,method,options in configurations]
+
+    winner={"solution":None,"engine":None,"time":None,"result":None,"failures":{}}
+
+    def handle(engine_result:tuple)->bool:
+        name,result,error=engine_result
+        if error is not None:
+            winner["failures"][name]=error
+        elif result["status"]==ERROR:
+            winner["failures"][name]=result["error"]
+        elif not isSolutionOf(values,parseLine(result["solution"])):
+            winner["failures"][name]="invalid solution"
+        else:
+            winner.update(solution=result["solution"],engine=name,time=time.perf_counter()-start_time,result=result)
+            return True
+        return False
+
+    raceProcesses(engines,results,handle,deadline)
+
+    return winner
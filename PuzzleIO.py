@@ -0,0 +1,299 @@
+"""
+Streaming puzzle readers and writers.
+
+A puzzle is handled as 'bytes' of cell values (0 for empty cells) in row-major order, so millions of puzzles can be
+read, solved and written without building 'Cell' objects. Two formats are supported:
+
+    text:   one puzzle per line, one symbol per cell (81 for a 9x9 board, 256 for 16x16, 625 for 25x25), empty cells as
+            '.', '_' or '0'. The digits above 9 are the letters (A=10, B=11... G=16 on a 16x16 board, P=25 on a 25x25 one),
+            or the cells are separated by spaces and written as numbers ("10 . 3 16 ..."). Blank lines and '#' comments are skipped.
+    binary: the MAGIC header followed by fixed size records of 41 bytes, 4 bits per cell (high nibble first).
+            Files are read through mmap, with random access by index. Only 9x9 puzzles.
+"""
+from __future__ import annotations
+
+import math
+import mmap
+import operator
+from typing import Iterable, Iterator
+
+from Units import boxSize
+
+MAGIC=b"SDK4"
+RECORD_SIZE=41
+
+#digit symbols of the text format, the cell value is the index (0 is the empty cell)
+SYMBOLS=".123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+#text character -> cell value, 255 for invalid characters
+_FROM_TEXT=bytearray([255]*256)
+for _d,_symbol in enumerate(SYMBOLS):
+    _FROM_TEXT[ord(_symbol)]=_d
+    _FROM_TEXT[ord(_symbol.lower())]=_d
+_FROM_TEXT[ord("0")]=0
+_FROM_TEXT[ord("_")]=0
+_FROM_TEXT=bytes(_FROM_TEXT)
+
+#cell value -> text character
+_TO_TEXT=bytes(SYMBOLS.encode()+b"?"*(256-len(SYMBOLS)))
+
+#packed byte -> high and low nibble, value -> high nibble
+_HIGH_NIBBLE=bytes(x>>4 for x in range(256))
+_LOW_NIBBLE=bytes(x & 15 for x in range(256))
+_TO_HIGH_NIBBLE=bytes((x<<4) & 255 for x in range(256))
+
+def parseRow(line:str|bytes,numbers:bool=False)->bytes:
+    """
+    Function that converts text cells into cell values, without checking the number of cells. Invalid cells have value 255.
+
+    Args:
+        line (str|bytes): text cells, empty cells as '.', '_' or '0'.
+        numbers (bool, optional): 'False' for one symbol per cell (spaces are ignored), 'True' for cells separated by spaces
+            and written as numbers or symbols. Defaults to False.
+
+    Returns:
+        bytes: cell values.
+    """
+    if isinstance(line,str):
+        line=line.encode("ascii",errors="replace")
+    if not numbers:
+        return b"".join(line.split()).translate(_FROM_TEXT)
+
+    values=bytearray()
+    for token in line.split():
+        if token.isdigit():
+            values.append(min(int(token),255))
+        elif len(token)==1:
+            values+=token.translate(_FROM_TEXT)
+        else:
+            values.append(255)
+    return bytes(values)
+
+def parseLine(line:str|bytes)->bytes:
+    """
+    Function that converts a text puzzle line into cell values. The cells are read one symbol per cell,
+    or as numbers separated by spaces when the symbols do not give a board.
+
+    Args:
+        line (str|bytes): line of 81 (9x9), 256 (16x16) or 625 (25x25) cells, empty cells as '.', '_' or '0'.
+
+    Returns:
+        bytes: the cell values.
+    """
+    values=parseRow(line)
+    n=math.isqrt(math.isqrt(len(values)))
+    if n**4!=len(values) or max(values,default=0)>n*n:
+        numbers=parseRow(line,numbers=True)
+        if len(numbers)>1:
+            values=numbers
+    n=boxSize(len(values))
+    if max(values)>n*n:
+        raise ValueError("Unexpected character in puzzle line "+repr(line))
+    return values
+
+def formatLine(values:Iterable[int])->str:
+    """
+    Function that converts cell values into a text puzzle line, empty cells as '.'.
+    Boards with more digits than SYMBOLS are written as numbers separated by spaces.
+
+    Args:
+        values (Iterable[int]): the cell values.
+
+    Returns:
+        str: puzzle line.
+    """
+    values=bytes(values)
+    if values and max(values)>=len(SYMBOLS):
+        return " ".join(str(x) if x else "." for x in values)
+    return values.translate(_TO_TEXT).decode("ascii")
+
+def pack(values:Iterable[int])->bytes:
+    """
+    Function that packs 81 cell values into a binary record of 41 bytes.
+
+    Args:
+        values (Iterable[int]): the 81 cell values.
+
+    Returns:
+        bytes: binary record.
+    """
+    values=bytes(values)
+    if len(values)!=81:
+        raise ValueError("The binary format only holds 9x9 puzzles, found "+str(len(values))+" cells")
+    values+=b"\0"
+    return bytes(map(operator.or_,values[0::2].translate(_TO_HIGH_NIBBLE),values[1::2]))
+
+def unpack(record:bytes)->bytes:
+    """
+    Function that unpacks a binary record of 41 bytes into 81 cell values.
+
+    Args:
+        record (bytes): binary record.
+
+    Returns:
+        bytes: the 81 cell values.
+    """
+    values=bytearray(2*RECORD_SIZE)
+    values[0::2]=record.translate(_HIGH_NIBBLE)
+    values[1::2]=record.translate(_LOW_NIBBLE)
+    return bytes(values[:81])
+
+def readText(file,strict:bool=True)->Iterator[bytes|str]:
+    """
+    Generator that reads the puzzles of a text file, one per line.
+
+    Args:
+        file: path or file opened in binary mode.
+        strict (bool, optional): 'True' to raise on a line that is not a puzzle, 'False' to yield it as it is (a str), so that
+            the solver reports it without stopping the whole file. Defaults to True.
+
+    Yields:
+        bytes|str: the cell values of each puzzle, or the line of a bad puzzle when not 'strict'.
+    """
+    if isinstance(file,str):
+        with open(file,"rb") as f:
+            yield from readText(f,strict)
+        return
+
+    for n,line in enumerate(file,start=1):
+        line=line.strip()
+        if not line or line.startswith(b"#"):
+            continue
+        try:
+            values=parseLine(line)
+        except ValueError as e:
+            if not strict:
+                yield line.decode("utf-8","replace")
+                continue
+            raise ValueError("line "+str(n)+": "+str(e)) from None
+        yield values
+
+def writeText(file,puzzles:Iterable[Iterable[int]]):
+    """
+    Function that writes puzzles to a text file, one per line.
+
+    Args:
+        file: path or file opened in text mode.
+        puzzles (Iterable[Iterable[int]]): the cell values of each puzzle.
+    """
+    if isinstance(file,str):
+        with open(file,"w") as f:
+            return writeText(f,puzzles)
+
+    for values in puzzles:
+        file.write(formatLine(values)+"\n")
+
+class BinaryPuzzleFile:
+
+    def __init__(self,path:str):
+        """
+        binary puzzle file constructor. The file is memory mapped and records are unpacked on access.
+
+        Args:
+            path (str): file path.
+        """
+        self.file=open(path,"rb")
+        try:
+            self.map=mmap.mmap(self.file.fileno(),0,access=mmap.ACCESS_READ)
+        except ValueError:
+            #empty files cannot be mapped
+            self.map=b""
+        if self.map[:len(MAGIC)]!=MAGIC:
+            self.close()
+            raise ValueError("Not a binary puzzle file: "+path)
+        if (len(self.map)-len(MAGIC))%RECORD_SIZE!=0:
+            self.close()
+            raise ValueError("Truncated binary puzzle file: "+path)
+
+    def __len__(self)->int:
+        return (len(self.map)-len(MAGIC))//RECORD_SIZE
+
+    def __getitem__(self,index:int)->bytes:
+        """
+        Function that returns the puzzle at position 'index'.
+
+        Args:
+            index (int): puzzle index, negative indexes count from the end.
+
+        Returns:
+            bytes: the 81 cell values.
+        """
+        n=len(self)
+        if index<0:
+            index+=n
+        if index<0 or index>=n:
+            raise IndexError("puzzle index out of range")
+        start=len(MAGIC)+index*RECORD_SIZE
+        return unpack(self.map[start:start+RECORD_SIZE])
+
+    def __iter__(self)->Iterator[bytes]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        if isinstance(self.map,mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+def readBinary(path:str)->Iterator[bytes]:
+    """
+    Generator that reads the puzzles of a binary file in order.
+
+    Args:
+        path (str): file path.
+
+    Yields:
+        bytes: the 81 cell values of each puzzle.
+    """
+    with BinaryPuzzleFile(path) as puzzles:
+        yield from puzzles
+
+def writeBinary(file,puzzles:Iterable[Iterable[int]]):
+    """
+    Function that writes puzzles to a binary file.
+
+    Args:
+        file: path or file opened in binary mode.
+        puzzles (Iterable[Iterable[int]]): the 81 cell values of each puzzle.
+    """
+    if isinstance(file,str):
+        with open(file,"wb") as f:
+            return writeBinary(f,puzzles)
+
+    file.write(MAGIC)
+    for values in puzzles:
+        file.write(pack(values))
+
+def isBinary(path:str)->bool:
+    """
+    Function that checks if a file starts with the binary MAGIC header.
+
+    Args:
+        path (str): file path.
+
+    Returns:
+        bool: 'True' for binary puzzle files.
+    """
+    with open(path,"rb") as f:
+        return f.read(len(MAGIC))==MAGIC
+
+def readPuzzles(path:str,strict:bool=True)->Iterator[bytes|str]:
+    """
+    Function that returns a generator over the puzzles of a text or binary file, detected from its header.
+
+    Args:
+        path (str): file path.
+        strict (bool, optional): see 'readText'. Defaults to True.
+
+    Returns:
+        Iterator[bytes|str]: the cell values of each puzzle.
+    """
+    if isBinary(path):
+        return readBinary(path)
+    return readText(path,strict)
@@ -0,0 +1,64 @@
+"""
+Races of worker processes.
+
+The portfolio solver, the benchmark runs and the island GA all start processes that put one result each in a queue, wait for
+the results up to a deadline and then stop the processes that are still running. 'raceProcesses' runs that loop, so that
+the three of them handle the timeouts and the crashed processes in the same way.
+"""
+from __future__ import annotations
+
+import time
+import queue
+
+def raceProcesses(processes:list,results,handle,deadline:float=None,stop=None,join_timeout:float=5.0)->bool:
+    """
+    Function that starts processes which put one result each in 'results', and passes the results to 'handle' as they arrive.
+    The race ends when 'handle' returns 'True', when every process put its result, when the deadline passes or when every
+    process exited without a result (e.g. crashed). The processes still running are then terminated; with 'stop' they are
+    first asked to exit and given 'join_timeout' seconds to do it. The queue is closed.
+
+    Args:
+        processes (list): multiprocessing.Process objects, not started.
+        results: multiprocessing.Queue the processes put their results in.
+        handle (callable): function called with every result, returns 'True' to end the race.
+        deadline (float, optional): time.perf_counter() value at which the race ends, None for no limit. Defaults to None.
+        stop (callable, optional): function that asks the processes to exit (e.g. sets an Event). Defaults to None.
+        join_timeout (float, optional): seconds the processes are given to exit after 'stop'. Defaults to 5.0.
+
+    Returns:
+        bool: 'False' if the deadline passed before the race ended.
+    """
+    for process in processes:
+        process.start()
+
+    in_time=True
+    try:
+        pending=len(processes)
+        while pending:
+            wait=1.0 if deadline is None else min(1.0,deadline-time.perf_counter())
+            if wait<=0:
+                in_time=False
+                break
+            try:
+                result=results.get(timeout=wait)
+            except queue.Empty:
+                #every process exited without a result
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break
+                continue
+            pending-=1
+            if handle(result):
+                break
+    finally:
+        if stop is not None:
+            stop()
+            for process in processes:
+                process.join(timeout=join_timeout)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        results.close()
+
+    return in_time
@@ -0,0 +1,385 @@
+"""
+Asyncio solve service.
+
+Clients send one JSON request per line over TCP or a Unix socket:
+
+    {"id": 1, "puzzle": "37.5....6...36..12...", "method": "CP", "options": {"backend": "bitmask"}, "timeout": 5}
+
+and receive one JSON response per line, in completion order, with the same 'id':
+
+    {"id": 1, "status": "solved", "solution": "371542896...", "time": 0.001, "cpu_time": 0.001, "counters": {...},
+     "queue_time": 0.0002, "total_time": 0.002}
+
+Only 'puzzle' is required. 'status' is "solved", "unsolved", "timeout" or "error" (with an 'error' message).
+With a solution cache (see Cache) the puzzles equivalent to an already solved one with the same method and options are
+answered at once, with "cached": true, and the request {"id": 2, "stats": true} returns the cache counters and hit rate.
+Counting requests (a 'limit' option) are never cached, since their answer is the solution counters. The cache is used from a
+single thread of its own, so that canonicalizing a puzzle or writing to the SQLite store does not block the event loop.
+Requests wait in a bounded queue: when it is full the service stops reading from the connection, so bursts slow the
+clients down instead of growing the memory. Each worker process solves one puzzle at a time and is killed and replaced
+when the deadline of its request (counted from its arrival) expires.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from Batch import solveOne,METHODS
+from PuzzleIO import parseLine,formatLine
+
+#workers are started from a clean server process, so they do not inherit the sockets of the clients
+#(a forked worker would keep a connection open after the service closes it)
+_CONTEXT=multiprocessing.get_context("forkserver")
+
+#options that only bound the search: a solution found within any budget is cached for all of them
+BUDGET_OPTIONS=("timeout","max_nodes","max_generations")
+
+def _work(conn):
+    """
+    Worker process: solves the (puzzle values, method, options) tasks received on 'conn' and sends back
+    ('solveOne' result, None) or (None, error), until the connection is closed.
+    """
+    while True:
+        try:
+            task=conn.recv()
+        except EOFError:
+            return
+        try:
+            result=(solveOne(0,*task),None)
+        except Exception as e:
+            result=(None,type(e).__name__+": "+str(e))
+        conn.send(result)
+
+class _Worker:
+
+    def __init__(self):
+        """
+        worker constructor: starts a worker process connected through a pipe.
+        """
+        self.conn,child_conn=_CONTEXT.Pipe()
+        self.process=_CONTEXT.Process(target=_work,args=(child_conn,),daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    async def solve(self,task:tuple,timeout:float=None)->tuple[dict,str]:
+        """
+        Function that sends a task to the worker process and waits for its result without blocking the event loop.
+
+        Args:
+            task (tuple): puzzle values, method and options.
+            timeout (float, optional): seconds before asyncio.TimeoutError is raised, None for no limit. Defaults to None.
+
+        Returns:
+            tuple[dict,str]: 'solveOne' result and error message (one of them is None).
+        """
+        self.conn.send(task)
+
+        loop=asyncio.get_running_loop()
+        readable=loop.create_future()
+        def ready():
+            if not readable.done():
+                readable.set_result(None)
+        loop.add_reader(self.conn.fileno(),ready)
+        try:
+            await asyncio.wait_for(readable,timeout)
+        finally:
+            loop.remove_reader(self.conn.fileno())
+
+        #raises EOFError if the process died
+        return self.conn.recv()
+
+    def kill(self):
+        """
+        Function that stops the worker process, also in the middle of a task.
+        """
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+
+class RequestError(ValueError):
+
+    def __init__(self,id,message:str):
+        """
+        invalid request error, with the id of the request (None if it could not be read).
+        """
+        super().__init__(message)
+        self.id=id
+
+class SolveService:
+
+    def __init__(self,workers:int=None,queue_size:int=64,timeout:float=30,cache=None):
+        """
+        solve service constructor.
+
+        Args:
+            workers (int, optional): number of worker processes, None for one per core. Defaults to None.
+            queue_size (int, optional): requests that can wait for a worker before the connections stop being read. Defaults to 64.
+            timeout (float, optional): default deadline of a request in seconds, None for no limit. Defaults to 30.
+            cache (SolutionCache, optional): cache looked up before queueing a puzzle and filled with the solutions found. Defaults to None.
+        """
+        self.n_workers=workers or os.cpu_count() or 1
+        self.queue_size=queue_size
+        self.timeout=timeout
+        self.cache=cache
+        self.cache_executor=None
+        self.workers=[]
+        self.dispatchers=[]
+        self.queue=None
+        self.server=None
+
+    def __parse(self,line:bytes)->dict:
+        """
+        Function that validates a request line.
+
+        Args:
+            line (bytes): JSON request.
+
+        Returns:
+            dict: id, puzzle values, method, options and timeout of the request.
+        """
+        try:
+            request=json.loads(line)
+        except ValueError as e:
+            raise RequestError(None,"invalid JSON: "+str(e)) from None
+        if not isinstance(request,dict):
+            raise RequestError(None,"expected a JSON object")
+
+        parsed={"id":request.get("id")}
+        if request.get("stats"):
+            parsed["stats"]=True
+            return parsed
+        try:
+            self.__validate(request,parsed)
+        except ValueError as e:
+            raise RequestError(parsed["id"],str(e)) from None
+        return parsed
+
+    def __validate(self,request:dict,parsed:dict):
+        """
+        Function that checks the fields of a request and stores them in 'parsed'.
+        """
+        if not isinstance(request.get("puzzle"),str):
+            raise ValueError("expected a 'puzzle' string of 81 characters (or 256, 625... see PuzzleIO)")
+        parsed["values"]=parseLine(request["puzzle"])
+
+        parsed["method"]=request.get("method","CP")
+        if parsed["method"] not in METHODS:
+            raise ValueError("expected a method in "+str(METHODS)+", found "+str(parsed["method"]))
+
+        parsed["options"]=request.get("options",{})
+        if not isinstance(parsed["options"],dict):
+            raise ValueError("expected an 'options' object")
+
+        parsed["timeout"]=request.get("timeout",self.timeout)
+        if parsed["timeout"] is not None and (not isinstance(parsed["timeout"],(int,float)) or parsed["timeout"]<=0):
+            raise ValueError("expected a positive 'timeout', found "+str(parsed["timeout"]))
+
+    def __variant(self,request:dict)->str:
+        """
+        Function that returns the cache variant of a request: its method and options, without the budget options.
+        None if the request is not cached.
+        """
+        if self.cache is None or "limit" in request["options"]:
+            return None
+        options={key:value for key,value in request["options"].items() if key not in BUDGET_OPTIONS}
+        return json.dumps([request["method"],options],sort_keys=True)
+
+    async def __inCache(self,function,*args):
+        """
+        Function that runs a cache method on the cache thread, without blocking the event loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.cache_executor,function,*args)
+
+    async def __dispatch(self,index:int):
+        """
+        Dispatcher of worker 'index': takes the requests from the queue, solves them on its worker
+        and completes their futures. A worker that misses a deadline or dies is replaced.
+        """
+        loop=asyncio.get_running_loop()
+        while True:
+            request,future,received=await self.queue.get()
+            try:
+                started=loop.time()
+                response={"id":request["id"],"queue_time":started-received}
+
+                remaining=None
+                if request["timeout"] is not None:
+                    remaining=received+request["timeout"]-started
+
+                if remaining is not None and remaining<=0:
+                    response["status"]="timeout"
+                else:
+                    worker=self.workers[index]
+                    replace=True
+                    try:
+                        result,error=await worker.solve((request["values"],request["method"],request["options"]),remaining)
+                        replace=False
+                    except asyncio.TimeoutError:
+                        result,error=None,None
+                        response["status"]="timeout"
+                    except (EOFError,OSError) as e:
+                        result,error=None,"worker process died ("+type(e).__name__+")"
+                    if replace:
+                        #the worker may still be solving: replace it
+                        worker.kill()
+                        self.workers[index]=_Worker()
+
+                    if error is not None:
+                        response.update(status="error",error=error)
+                    elif result is not None:
+                        response.update(status="solved" if result["solved"] else "unsolved",solution=result["solution"],
+                                        time=result["time"],cpu_time=result["cpu_time"],counters=result["counters"])
+                        variant=self.__variant(request)
+                        if result["solved"] and variant is not None:
+                            await self.__inCache(self.cache.put,request["values"],parseLine(result["solution"]),variant)
+
+                response["total_time"]=loop.time()-received
+                if not future.done():
+                    future.set_result(response)
+            finally:
+                self.queue.task_done()
+
+    async def __respond(self,writer:asyncio.StreamWriter,lock:asyncio.Lock,response:dict):
+        """
+        Function that writes a response line, ignoring clients that already disconnected.
+        """
+        async with lock:
+            try:
+                writer.write(json.dumps(response).encode()+b"\n")
+                await writer.drain()
+            except (ConnectionError,RuntimeError):
+                pass
+
+    async def __reply(self,writer:asyncio.StreamWriter,lock:asyncio.Lock,future:asyncio.Future):
+        await self.__respond(writer,lock,await future)
+
+    async def __handle(self,reader:asyncio.StreamReader,writer:asyncio.StreamWriter):
+        """
+        Connection handler: queues every request line and writes the responses as they complete.
+        """
+        loop=asyncio.get_running_loop()
+        lock=asyncio.Lock()
+        replies=set()
+        try:
+            while True:
+                try:
+                    line=await reader.readline()
+                except (ConnectionError,ValueError):
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                received=loop.time()
+                try:
+                    request=self.__parse(line)
+                except RequestError as e:
+                    await self.__respond(writer,lock,{"id":e.id,"status":"error","error":str(e)})
+                    continue
+
+                if "stats" in request:
+                    await self.__respond(writer,lock,{"id":request["id"],"status":"stats",
+                                                      "cache":await self.__inCache(self.cache.stats) if self.cache is not None else None})
+                    continue
+
+                variant=self.__variant(request)
+                if variant is not None:
+                    solution=await self.__inCache(self.cache.get,request["values"],variant)
+                    if solution is not None:
+                        await self.__respond(writer,lock,{"id":request["id"],"status":"solved","solution":formatLine(solution),
+                                                          "cached":True,"total_time":loop.time()-received})
+                        continue
+
+                future=loop.create_future()
+                #waits while the queue is full (backpressure)
+                await self.queue.put((request,future,received))
+
+                reply=asyncio.create_task(self.__reply(writer,lock,future))
+                replies.add(reply)
+                reply.add_done_callback(replies.discard)
+
+            if replies:
+                await asyncio.gather(*replies)
+        finally:
+            writer.close()
+
+    async def start(self,host:str="127.0.0.1",port:int=8765,path:str=None):
+        """
+        Function that starts the worker processes and listens on a TCP port, or on a Unix socket if 'path' is given.
+
+        Args:
+            host (str, optional): TCP host. Defaults to "127.0.0.1".
+            port (int, optional): TCP port, 0 for a free one. Defaults to 8765.
+            path (str, optional): Unix socket path. Defaults to None.
+        """
+        self.queue=asyncio.Queue(self.queue_size)
+        if self.cache is not None:
+            self.cache_executor=ThreadPoolExecutor(1)
+        self.workers=[_Worker() for _ in range(self.n_workers)]
+        self.dispatchers=[asyncio.create_task(self.__dispatch(index)) for index in range(self.n_workers)]
+        if path is not None:
+            self.server=await asyncio.start_unix_server(self.__handle,path)
+        else:
+            self.server=await asyncio.start_server(self.__handle,host,port)
+
+    def addresses(self)->list:
+        """
+        Function that returns the addresses the service is listening on.
+
+        Returns:
+            list: (host, port) tuples or Unix socket paths.
+        """
+        return [sock.getsockname() for sock in self.server.sockets]
+
+    async def close(self):
+        """
+        Function that stops listening, cancels the dispatchers and kills the worker processes.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self.dispatchers,return_exceptions=True)
+        for worker in self.workers:
+            worker.kill()
+        if self.cache is not None:
+            if self.cache_executor is not None:
+                await self.__inCache(self.cache.close)
+                self.cache_executor.shutdown()
+                self.cache_executor=None
+            else:
+                self.cache.close()
+
+def serve(host:str="127.0.0.1",port:int=8765,path:str=None,workers:int=None,queue_size:int=64,timeout:float=30,cache=None):
+    """
+    Function that runs a SolveService until it is interrupted.
+
+    Args:
+        host (str, optional): TCP host. Defaults to "127.0.0.1".
+        port (int, optional): TCP port. Defaults to 8765.
+        path (str, optional): Unix socket path, used instead of TCP when given. Defaults to None.
+        workers (int, optional): number of worker processes, None for one per core. Defaults to None.
+        queue_size (int, optional): size of the request queue. Defaults to 64.
+        timeout (float, optional): default deadline of a request in seconds. Defaults to 30.
+        cache (SolutionCache, optional): solution cache. Defaults to None.
+    """
+    async def run():
+        service=SolveService(workers,queue_size,timeout,cache)
+        await service.start(host,port,path)
+        print("listening on",*service.addresses(),"with",service.n_workers,"workers",file=sys.stderr)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
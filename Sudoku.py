@@ -1,84 +1,199 @@
 from __future__ import annotations
 import gc
+import math
 import operator
-from Cell import Cell,INITIAL_DOMAIN
+from Cell import Cell
+from BitBoard import BitBoard
+from DLX import DancingLinks
+from PuzzleIO import parseLine,parseRow,formatLine
+from Units import boxSize,unitTables
+from Observer import lap
+from Budget import Budget,SOLVED,TIMEOUT,UNSATISFIABLE
 
-import copy
+import time
 
 from queue import LifoQueue
 
+import random
 from random import randint,choice,sample,shuffle
 
 from tabulate import tabulate
 
+#random pairs tried by a mutation to find a swap allowed by the presolved domains
+SWAP_ATTEMPTS=10
+
 class Sudoku:
-    def __init__(self,_sudoku=None):
+    def __init__(self,_sudoku=None,_size:int=9):
         """
         Create a sudoku object from a file or from another sudoku object.
+        The file has one row per line, empty cells are '.', '_' or '0'. Blank lines and spaces are ignored.
+        The board can be 9x9, 16x16, 25x25...: the digits above 9 are the letters (A=10, B=11...) or, when the cells of a row
+        are separated by spaces, numbers (see PuzzleIO).
 
         Args:
             _sudoku (str or Sudoku): .
+            _size (int, optional): number of rows of the empty board created when '_sudoku' is None. Defaults to 9.
         """
         if _sudoku is None:
-            self.board=[[] for x in range(9)]
+            self.board=[[] for x in range(_size)]
+            self.__setSize(_size)
+            self.finished=False
         elif isinstance(_sudoku,str):
-            self.board=[]
             with open(_sudoku) as file:
-                for i,line in enumerate(file):
-                    line=line.strip('\n')
-                    row=[]
-                    self.board.append(row)
-                    for j,x in enumerate(line):
-                        if int(x)==0:
-                            row.append(Cell(i,j))
-                        else:
-                            row.append(Cell(i,j,_value=int(x)))
+                lines=[line for line in file if line.strip()]
+            
+            rows=[parseRow(line) for line in lines]
+            if any(len(row)!=len(rows) for row in rows):
+                numbers=[parseRow(line,numbers=True) for line in lines]
+                if all(len(row)==len(rows) for row in numbers):
+                    rows=numbers
+            
+            self.__setSize(len(rows))
+            self.board=[]
+            for i,values in enumerate(rows):
+                if max(values,default=0)>self.size:
+                    raise ValueError("Unexpected character in row "+str(i)+": "+lines[i].strip())
+                self.board.append([Cell(i,j,_value=x,_size=self.size) for j,x in enumerate(values)])
             self.finished=False
         elif isinstance(_sudoku,Sudoku):
-            self.board=copy.deepcopy(_sudoku.board)
+            self.board=[[cell.clone() for cell in row] for row in _sudoku.board]
+            self.size=_sudoku.size
+            self.units=_sudoku.units
             self.finished=False
         else:
             raise TypeError("Expected a str or sudoku object, found "+str(type(_sudoku)))
     
+    def clone(self,domains:bool=True)->Sudoku:
+        """
+        Function that copies the board and the GA fitness counts without going through copy.deepcopy.
+        The index tables ('units') are shared.
+
+        Args:
+            domains (bool, optional): 'True' to copy the domains of the empty cells, 'False' for a GA individual. Defaults to True.
+
+        Returns:
+            Sudoku: the copy.
+        """
+        sudoku=Sudoku.__new__(Sudoku)
+        sudoku.board=[[cell.clone(domains) for cell in row] for row in self.board]
+        sudoku.size=self.size
+        sudoku.units=self.units
+        sudoku.finished=self.finished
+        if hasattr(self,"satisfied_constraint"):
+            sudoku.col_counts=self.col_counts[:]
+            sudoku.box_counts=self.box_counts[:]
+            sudoku.col_score=self.col_score
+            sudoku.box_scores=self.box_scores[:]
+            sudoku.satisfied_constraint=self.satisfied_constraint
+        return sudoku
+    
+    def __setStatus(self,status:str,budget:Budget=None):
+        """
+        Function that saves the outcome of a solver in 'solver_status': 'status' (see Budget), 'reason' ("deadline" or "budget"
+        for a timeout), and the 'satisfied_constraint' of the board left in the cells (the best one found so far) with its 'target'.
+
+        Args:
+            status (str): "solved", "timeout" or "unsatisfiable".
+            budget (Budget, optional): budget of the solver. Defaults to None.
+        """
+        self.__fitness()
+        self.solver_status={"status":status,"reason":budget.reason if budget is not None else None,
+                            "satisfied_constraint":self.satisfied_constraint,"target":2*self.size*self.size}
+    
+    def __setSize(self,size:int):
+        """
+        Function that sets the number of rows ('size') and the index tables ('units', see Units) of the board.
+
+        Args:
+            size (int): number of rows, cols and digits (9, 16, 25...).
+        """
+        self.size=size
+        self.units=unitTables(boxSize(size*size))
+    
+    @staticmethod
+    def fromValues(values:bytes|list[int])->Sudoku:
+        """
+        Create a sudoku object from the cell values in row-major order (81 for a 9x9 board, 256 for 16x16...), 0 for empty cells.
+
+        Args:
+            values (bytes|list[int]): cell values.
+
+        Returns:
+            Sudoku: sudoku object.
+        """
+        n=boxSize(len(values))
+        
+        sudoku=Sudoku(None,n*n)
+        for k,x in enumerate(values):
+            i,j=divmod(k,n*n)
+            sudoku.board[i].append(Cell(i,j,_value=x,_size=n*n))
+        sudoku.finished=False
+        return sudoku
+    
+    @staticmethod
+    def fromLine(line:str)->Sudoku:
+        """
+        Create a sudoku object from a line of 81 characters (or 256, 625... see PuzzleIO) in row-major order. Empty cells are '.', '_' or '0'.
+
+        Args:
+            line (str): sudoku line.
+
+        Returns:
+            Sudoku: sudoku object.
+        """
+        return Sudoku.fromValues(parseLine(line))
+    
+    def toValues(self)->bytes:
+        """
+        Function that returns the cell values in row-major order, 0 for the cells without value.
+
+        Returns:
+            bytes: cell values.
+        """
+        return bytes(cell.value for row in self.board for cell in row)
+    
+    def toLine(self)->str:
+        """
+        Function that returns the sudoku as a line of one character per cell in row-major order, with '.' for the cells without value.
+
+        Returns:
+            str: sudoku line.
+        """
+        return formatLine(self.toValues())
+    
     def __str__(self):
         """
         Function that prints sudoku as a matrix of a better visualization.
         """
         print()
         
-        if len(self.board)!=9:
-            print("Warning: malformed sudoku, number of rows is not 9")
+        if len(self.board)!=self.size:
+            print("Warning: malformed sudoku, number of rows is not "+str(self.size))
             
         for n,row in enumerate(self.board):
-            if len(row)!=9:
+            if len(row)!=self.size:
                 print("Warning: malformed sudoku in row "+str(n))
         
         return tabulate(self.board ,headers="keys",showindex=True,tablefmt="outline")
 
-    @staticmethod 
-    def __checkDigits(l: list[Cell]):
+    def __checkDigits(self, unit: tuple[tuple[int,int]]):
         """
-        Functions that given a list of cells checks if all the 9 digits are present.
+        Functions that given the coordinates of a unit checks if all the digits (1..size) are present in its cells.
 
         Args:
-            l (list[Cell]): list of cells.
+            unit (tuple[tuple[int,int]]): coordinates of the unit cells.
 
         Returns:
-            bool: 'True' if there are all and only the 9 sudoku digits.
+            bool: 'True' if there are all and only the sudoku digits.
         """
         
-        domain=list(INITIAL_DOMAIN)
+        domain=list(range(1,self.size+1))
         
-        #print(l)
-        
-        if len(l)!=9:
-            
-            print("malformed sudoku",end='')
-            return False
+        board=self.board
         
-        for e in l:
-            x=e.value
-            if x>9 or x<1:
+        for r,c in unit:
+            x=board[r][c].value
+            if x>self.size or x<1:
                 
                 print("outside domain boundaries",end='')
                 if x==0:
@@ -97,23 +212,6 @@ class Sudoku:
             return False
         return True
 
-    def __square(self, i:int, j:int)->list[Cell]:
-        """
-        Function that returns the cells of the sudoku square at indexes 'i' and 'j' as a list.
-        
-        Args:
-            i (int): row index. 
-            j (int): col index.
-
-        Returns:
-            list[Cell]: list of cells in the square.
-        """
-        l=[]
-        for r in range(i,i+3):
-            for c in range(j,j+3):
-                l.append(self.board[r][c])
-        return l            
-        
     def checkSudoku(self):
         """
         Function that checks the sudoku correctness.
@@ -121,29 +219,33 @@ class Sudoku:
         Returns:
             bool: 'True' if the sudoku is correct, 'False' otherwise.
         """
+        if len(self.board)!=self.size or any(len(row)!=self.size for row in self.board):
+            print("malformed sudoku")
+            return False
         #check rows
-        for n,row in enumerate(self.board):
+        for n,row in enumerate(self.units.row_units):
             if not self.__checkDigits(row):
                 print(" in row "+str(n))
                 return False
         #check cols
-        for n,col in enumerate(list(zip(*self.board))):
+        for n,col in enumerate(self.units.col_units):
             if not self.__checkDigits(col):
                 print(" in col "+str(n))
                 return False
         #check squares
-        for row_start in range(0,8,3):
-            for col_start in range(0,8,3):
-                if not self.__checkDigits(self.__square(row_start,col_start)):
-                    print(" in square: "+str(row_start)+","+str(col_start))
-                    return False
+        for square in self.units.box_units:
+            if not self.__checkDigits(square):
+                row_start,col_start=square[0]
+                print(" in square: "+str(row_start)+","+str(col_start))
+                return False
         return True
     
     def toFile(self,file:str):
         board=self.board
         with open(file, "w") as f:
             for row in board:
-                f.writelines([str(number) for number in Sudoku.__toNumbersSet(row)]+["\n"])
+                #'0' for the empty cells, letters or numbers for the digits above 9 (see PuzzleIO)
+                f.write(formatLine(cell.value for cell in row).replace(".","0")+"\n")
                 
     def countFullCells(self)->int:
         count=0
@@ -157,143 +259,215 @@ class Sudoku:
     Constraint propagation & Backtracking Approach
     """
     
-    def __minDomain(self)->Cell:
+    def __initBuckets(self):
         """
-        Function that return the sudoku cell with minimum domain.
-        
-        Returns:
-            Cell: min domain cell.
+        Function that initializes the MRV bucket queue: '__buckets[n]' holds the empty cells with a domain of length n.
+        Buckets are dicts (used as insertion ordered sets) so that ties are broken deterministically.
         """
-        return min([item for sublist in self.board for item in sublist], key=lambda x: x.getDomainLen())
+        self.__buckets=[dict() for _ in range(self.size+1)]
+        for row in self.board:
+            for cell in row:
+                if cell.isEmpty:
+                    self.__buckets[len(cell.domain)][cell]=None
     
-    def __whichSquare(self,n:int):
+    def __minDomain(self)->Cell:
         """
-        Given an sudoku index return the index of the associated square.
+        Function that return the empty sudoku cell with minimum domain, by looking up the first non empty bucket.
         
-        Args:
-            n (int): sudoku index.
-
         Returns:
-            int: square index.
+            Cell: min domain cell, None if there are no empty cells.
         """
-        if n<3:
-            return 0
-        if n<6:
-            return 3
-        if n<9:
-            return 6
+        for bucket in self.__buckets:
+            if bucket:
+                return next(iter(bucket))
+        return None
     
-    def __removeDomainRow(self, index:int, value:int)->set[Cell]:
+    def __removeDomainAll(self,r:int,c:int,value:int)->list[Cell]:
         """
-        Function that removes from row of index 'index' the specific 'value'.
+        Function that removes from row of index 'r', col of index 'c' and square of indexes 'r' and 'c' the specific 'value'.
 
         Args:
-            index (int): row index.
+            r (int): row index.
+            c (int): col index.
             value (int): value to be removed.
 
         Returns:
-            set[Cell]: cells in which value was removed from their domain.
+            list[Cell]: cells in which value was removed from their domain, in peer order (a set of cells would be ordered by
+                their addresses, and so would be the bucket reinsertion of the backtracking).
         """
-        domainRemovedCells=set()
-        for cell in self.board[index]:
+        board=self.board
+        buckets=self.__buckets
+        domainRemovedCells=[]
+        for pr,pc in self.units.peers[r][c]:
+            cell=board[pr][pc]
             if cell.removeDomain(value):
-                domainRemovedCells.add(cell)
-        return domainRemovedCells    
-        
-    def __removeDomainCol(self,index:int, value:int)->set[Cell]:
+                domainRemovedCells.append(cell)
+                
+                #move the cell to the bucket of its new domain length
+                n=len(cell.domain)
+                del buckets[n+1][cell]
+                buckets[n][cell]=None
+        return domainRemovedCells
+    
+    def __CP(self):
         """
-        Function that removes from col of index 'index' the specific 'value'.
-
-        Args:
-            index (int): col index.
-            value (int): value to be removed.
-
-        Returns:
-            set[Cell]: cells in which value was removed from their domain.
+        CP in sudoku. It updates the domains of the empty cells present in row, col or square of every full cell.
         """
-        domainRemovedCells=set()
-        for cell in list(zip(*self.board))[index]:
-            if cell.removeDomain(value):
-                domainRemovedCells.add(cell)
-        return domainRemovedCells
-        
-    def __removeDomainSquare(self,indexR:int,indexC:int,value:int)->set[Cell]:
+        for r in range(0,self.size):      
+            for c in range(0,self.size):            
+                if not self.board[r][c].isEmpty:
+                    self.__removeDomainAll(r,c,self.board[r][c].value)        
+    
+            
+    def __sudokuSolverCPBitmask(self,propagation:str,seed:int=None,observer=None,timeout:float=None,max_nodes:int=None,
+                                restarts:str=None,restart_base:int=100):
         """
-        Function that removes from square of indexes 'indexR' and 'indexC' the specific 'value'.
-
+        Sudoku solver with CP and backtracking approach on the bitmask board.
+        The solution is copied back into the sudoku cells and the deductions of each propagation rule are saved in 'propagation_counts'
+        (with the number of restarts under "restarts" when a restart policy is given).
+        
         Args:
-            indexR (int): row index.
-            indexC (int): col index.
-            value (int): value to be removed.
-
+            propagation (str): propagation level.
+            seed (int, optional): random seed of the search order. Defaults to None.
+            observer (SolverObserver, optional): receives the search events. Defaults to None.
+            timeout (float, optional): seconds before the search stops. Defaults to None.
+            max_nodes (int, optional): assigned nodes before the search stops. Defaults to None.
+            restarts (str, optional): restart policy. Defaults to None.
+            restart_base (int, optional): backtracks of the first run. Defaults to 100.
+        
         Returns:
-            set[Cell]: cells in which value was removed from their domain.
+            tuple[int,int]: restored nodes and assigned nodes.
         """
-        domainRemovedCells=set()
-        for cell in self.__square( self.__whichSquare(indexR), self.__whichSquare(indexC) ):
-            if cell.removeDomain(value):
-                domainRemovedCells.add(cell)
-        return domainRemovedCells
+        
+        bitboard=BitBoard([0 if cell.isEmpty else cell.value for row in self.board for cell in row],propagation,seed)
+        
+        restored_nodes,assigned_nodes=bitboard.solve(observer,timeout,max_nodes,restarts,restart_base)
+        
+        self.propagation_counts=bitboard.counters
+        if restarts is not None:
+            self.propagation_counts["restarts"]=bitboard.restarts
+        
+        for row in self.board:
+            for cell in row:
+                value=bitboard.value[cell.i*self.size+cell.j]
+                if value!=0:
+                    cell.value=value
+                    cell.isEmpty=False
+        
+        self.__setStatus(bitboard.status,bitboard.budget)
+        
+        return restored_nodes,assigned_nodes
             
-    def __removeDomainAll(self,r:int,c:int,value:int)->set[Cell]:
+    def countSolutions(self,limit:int=2,propagation:str="hidden",keep_solutions:bool=False)->tuple[int,list[bytes]]:
         """
-        Function that removes from row of index 'r', col of index 'c' and square of indexes 'r' and 'c' the specific 'value'.
-
+        Function that counts the solutions of the sudoku with the CP search on the bitmask board, stopping as soon as 'limit'
+        solutions are found ('limit=2' checks that the sudoku has a unique solution). The sudoku cells are not changed.
+        
         Args:
-            r (int): row index.
-            c (int): col index.
-            value (int): value to be removed.
-
+            limit (int, optional): number of solutions after which the search stops. Defaults to 2.
+            propagation (str, optional): propagation level, one of PROPAGATION_LEVELS. Defaults to "hidden".
+            keep_solutions (bool, optional): 'True' to return the cell values of the solutions found. Defaults to False.
+        
         Returns:
-            set[Cell]: cells in which value was removed from their domain.
-        """
-        return self.__removeDomainRow(r,value) | self.__removeDomainCol(c,value) | self.__removeDomainSquare(r,c,value)
-    
-    def __CP(self):
+            tuple[int,list[bytes]]: number of solutions (at most 'limit') and their cell values in row-major order (empty without 'keep_solutions').
         """
-        CP in sudoku. It updates the domains of the empty cells present in row, col or square of every full cell.
-        """
-        for r in range(0,9):      
-            for c in range(0,9):            
-                if not self.board[r][c].isEmpty:
-                    self.__removeDomainAll(r,c,self.board[r][c].value)        
-    
+        
+        bitboard=BitBoard([0 if cell.isEmpty else cell.value for row in self.board for cell in row],propagation)
+        
+        return bitboard.countSolutions(limit,keep_solutions)
             
-    def sudokuSolverCP(self):
+    def sudokuSolverCP(self,backend:str="set",propagation:str="forward",seed:int=None,observer=None,timeout:float=None,max_nodes:int=None,
+                       restarts:str=None,restart_base:int=100):
         
         """
-        Sudoku solver with CP and backtracking approach.
+        Sudoku solver with CP and backtracking approach. The outcome is saved in 'solver_status' (see __setStatus): "solved",
+        "timeout" (the board with the most assigned cells found so far is left in the cells) or "unsatisfiable" (the givens are left).
+        
+        Args:
+            backend (str, optional): domain representation, "set" (Cell domains) or "bitmask" (integer domains, one bit per digit). Defaults to "set".
+            propagation (str, optional): propagation level run to fixpoint at every node, one of PROPAGATION_LEVELS
+                ("forward", "naked", "hidden", "pairs", "pointing"). Stronger levels need the "bitmask" backend. Defaults to "forward".
+            seed (int, optional): random seed of the search order (random tie-breaking between min domain cells and random value order).
+                Needs the "bitmask" backend. None for the deterministic order. Defaults to None.
+            observer (SolverObserver, optional): receives the assignments, backtracks and propagations (see Observer). Defaults to None.
+            timeout (float, optional): seconds before the search stops, None for no limit. Defaults to None.
+            max_nodes (int, optional): assigned nodes before the search stops, None for no limit. Defaults to None.
+            restarts (str, optional): restart policy of the seeded search, one of RESTART_POLICIES ("luby", "geometric"): the search
+                starts again from the givens with a new random order after a growing number of backtracks, which cuts the very long
+                runs of unlucky orders. Needs the "bitmask" backend and a seed. None to never restart. Defaults to None.
+            restart_base (int, optional): backtracks allowed to the first run of the restart policy. Defaults to 100.
+        
+        Returns:
+            tuple[int,int]: restored nodes and assigned nodes.
         """
         
+        if backend=="bitmask":
+            return self.__sudokuSolverCPBitmask(propagation,seed,observer,timeout,max_nodes,restarts,restart_base)
+        elif backend!="set":
+            raise ValueError("Expected 'set' or 'bitmask' backend, found "+str(backend))
+        
+        if propagation!="forward":
+            raise ValueError("The 'set' backend only supports 'forward' propagation, found "+str(propagation))
+        
+        if seed is not None:
+            raise ValueError("The 'set' backend does not support a seeded search order")
+        
+        if restarts is not None:
+            raise ValueError("The 'set' backend does not support restarts")
+        
         restored_nodes=0
         assigned_nodes=0
         
+        budget=Budget.of(timeout,max_nodes)
+        status=SOLVED
+        
+        #board with the most assigned cells, kept only with a budget
+        best=None
+        best_assigned=-1
+        
         #Queue of visited cells
         visited_cells=LifoQueue()
         
+        #MRV bucket queue, kept up to date by the domain removals and restorations
+        self.__initBuckets()
+        buckets=self.__buckets
+        
         #initial constraint propagation
         self.__CP()
         
         #retrieve the min cell domain
         min_cell=self.__minDomain()
         
-        #if the min domain cell is a full cell then the computation is over
-        while min_cell.isEmpty:
+        #if there are no empty cells then the computation is over
+        while min_cell is not None:
             
             #if there is at least one value that was not previously assigned in the min domain cell domain then:
             if len(min_cell.domain-min_cell.visitedDomain)>0:
                 
+                if budget is not None:
+                    if visited_cells.qsize()>best_assigned:
+                        best_assigned=visited_cells.qsize()
+                        best=[0 if cell.isEmpty else cell.value for row in self.board for cell in row]
+                    if budget.exhausted(assigned_nodes):
+                        status=TIMEOUT
+                        break
+                
                 assigned_nodes+=1
                 
                 #1) update value of the min domain cell
                 min_cell.value=(min_cell.domain-min_cell.visitedDomain).pop()
                 min_cell.visitedDomain.add(min_cell.value)
+                if observer is not None:
+                    observer.nodeAssigned(min_cell.i*self.size+min_cell.j,min_cell.value)
                 
                 #2) update min domain cell to a full cell
                 min_cell.isEmpty=False
+                del buckets[len(min_cell.domain)][min_cell]
             
                 #3) update domains of row, col and square by removing the value assigned to the min domain cell
                 domainRemovedCells=self.__removeDomainAll(min_cell.i,min_cell.j,min_cell.value)
+                if observer is not None:
+                    observer.propagated(len(domainRemovedCells))
             
                 #4) add the min cell and the cells in which the domain is modified to the visited cells queue as a tuple
                 visited_cells.put((min_cell,domainRemovedCells))
@@ -309,88 +483,232 @@ class Sudoku:
                 #1) reset visited domain for min domain cell
                 min_cell.visitedDomain=set()
                 
+                #every value of the first assigned cell failed: no solution
+                if visited_cells.empty():
+                    status=UNSATISFIABLE
+                    break
+                
                 #2) get last visited cell and the cells in which the domain was modified by its assignment
                 last_visited_cell,domainRemovedCells=visited_cells.get()
+                if observer is not None:
+                    observer.backtracked(last_visited_cell.i*self.size+last_visited_cell.j)
                 
                 #3) update last visited cell to a empty cell
                 last_visited_cell.isEmpty=True
+                buckets[len(last_visited_cell.domain)][last_visited_cell]=None
                 
                 #4) add the value previously assigned to the last visited cell to the cells previously modified by its assignment
                 for cell in domainRemovedCells:
                     cell.addDomain(last_visited_cell.value)
+                    n=len(cell.domain)
+                    del buckets[n-1][cell]
+                    buckets[n][cell]=None
                 
                 #5) set the min domain cell as the last visited cell to explore the next value of its domain
                 min_cell=last_visited_cell
         
+        if status==TIMEOUT:
+            for row in self.board:
+                for cell in row:
+                    cell.value=best[cell.i*self.size+cell.j]
+                    cell.isEmpty=cell.value==0
+        elif status==UNSATISFIABLE:
+            #the backtracked cells keep the last value tried
+            for row in self.board:
+                for cell in row:
+                    if cell.isEmpty:
+                        cell.value=0
+        
+        self.__setStatus(status,budget)
+        
+        return restored_nodes,assigned_nodes
+    
+    """
+    Exact cover (Dancing Links) approach
+    """
+    
+    def sudokuSolverDLX(self,observer=None):
+        """
+        Sudoku solver with Algorithm X on dancing links (see DLX). The solution is copied back into the sudoku cells
+        and the link updates are saved in 'propagation_counts'.
+        
+        Args:
+            observer (SolverObserver, optional): receives the assignments and backtracks (see Observer). Defaults to None.
+        
+        Returns:
+            tuple[int,int]: restored nodes and assigned nodes.
+        """
+        
+        dlx=DancingLinks([0 if cell.isEmpty else cell.value for row in self.board for cell in row])
+        
+        restored_nodes,assigned_nodes=dlx.solve(observer)
+        
+        self.propagation_counts=dlx.counters
+        
+        for row in self.board:
+            for cell in row:
+                value=dlx.value[cell.i*self.size+cell.j]
+                if value!=0:
+                    cell.value=value
+                    cell.isEmpty=False
+        
         return restored_nodes,assigned_nodes
                 
     """
     Genetic Algorithm approach
     """
     
+    def __fitness(self):
+        """
+        Function that calculate the fitness for the given Sudoku.
+        It also saves the digit counts of each col and square ('col_counts[c*stride+d]', 'box_counts[b*stride+d]' with stride=size+1),
+        the number of distinct digits in all the cols ('col_score') and in each square ('box_scores'), used by the delta updates.
+        The fitness of a solution is 2*size*size (162 on a 9x9 board).
+        """
+        
+        board=self.board
+        size=self.size
+        stride=size+1
+        box_of=self.units.box_of
+        
+        col_counts=[0]*(size*stride)
+        box_counts=[0]*(size*stride)
+        for r,row in enumerate(board):
+            box_row=box_of[r]
+            for c,cell in enumerate(row):
+                col_counts[c*stride+cell.value]+=1
+                box_counts[box_row[c]*stride+cell.value]+=1
+        
+        #count the distinct digits of each col and square
+        self.col_score=sum(1 for c in range(size) for d in range(1,stride) if col_counts[c*stride+d])
+        self.box_scores=[sum(1 for d in range(1,stride) if box_counts[b*stride+d]) for b in range(size)]
+        
+        self.col_counts=col_counts
+        self.box_counts=box_counts
+            
+        self.satisfied_constraint=self.col_score+sum(self.box_scores)
+    
     @staticmethod
-    def __toNumbersSet(l:list[Cell])->list[int]:
+    def __moveDigit(counts:list[int],base:int,old:int,new:int)->int:
         """
-        Function that given a list of Cells it returns a list of ints containing the cell values.
+        Function that replaces one occurrence of digit 'old' with digit 'new' in the counts of a unit.
 
         Args:
-            l (list[Cell]): input list.
+            counts (list[int]): digit counts.
+            base (int): offset of the unit in counts.
+            old (int): removed digit.
+            new (int): added digit.
 
         Returns:
-            list[int]: output list.
+            int: change in the number of distinct digits of the unit.
+        """
+        counts[base+old]-=1
+        counts[base+new]+=1
+        return (counts[base+new]==1)-(counts[base+old]==0)
+    
+    def __swapCells(self,r:int,c1:int,c2:int):
         """
+        Function that swaps the values of the cells at cols 'c1' and 'c2' of row 'r' and updates the fitness by delta:
+        only the 2 cols and at most 2 squares of the swapped cells change.
+
+        Args:
+            r (int): row index.
+            c1 (int): col index of the first cell.
+            c2 (int): col index of the second cell.
+        """
+        row=self.board[r]
+        a=row[c1].value
+        b=row[c2].value
+        if a==b:
+            return
+        row[c1].value=b
+        row[c2].value=a
+        
+        stride=self.size+1
+        delta=Sudoku.__moveDigit(self.col_counts,c1*stride,a,b)+Sudoku.__moveDigit(self.col_counts,c2*stride,b,a)
         
-        return set([cell.value for cell in l])
+        box_row=self.units.box_of[r]
+        box1=box_row[c1]
+        box2=box_row[c2]
+        if box1!=box2:
+            delta1=Sudoku.__moveDigit(self.box_counts,box1*stride,a,b)
+            delta2=Sudoku.__moveDigit(self.box_counts,box2*stride,b,a)
+            self.box_scores[box1]+=delta1
+            self.box_scores[box2]+=delta2
+            self.col_score+=delta
+            delta+=delta1+delta2
+        else:
+            self.col_score+=delta
+        
+        self.satisfied_constraint+=delta
     
-    def __fitness(self):
+    def __presolve(self,propagation:str)->list[list[set[int]]]:
         """
-        Function that calculate the fitness for the given Sudoku
+        Function that runs constraint propagation to fixpoint on the bitmask board, without search.
+        The forced cells are committed as givens and the candidates of the other empty cells are returned.
+
+        Args:
+            propagation (str): propagation level.
+
+        Returns:
+            list[list[set[int]]]: candidates of the empty cells (None for the full cells), None if the puzzle has no solution.
         """
         
-        satisfied_constraint=0       
-                    
-        #check cols
-        for col in list(zip(*self.board)):
-            domain=set(INITIAL_DOMAIN)
-            
-            numbers=Sudoku.__toNumbersSet(col)
-            
-            satisfied_constraint+=9-len(domain-numbers)
-                    
-        #check squares
-        for row_start in range(0,8,3):
-            for col_start in range(0,8,3):
-                
-                numbers=Sudoku.__toNumbersSet(self.__square(row_start,col_start))
-                domain=set(INITIAL_DOMAIN)
-            
-                satisfied_constraint+=9-len(domain-numbers)
-            
-        self.satisfied_constraint=satisfied_constraint      
+        bitboard=BitBoard([0 if cell.isEmpty else cell.value for row in self.board for cell in row],propagation)
+        
+        if not bitboard.presolve():
+            return None
+        
+        self.propagation_counts=bitboard.counters
+        
+        domains=[[None]*self.size for _ in range(self.size)]
+        for row in self.board:
+            for cell in row:
+                k=cell.i*self.size+cell.j
+                if bitboard.value[k]!=0:
+                    cell.value=bitboard.value[k]
+                    cell.isEmpty=False
+                else:
+                    domains[cell.i][cell.j]=set(bitboard.digits[bitboard.domain[k]])
+        
+        return domains
     
-    def __randomizeSudokuAndScore(self):
+    def __randomizeSudokuAndScore(self,domains:list[list[set[int]]]=None):
         """
         Function that randomizes the empty cells for the given Sudoku.
+        
+        Args:
+            domains (list[list[set[int]]], optional): candidates of the empty cells found by the presolve. When given, the cells
+                with fewer candidates are filled first and each cell takes a value of the row domain among its candidates, if any. Defaults to None.
         """
     
         board=self.board
-        for r in range(9):
+        size=self.size
+        for r in range(size):
             #initialization of row domain
-            domain=list(INITIAL_DOMAIN)
+            domain=list(range(1,size+1))
             
             #remove values from domain already set in row
-            for c in range(9):
+            for c in range(size):
                 if not board[r][c].isEmpty:
                     domain.remove(board[r][c].value)
             
-            #for each empty cell choose a random value to assign to it and remove that value from the domain.
-            for c in range(9):
-                if board[r][c].isEmpty:
-                    board[r][c].value=choice(domain)
-                    domain.remove(board[r][c].value)
+            if domains is None:
+                #for each empty cell choose a random value to assign to it and remove that value from the domain.
+                for c in range(size):
+                    if board[r][c].isEmpty:
+                        board[r][c].value=choice(domain)
+                        domain.remove(board[r][c].value)
+                continue
+            
+            #most constrained cells first, then a random value among the cell candidates still in the row domain
+            for c in sorted((c for c in range(size) if board[r][c].isEmpty),key=lambda c: len(domains[r][c])):
+                candidates=[x for x in domain if x in domains[r][c]] or domain
+                board[r][c].value=choice(candidates)
+                domain.remove(board[r][c].value)
         
         #calculate score for generated sudoku
-        self.__fitness()   
+        self.__fitness()
     
     @staticmethod
     def __getChild(parent1:Sudoku,parent2:Sudoku)->Sudoku:
@@ -405,13 +723,14 @@ class Sudoku:
             Sudoku: child Sudoku.
         """
         
-        child=Sudoku()
+        size=parent1.size
+        child=Sudoku(None,size)
         
         #at least one row from parent1 and at least one row from parent 2
-        crossover_row_index=randint(1,8)
+        crossover_row_index=randint(1,size-1)
             
         for index in range(crossover_row_index):
-            for c in range(9):
+            for c in range(size):
                 
                 cell=Cell(index,c,parent1.board[index][c].value)
                 
@@ -419,8 +738,8 @@ class Sudoku:
                 
                 child.board[index].append(cell)
         
-        for index in range(crossover_row_index,9):
-            for c in range(9):
+        for index in range(crossover_row_index,size):
+            for c in range(size):
                 
                 cell=Cell(index,c,parent2.board[index][c].value)
                 
@@ -428,43 +747,119 @@ class Sudoku:
                 
                 child.board[index].append(cell)
         
-        child.__fitness()
+        Sudoku.__inheritFitness(child,parent1,parent2,crossover_row_index)
         
         return child
+    
+    @staticmethod
+    def __inheritFitness(child:Sudoku,parent1:Sudoku,parent2:Sudoku,crossover_row_index:int):
+        """
+        Function that computes the fitness of a child from the counts of its parents.
+        The col counts of the parent that gave more rows are patched with the rows of the other parent;
+        the squares of the bands inherited whole are copied and only the squares of the crossover band are counted.
+
+        Args:
+            child (Sudoku): child Sudoku.
+            parent1 (Sudoku): parent giving the rows before the crossover row.
+            parent2 (Sudoku): parent giving the other rows.
+            crossover_row_index (int): first row of parent 2.
+        """
+        
+        size=child.size
+        n=child.units.box
+        stride=size+1
+        box_of=child.units.box_of
+        
+        #cols
+        if crossover_row_index<=size//2:
+            base,other,rows=parent2,parent1,range(crossover_row_index)
+        else:
+            base,other,rows=parent1,parent2,range(crossover_row_index,size)
+        
+        col_counts=base.col_counts[:]
+        col_score=base.col_score
+        for r in rows:
+            base_row=base.board[r]
+            other_row=other.board[r]
+            for c in range(size):
+                old=base_row[c].value
+                new=other_row[c].value
+                if old!=new:
+                    col_score+=Sudoku.__moveDigit(col_counts,c*stride,old,new)
+        
+        #squares: band 'band' holds the rows and the squares from band*n to band*n+n-1
+        box_counts=[0]*(size*stride)
+        box_scores=[0]*size
+        for band in range(n):
+            start=band*n
+            if start+n<=crossover_row_index:
+                parent=parent1
+            elif start>=crossover_row_index:
+                parent=parent2
+            else:
+                parent=None
+            
+            if parent is not None:
+                box_counts[start*stride:(start+n)*stride]=parent.box_counts[start*stride:(start+n)*stride]
+                box_scores[start:start+n]=parent.box_scores[start:start+n]
+            else:
+                for r in range(start,start+n):
+                    box_row=box_of[r]
+                    for c,cell in enumerate(child.board[r]):
+                        box_counts[box_row[c]*stride+cell.value]+=1
+                for b in range(start,start+n):
+                    box_scores[b]=sum(1 for d in range(1,stride) if box_counts[b*stride+d])
+        
+        child.col_counts=col_counts
+        child.box_counts=box_counts
+        child.col_score=col_score
+        child.box_scores=box_scores
+        child.satisfied_constraint=col_score+sum(box_scores)
         
                             
-    def __mutation(self,n_rows,n_cells_per_row):
+    def __mutation(self,n_rows,n_cells_per_row,domains:list[list[set[int]]]=None):
         """
         Mutation function.
 
         Args:
             n_rows (_type_): n of row to mutate.
             n_cells_per_row (_type_): n cell to mutate per row.
+            domains (list[list[set[int]]], optional): candidates of the empty cells found by the presolve. When given, only swaps
+                that keep both values among the candidates of their new cells are made. Defaults to None.
         """
         
         for _ in range(n_rows):
             
             #select a random row
-            mutation_row_index=randint(0,8)
+            mutation_row_index=randint(0,self.size-1)
             mutation_row=self.board[mutation_row_index]
             
             for _ in range(n_cells_per_row):
                 
                 #from all possible indexes remove the indexes of the full cells
-                indexes=[x for x in range(9)]
+                indexes=[x for x in range(self.size)]
                 for n,cell in enumerate(mutation_row):
                     if not cell.isEmpty:
                         indexes.remove(n)
                 
+                #a row with less than 2 empty cells cannot be mutated
+                if len(indexes)<2:
+                    break
+                
                 #sample 2 random indexes    
                 cell1,cell2=sample(indexes,2)
                 
-                #swap
-                temp=mutation_row[cell1]
-                mutation_row[cell1]=mutation_row[cell2]
-                mutation_row[cell2]=temp
+                if domains is not None:
+                    row_domains=domains[mutation_row_index]
+                    for _ in range(SWAP_ATTEMPTS):
+                        if mutation_row[cell1].value in row_domains[cell2] and mutation_row[cell2].value in row_domains[cell1]:
+                            break
+                        cell1,cell2=sample(indexes,2)
+                    else:
+                        continue
                 
-                self.__fitness()
+                #swap and update the fitness
+                self.__swapCells(mutation_row_index,cell1,cell2)
         
     @staticmethod
     def __isSolution(population:list[Sudoku])->Sudoku:
@@ -478,40 +873,174 @@ class Sudoku:
             Sudoku: The solution Sudoku.
         """
         for s in population:
-            if s.satisfied_constraint==(81*2):
+            if s.satisfied_constraint==(s.size*s.size*2):
                 return s
         return None
                                   
-    def sudokuSolverGA(self, population_size:int=3000, selection_rate:float=0.25, random_selection_rate:float=0.25, n_children:int=4, mutation_rate:float=0.3, n_rows_swap:int=3, n_cells_per_row_swap:int=1, n_generations_no_improvement:int=30):
+    def __sudokuSolverGANumpy(self, seed:int=None, domains:list[list[set[int]]]=None, observer=None, budget:Budget=None, **parameters):
+        """
+        Genetic Algorithm on a NumPy population (see GAPopulation). The solution (or the fittest individual when the budget
+        runs out) is copied back into the sudoku cells.
+        
+        Args:
+            seed (int, optional): random seed. Defaults to None.
+            domains (list[list[set[int]]], optional): candidates of the empty cells found by the presolve. Defaults to None.
+            observer (SolverObserver, optional): receives the generation events and phase times. Defaults to None.
+            budget (Budget, optional): deadline and maximum number of generations. Defaults to None.
+            **parameters: sudokuSolverGA parameters.
+        
+        Returns:
+            tuple[int,int]: number of restarts (iterations) and total generations.
+        """
+        
+        #NumPy is only needed by this backend
+        from GAPopulation import GAPopulation
+        
+        masks=None
+        if domains is not None:
+            masks=[sum(1<<(d-1) for d in domains[cell.i][cell.j]) if cell.isEmpty else 0 for row in self.board for cell in row]
+        
+        population=GAPopulation([0 if cell.isEmpty else cell.value for row in self.board for cell in row],seed,masks)
+        
+        iteration,total_generations=population.solve(observer=observer,budget=budget,**parameters)
+        
+        board=population.solution if population.solution is not None else population.best_board
+        for row in self.board:
+            for cell in row:
+                cell.value=int(board[cell.i][cell.j])
+        
+        self.__setStatus(population.status,budget)
+        
+        return iteration,total_generations
+    
+    def sudokuSolverGAIslands(self, n_islands:int=None, migration_interval:int=10, n_migrants:int=5, topology:str="ring", seed:int=None,
+                              timeout:float=None, max_generations:int=None, observer=None, **parameters):
+        """
+        Island model Genetic Algorithm (see Islands): NumPy subpopulations evolve in separate processes and exchange their fittest
+        individuals every 'migration_interval' generations. The first island that finds a solution stops the others.
+        The outcome is saved in 'solver_status' (see __setStatus) as for sudokuSolverGA: "solved", or "timeout" with the fittest
+        board of all the islands left in the cells.
+        
+        Args:
+            n_islands (int, optional): number of islands (processes), None for one per core. Defaults to None.
+            migration_interval (int, optional): generations between two migrations. Defaults to 10.
+            n_migrants (int, optional): individuals sent at every migration. Defaults to 5.
+            topology (str, optional): "ring" or "random". Defaults to "ring".
+            seed (int, optional): random seed of the islands. Defaults to None.
+            timeout (float, optional): seconds before the islands stop, None for no limit. Defaults to None.
+            max_generations (int, optional): total generations (over all the restarts) of each island before it stops, None for no limit. Defaults to None.
+            observer (SolverObserver, optional): receives the solutionFound event of the winning island (see Observer). Nothing is printed without one. Defaults to None.
+            **parameters: sudokuSolverGA parameters (population_size, mutation_rate...), used by every island.
+        
+        Returns:
+            tuple[int,int]: number of restarts (iterations) and total generations of the winning (or fittest) island.
+        """
+        
+        #NumPy is only needed by this solver
+        from Islands import solveIslands
+        
+        winner=solveIslands([0 if cell.isEmpty else cell.value for row in self.board for cell in row],n_islands,migration_interval,n_migrants,topology,seed,
+                            timeout,max_generations,**parameters)
+        
+        if winner["status"] is None:
+            raise RuntimeError("no island returned a result")
+        
+        if winner["board"] is not None:
+            for row in self.board:
+                for cell in row:
+                    cell.value=winner["board"][cell.i*self.size+cell.j]
+        
+        if winner["status"]==SOLVED:
+            if observer is not None:
+                observer.solutionFound(winner["iteration"],winner["generation"])
+            self.__setStatus(SOLVED)
+        else:
+            #the reason was recorded by the budget of the islands
+            budget=Budget(timeout,max_generations)
+            budget.reason=winner["reason"]
+            self.__setStatus(TIMEOUT,budget)
+        
+        return winner["iteration"],winner["total_generations"]
+    
+    def sudokuSolverGA(self, population_size:int=3000, selection_rate:float=0.25, random_selection_rate:float=0.25, n_children:int=4, mutation_rate:float=0.3, n_rows_swap:int=3, n_cells_per_row_swap:int=1, n_generations_no_improvement:int=30, backend:str="cells", seed:int=None, presolve:str=None, observer=None, timeout:float=None, max_generations:int=None):
         
         """"
-        Genetic Algorithm
+        Genetic Algorithm. The outcome is saved in 'solver_status' (see __setStatus): "solved", "timeout" (the fittest individual
+        of all the restarts is left in the cells) or "unsatisfiable" (found by the presolve).
+        
+        Args:
+            backend (str, optional): population representation, "cells" (list of Sudoku objects) or "numpy" (one (P, size, size) array, requires NumPy). Defaults to "cells".
+            seed (int, optional): random seed, None for a random run. The "cells" backend seeds the 'random' module. Defaults to None.
+            presolve (str, optional): propagation level of a CP presolve run before the GA, one of PROPAGATION_LEVELS. The forced cells become
+                givens and initialization and mutation only use the candidates left in each cell. None to disable. Defaults to None.
+            observer (SolverObserver, optional): receives the generation, restart and solution events and the time of each phase
+                (see Observer). Nothing is printed without one. Defaults to None.
+            timeout (float, optional): seconds before the run stops, None for no limit. Defaults to None.
+            max_generations (int, optional): total generations (over all the restarts) before the run stops, None for no limit. Defaults to None.
+        
+        Returns:
+            tuple[int,int]: number of restarts (iterations) and total generations, (0,0) if the presolve proves that the puzzle has no solution.
         """
         
+        if backend not in ("cells","numpy"):
+            raise ValueError("Expected 'cells' or 'numpy' backend, found "+str(backend))
+        
+        domains=None
+        if presolve is not None:
+            domains=self.__presolve(presolve)
+            if domains is None:
+                self.__setStatus(UNSATISFIABLE)
+                return 0,0
+        
+        budget=Budget.of(timeout,max_generations)
+        
+        if backend=="numpy":
+            return self.__sudokuSolverGANumpy(seed,domains,observer,budget,population_size=population_size, selection_rate=selection_rate, random_selection_rate=random_selection_rate,
+                                              n_children=n_children, mutation_rate=mutation_rate, n_rows_swap=n_rows_swap,
+                                              n_cells_per_row_swap=n_cells_per_row_swap, n_generations_no_improvement=n_generations_no_improvement)
+        
+        if seed is not None:
+            random.seed(seed)
+        
         iteration=1
         total_generations=1
         
+        #fittest individual of all the restarts
+        best=None
+        
         while True:
             
             #initial generation
-            old_population=[Sudoku(self) for x in range(population_size)]
+            if observer is not None:
+                start=time.perf_counter()
+            old_population=[self.clone(domains=False) for x in range(population_size)]
             for sudoku in old_population:
-                sudoku.__randomizeSudokuAndScore()
+                sudoku.__randomizeSudokuAndScore(domains)
+            if observer is not None:
+                lap(observer,"initialization",start)
             
             solution=Sudoku.__isSolution(old_population)
             if solution is not None:
-                print("solution found at initial generation (generation 0)")
-                self.board=copy.deepcopy(solution)
+                if observer is not None:
+                    observer.solutionFound(iteration,0)
+                self.board=solution.clone().board
+                self.__setStatus(SOLVED)
                 return iteration,total_generations
             
             generation=1
             
             restart=0
             
-            best_fit=max(old_population,key=operator.attrgetter("satisfied_constraint")).satisfied_constraint
+            fittest=max(old_population,key=operator.attrgetter("satisfied_constraint"))
+            best_fit=fittest.satisfied_constraint
+            if best is None or best_fit>best.satisfied_constraint:
+                best=fittest
                     
             while True:
                 
+                if observer is not None:
+                    start=time.perf_counter()
+                
                 #random selection
                 population=sample(old_population,int(population_size*random_selection_rate))
                 
@@ -522,7 +1051,10 @@ class Sudoku:
                     population.append(old_population[x])
                     
                 
-                new_population=[copy.deepcopy(s) for s in population]
+                new_population=[s.clone(domains=False) for s in population]
+                
+                if observer is not None:
+                    start=lap(observer,"selection",start)
                 
                 while(len(new_population)<population_size):
                 
@@ -542,24 +1074,42 @@ class Sudoku:
                 
                 shuffle(new_population)
                 
+                if observer is not None:
+                    start=lap(observer,"crossover",start)
+                
                 for e in range(int(population_size*mutation_rate)):
-                    new_population[e].__mutation(n_rows_swap,n_cells_per_row_swap)
+                    new_population[e].__mutation(n_rows_swap,n_cells_per_row_swap,domains)
                     
                 shuffle(new_population)
                 
-                fit=max(new_population,key=operator.attrgetter("satisfied_constraint")).satisfied_constraint
+                if observer is not None:
+                    start=lap(observer,"mutation",start)
                 
+                #the fitness is kept up to date by crossover and mutation, only the best individual is looked up
+                fittest=max(new_population,key=operator.attrgetter("satisfied_constraint"))
+                fit=fittest.satisfied_constraint
+                if fit>best.satisfied_constraint:
+                    best=fittest
                 
-                print("max:",fit,"/ 162 ",
-                      "average:", "{:3.2f}".format(sum([x.satisfied_constraint for x in new_population])/len(new_population)),
-                      " generation:",generation,
-                      " restart: ",restart )
+                solution=Sudoku.__isSolution(new_population)
                 
+                if observer is not None:
+                    lap(observer,"fitness",start)
+                    observer.generationCompleted(iteration,generation,fit,
+                                                 sum([x.satisfied_constraint for x in new_population])/len(new_population),restart)
                 
-                solution=Sudoku.__isSolution(new_population)
                 if solution is not None:
-                    print("\nsolution found at regeneration "+str(iteration)+" at generation "+str(generation))
-                    self.board=copy.deepcopy(solution.board)
+                    if observer is not None:
+                        observer.solutionFound(iteration,generation)
+                    self.board=solution.clone().board
+                    self.__setStatus(SOLVED)
+                    return iteration,total_generations
+                
+                if budget is not None and budget.exhausted(total_generations):
+                    for row in self.board:
+                        for cell in row:
+                            cell.value=best.board[cell.i][cell.j].value
+                    self.__setStatus(TIMEOUT,budget)
                     return iteration,total_generations
                 
                 if fit>best_fit:
@@ -575,16 +1125,183 @@ class Sudoku:
                 
                 if restart>n_generations_no_improvement:
                     
-                    iteration+=1
-                    
-                    print("\nreached a possible local minimum")
-                    
-                    print("best solution for this iteration: ")
-                    print(max(new_population,key=operator.attrgetter("satisfied_constraint")))
-                    print(max(new_population,key=operator.attrgetter("satisfied_constraint")).checkSudoku())
+                    if observer is not None:
+                        observer.restartTriggered(iteration,best_fit)
                     
-                    print("\nrestarting... ")
+                    iteration+=1
                     
                     del population,new_population,old_population,children,child,parent1,parent2
                     gc.collect()
-                    break  
\ No newline at end of file
+                    break  
+    """
+    Simulated Annealing approach
+    """
+    
+    def __swapDelta(self,r:int,c1:int,c2:int)->int:
+        """
+        Function that computes, without applying it, the fitness change of swapping the cells at cols 'c1' and 'c2' of row 'r'.
+
+        Args:
+            r (int): row index.
+            c1 (int): col index of the first cell.
+            c2 (int): col index of the second cell.
+
+        Returns:
+            int: change of satisfied_constraint.
+        """
+        row=self.board[r]
+        a=row[c1].value
+        b=row[c2].value
+        if a==b:
+            return 0
+        
+        stride=self.size+1
+        col_counts=self.col_counts
+        col1=c1*stride
+        col2=c2*stride
+        delta=(col_counts[col1+b]==0)-(col_counts[col1+a]==1)+(col_counts[col2+a]==0)-(col_counts[col2+b]==1)
+        
+        box_row=self.units.box_of[r]
+        box1=box_row[c1]*stride
+        box2=box_row[c2]*stride
+        if box1!=box2:
+            box_counts=self.box_counts
+            delta+=(box_counts[box1+b]==0)-(box_counts[box1+a]==1)+(box_counts[box2+a]==0)-(box_counts[box2+b]==1)
+        
+        return delta
+    
+    def sudokuSolverSA(self, initial_temperature:float=None, schedule:str="geometric", cooling_rate:float=0.99, min_temperature:float=0.001, chain_length:int=None, reheat_after:int=50, seed:int=None, observer=None,
+                       timeout:float=None, max_iterations:int=None):
+        
+        """
+        Simulated Annealing. The board starts from a random permutation of the missing digits of each row (as in the Genetic Algorithm)
+        and a move swaps 2 empty cells of a row. Moves are scored by delta from the col and square counts.
+        After 'chain_length' moves the temperature is lowered; if the best fitness does not improve for 'reheat_after' chains
+        the temperature is reset to the initial one (reheat).
+        The outcome is saved in 'solver_status' (see __setStatus): "solved", "timeout" (the fittest board of the run is left in the
+        cells) or "unsatisfiable" (the rows with less than 2 empty cells cannot be changed and the board is not a solution).
+        
+        Args:
+            initial_temperature (float, optional): initial temperature, None to use the standard deviation of the fitness change of 200 random moves. Defaults to None.
+            schedule (str, optional): cooling schedule, "geometric" (T=T*cooling_rate), "linear" (T=T-T0*(1-cooling_rate)) or "logarithmic" (T=T0/log(e+chain)). Defaults to "geometric".
+            cooling_rate (float, optional): cooling parameter of the geometric and linear schedules. Defaults to 0.99.
+            min_temperature (float, optional): lower bound of the temperature. Defaults to 0.001.
+            chain_length (int, optional): moves per temperature, None for the squared number of empty cells. Defaults to None.
+            reheat_after (int, optional): chains without improvement before a reheat. Defaults to 50.
+            seed (int, optional): random seed, None for a random run. Seeds the 'random' module. Defaults to None.
+            observer (SolverObserver, optional): receives the chain, reheat and solution events (see Observer). Nothing is printed without one. Defaults to None.
+            timeout (float, optional): seconds before the run stops, None for no limit. Defaults to None.
+            max_iterations (int, optional): moves before the run stops, None for no limit. Defaults to None.
+        
+        Returns:
+            tuple[int,int]: number of restarts (1 plus the reheats) and total iterations (moves).
+        """
+        
+        if schedule not in ["geometric","linear","logarithmic"]:
+            raise ValueError("Expected 'geometric', 'linear' or 'logarithmic' schedule, found "+str(schedule))
+        
+        if seed is not None:
+            random.seed(seed)
+        
+        budget=Budget.of(timeout,max_iterations)
+        
+        self.__randomizeSudokuAndScore()
+        
+        #empty cells of each row and rows that can be mutated
+        free_cols=[[c for c,cell in enumerate(row) if cell.isEmpty] for row in self.board]
+        rows=[r for r in range(self.size) if len(free_cols[r])>=2]
+        
+        #fitness of a solution
+        target=self.size*self.size*2
+        
+        iteration=1
+        total_iterations=0
+        
+        if self.satisfied_constraint==target:
+            self.__setStatus(SOLVED)
+            return iteration,total_iterations
+        if not rows:
+            self.__setStatus(UNSATISFIABLE)
+            return iteration,total_iterations
+        
+        if chain_length is None:
+            chain_length=sum(len(cols) for cols in free_cols)**2
+        
+        if initial_temperature is None:
+            deltas=[]
+            for _ in range(200):
+                r=choice(rows)
+                c1,c2=sample(free_cols[r],2)
+                deltas.append(self.__swapDelta(r,c1,c2))
+            mean=sum(deltas)/len(deltas)
+            initial_temperature=max(min_temperature,(sum((x-mean)**2 for x in deltas)/len(deltas))**0.5)
+        
+        temperature=initial_temperature
+        best_fit=self.satisfied_constraint
+        chain=0
+        no_improvement=0
+        
+        #fittest board of all the reheats, left in the cells when the budget runs out
+        overall_best_fit=self.satisfied_constraint
+        overall_best=[cell.value for row in self.board for cell in row]
+        
+        while True:
+            
+            for _ in range(chain_length):
+                
+                if budget is not None and budget.exhausted(total_iterations):
+                    for k,cell in enumerate(cell for row in self.board for cell in row):
+                        cell.value=overall_best[k]
+                    self.__setStatus(TIMEOUT,budget)
+                    return iteration,total_iterations
+                
+                total_iterations+=1
+                
+                r=choice(rows)
+                c1,c2=sample(free_cols[r],2)
+                
+                delta=self.__swapDelta(r,c1,c2)
+                
+                #metropolis acceptance
+                if delta>=0 or random.random()<math.exp(delta/temperature):
+                    self.__swapCells(r,c1,c2)
+                    
+                    if self.satisfied_constraint==target:
+                        if observer is not None:
+                            observer.solutionFound(iteration,chain+1)
+                        self.__setStatus(SOLVED)
+                        return iteration,total_iterations
+                    
+                    if self.satisfied_constraint>overall_best_fit:
+                        overall_best_fit=self.satisfied_constraint
+                        overall_best=[cell.value for row in self.board for cell in row]
+            
+            chain+=1
+            
+            if self.satisfied_constraint>best_fit:
+                best_fit=self.satisfied_constraint
+                no_improvement=0
+            else:
+                no_improvement+=1
+            
+            if observer is not None:
+                observer.chainCompleted(iteration,chain,self.satisfied_constraint,temperature,no_improvement)
+            
+            if no_improvement>=reheat_after:
+                
+                if observer is not None:
+                    observer.restartTriggered(iteration,best_fit)
+                
+                iteration+=1
+                no_improvement=0
+                best_fit=self.satisfied_constraint
+                
+                temperature=initial_temperature
+                chain=0
+                
+            elif schedule=="geometric":
+                temperature=max(min_temperature,temperature*cooling_rate)
+            elif schedule=="linear":
+                temperature=max(min_temperature,temperature-initial_temperature*(1-cooling_rate))
+            else:
+                temperature=max(min_temperature,initial_temperature/math.log(math.e+chain))
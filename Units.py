@@ -0,0 +1,127 @@
+"""
+Sudoku index tables, built once per box size.
+
+A board of box size n has n*n rows, cols and squares of n*n cells (n=3 for the classic 9x9 board, 4 for 16x16, 5 for 25x25).
+Coordinate tables hold (row, col) pairs and are used on the 'Sudoku' board (list of rows of 'Cell').
+Index tables hold flat row-major indexes (row*size+col) and are used on the 'BitBoard' lists.
+The module constants are the tables of the 9x9 board, 'unitTables' returns the tables of any box size.
+"""
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+
+def boxSize(n_cells:int)->int:
+    """
+    Function that returns the box size of a board with 'n_cells' cells.
+
+    Args:
+        n_cells (int): number of cells (81, 256, 625...).
+
+    Returns:
+        int: box size n, the board has n*n rows of n*n cells.
+    """
+    n=math.isqrt(math.isqrt(n_cells))
+    if n<2 or n**4!=n_cells:
+        raise ValueError("Expected a board of n^4 cells (81, 256, 625...), found "+str(n_cells))
+    return n
+
+class UnitTables:
+
+    def __init__(self,_n:int):
+        """
+        index tables constructor for the boards of box size '_n'.
+
+        Args:
+            _n (int): box size.
+        """
+        n=_n
+        size=n*n
+        self.box=n
+        self.size=size
+
+        #the rows, cols and squares (squares in row-major order of their top-left cell)
+        self.row_units=tuple(tuple((r,c) for c in range(size)) for r in range(size))
+        self.col_units=tuple(tuple((r,c) for r in range(size)) for c in range(size))
+        self.box_units=tuple(tuple((r,c) for r in range(r0,r0+n) for c in range(c0,c0+n)) for r0 in range(0,size,n) for c0 in range(0,size,n))
+
+        #all the 3*size units
+        self.units=self.row_units+self.col_units+self.box_units
+
+        #box_of[r][c]: index in box_units of the square of the cell at indexes 'r' and 'c'
+        self.box_of=tuple(tuple((r//n)*n+c//n for c in range(size)) for r in range(size))
+
+        #peers[r][c]: coordinates of the peers of the cell at indexes 'r' and 'c'
+        self.peers=tuple(tuple(self.__buildPeers(r,c) for c in range(size)) for r in range(size))
+
+        #flat index versions of the tables above
+        self.unit_indexes=tuple(tuple(r*size+c for r,c in unit) for unit in self.units)
+        self.peer_indexes=tuple(tuple(r*size+c for r,c in self.peers[k//size][k%size]) for k in range(size*size))
+
+        self.intersection_indexes=self.__buildIntersections()
+
+    def __deepcopy__(self,memo):
+        #the tables are immutable and shared by all the boards of the same box size
+        return self
+
+    def __buildPeers(self,r:int,c:int)->tuple[tuple[int,int]]:
+        """
+        Function that returns the coordinates of the cells sharing a row, col or square with the cell at indexes 'r' and 'c'
+        (20 cells on a 9x9 board).
+
+        Args:
+            r (int): row index.
+            c (int): col index.
+
+        Returns:
+            tuple[tuple[int,int]]: peers coordinates in row-major order.
+        """
+        peers=set(self.row_units[r]) | set(self.col_units[c]) | set(self.box_units[self.box_of[r][c]])
+        peers.discard((r,c))
+        return tuple(sorted(peers))
+
+    def __buildIntersections(self)->tuple[tuple[tuple[int],tuple[int],tuple[int]]]:
+        """
+        Function that builds, for each square and each row or col crossing it, the flat indexes of the n shared cells,
+        of the cells of the line outside the square and of the cells of the square outside the line.
+
+        Returns:
+            tuple[tuple[tuple[int],tuple[int],tuple[int]]]: (segment, line rest, square rest) for the 2*n^3 intersections.
+        """
+        n=self.box
+        size=self.size
+        intersections=[]
+        for b,square in enumerate(self.box_units):
+            r0,c0=(b//n)*n,(b%n)*n
+            for line in self.row_units[r0:r0+n]+self.col_units[c0:c0+n]:
+                segment=[x for x in line if x in square]
+                line_rest=[x for x in line if x not in square]
+                square_rest=[x for x in square if x not in line]
+                intersections.append(tuple(tuple(r*size+c for r,c in cells) for cells in (segment,line_rest,square_rest)))
+        return tuple(intersections)
+
+@lru_cache(maxsize=None)
+def unitTables(n:int=3)->UnitTables:
+    """
+    Function that returns the index tables of the boards of box size 'n', built on first use.
+
+    Args:
+        n (int, optional): box size. Defaults to 3.
+
+    Returns:
+        UnitTables: index tables.
+    """
+    return UnitTables(n)
+
+_TABLES=unitTables(3)
+
+#9x9 tables
+ROW_UNITS=_TABLES.row_units
+COL_UNITS=_TABLES.col_units
+BOX_UNITS=_TABLES.box_units
+UNITS=_TABLES.units
+BOX_OF=_TABLES.box_of
+PEERS=_TABLES.peers
+UNIT_INDEXES=_TABLES.unit_indexes
+PEER_INDEXES=_TABLES.peer_indexes
+INTERSECTION_INDEXES=_TABLES.intersection_indexes
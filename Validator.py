@@ -0,0 +1,169 @@
+"""
+Batch validator of full boards (requires NumPy).
+
+A stack of boards is checked in one vectorized pass: each cell value becomes its digit bit, the bits of the cells of every
+row, col and square are or-ed together and a unit is correct when it holds all the digits. The boards that fail are then
+reported unit by unit, with the missing and the duplicate digits, so the cost of the reports only depends on the number
+of wrong boards.
+Nothing is printed: the results are dicts, one per board.
+"""
+from __future__ import annotations
+
+import itertools
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from Units import boxSize,unitTables
+
+UNIT_KINDS=("row","col","square")
+
+def _stack(boards)->np.ndarray:
+    """
+    Function that converts boards into an (N, cells) array of cell values.
+
+    Args:
+        boards: (N, size, size) or (N, cells) array, or a list of cell values (bytes or lists).
+
+    Returns:
+        np.ndarray: cell values, one board per row.
+    """
+    if not isinstance(boards,np.ndarray):
+        boards=[bytes(values) for values in boards]
+        if not boards:
+            return np.zeros((0,81),dtype=np.uint8)
+        if len({len(values) for values in boards})!=1:
+            raise ValueError("Expected boards of the same size")
+        return np.frombuffer(b"".join(boards),dtype=np.uint8).reshape(len(boards),-1)
+    if boards.ndim==3:
+        return boards.reshape(len(boards),-1)
+    if boards.ndim!=2:
+        raise ValueError("Expected an (N, size, size) or (N, cells) array, found shape "+str(boards.shape))
+    return boards
+
+def _unitOr(masks:np.ndarray,axis:int)->np.ndarray:
+    """
+    Function that ors the masks along 'axis', one slice at a time (faster than np.bitwise_or.reduce on short axes).
+    """
+    masks=np.moveaxis(masks,axis,0)
+    out=masks[0].copy()
+    for x in masks[1:]:
+        out|=x
+    return out
+
+def checkBoards(boards,chunksize:int=16384)->np.ndarray:
+    """
+    Function that checks whether each board is a solution (every row, col and square holds all the digits).
+
+    Args:
+        boards: (N, size, size) or (N, cells) array, or a list of cell values.
+        chunksize (int, optional): boards checked at a time, so the temporary arrays stay in cache. Defaults to 16384.
+
+    Returns:
+        np.ndarray: (N,) boolean array, 'True' for the correct boards.
+    """
+    values=_stack(boards)
+    n=boxSize(values.shape[1])
+    size=n*n
+    full_mask=(1<<size)-1
+
+    #digit bits, 0 for the empty cells and the values outside 1..size
+    if values.dtype==np.uint8:
+        bits=np.zeros(256,dtype=np.uint16 if size<16 else np.uint32)
+    else:
+        bits=np.zeros(size+1,dtype=np.uint16 if size<16 else np.uint32)
+        values=np.where((values<1) | (values>size),0,values)
+    bits[1:size+1]=1<<np.arange(size,dtype=bits.dtype)
+
+    correct=np.empty(len(values),dtype=bool)
+    for start in range(0,len(values),chunksize):
+        masks=bits[values[start:start+chunksize]].reshape(-1,size,size)
+        rows=_unitOr(masks,2)
+        cols=_unitOr(masks,1)
+        #(N, band, row, stack, col) -> (N, band, stack): squares in row-major order
+        squares=_unitOr(_unitOr(masks.reshape(-1,n,n,n,n),4),2).reshape(-1,size)
+        correct[start:start+chunksize]=(rows==full_mask).all(axis=1) & (cols==full_mask).all(axis=1) & (squares==full_mask).all(axis=1)
+    return correct
+
+def _reports(values:np.ndarray)->list[dict]:
+    """
+    Function that describes the errors of wrong boards, without their 'index'.
+
+    Args:
+        values (np.ndarray): (M, cells) cell values of wrong boards.
+
+    Returns:
+        list[dict]: the report of each board (see validateBoards).
+    """
+    n=boxSize(values.shape[1])
+    size=n*n
+    unit_indexes=np.array(unitTables(n).unit_indexes)
+
+    #(M, 3*size, size) number of times each digit appears in each unit
+    unit_values=values[:,unit_indexes]
+    counts=(unit_values[...,None]==np.arange(1,size+1)).sum(axis=2)
+    missing=counts==0
+    duplicates=counts>1
+    wrong_units=(missing | duplicates).any(axis=2)
+    invalid_value=(values<1) | (values>size)
+
+    reports=[]
+    for m in range(len(values)):
+        errors=[]
+        for u in np.flatnonzero(wrong_units[m]):
+            errors.append({"unit":UNIT_KINDS[u//size],"index":int(u%size),
+                           "missing":(np.flatnonzero(missing[m,u])+1).tolist(),
+                           "duplicates":(np.flatnonzero(duplicates[m,u])+1).tolist()})
+        reports.append({"valid":False,"errors":errors,
+                        "invalid_cells":np.flatnonzero(invalid_value[m]).tolist()})
+    return reports
+
+def validateBoards(boards,first_index:int=0,errors_only:bool=False)->list[dict]:
+    """
+    Function that validates a stack of boards and describes every error of the wrong ones.
+
+    Args:
+        boards: (N, size, size) or (N, cells) array, or a list of cell values.
+        first_index (int, optional): index of the first board, used in the reports. Defaults to 0.
+        errors_only (bool, optional): 'True' to report only the wrong boards. Defaults to False.
+
+    Returns:
+        list[dict]: one report per board, in input order: 'index', 'valid', 'errors' (for each wrong unit: 'unit' ("row",
+            "col" or "square"), its 'index', the 'missing' and the 'duplicates' digits) and 'invalid_cells' (flat indexes
+            of the empty cells and of the values outside 1..size).
+    """
+    values=_stack(boards)
+    correct=checkBoards(values)
+    wrong=np.flatnonzero(~correct)
+    wrong_reports=iter(_reports(values[wrong]) if len(wrong) else ())
+
+    reports=[]
+    for m in range(len(values)):
+        if correct[m]:
+            if not errors_only:
+                reports.append({"index":first_index+m,"valid":True,"errors":[],"invalid_cells":[]})
+        else:
+            reports.append({"index":first_index+m,**next(wrong_reports)})
+    return reports
+
+def validateStream(boards:Iterable[bytes],chunksize:int=16384,errors_only:bool=False)->Iterator[dict]:
+    """
+    Generator that validates a stream of boards (e.g. PuzzleIO.readPuzzles) in chunks of 'chunksize' boards,
+    so the memory does not depend on the number of boards.
+
+    Args:
+        boards (Iterable[bytes]): the cell values of each board, consumed lazily.
+        chunksize (int, optional): boards validated in one vectorized pass. Defaults to 16384.
+        errors_only (bool, optional): 'True' to report only the wrong boards. Defaults to False.
+
+    Yields:
+        dict: the report of each board (see validateBoards).
+    """
+    boards=iter(boards)
+    first_index=0
+    while True:
+        chunk=list(itertools.islice(boards,chunksize))
+        if not chunk:
+            return
+        yield from validateBoards(chunk,first_index,errors_only)
+        first_index+=len(chunk)
@@ -1,11 +1,22 @@
 import sys
+import json
+import argparse
 from Sudoku import *
+from Batch import solveMany,METHODS,ERROR
+from PuzzleIO import readPuzzles,readText,writeText,writeBinary,parseLine,formatLine
+from BitBoard import PROPAGATION_LEVELS,RESTART_POLICIES
+from Portfolio import solvePortfolio,CONFIGURATIONS
+from Observer import PrintObserver
+import Benchmark
+import Service
+import Generator
+from Cache import SolutionCache
 import time
     
 def test():
     
     if len(sys.argv)!=4:
-        print("Expected 4 parameters:\n1) type of computation (CP or GA)\n2) sudoku names (easy,normal,medium or hard)\n3) number")
+        print("Expected 4 parameters:\n1) type of computation (CP, GA, SA or DLX)\n2) sudoku names (easy,normal,medium or hard)\n3) number")
         return
     
     _,type,name,i=sys.argv
@@ -14,7 +25,7 @@ def test():
         print("wrong sudoku name")
         return
         
-    if type not in ["CP","GA"]:
+    if type not in ["CP","GA","SA","DLX"]:
         print("wrong computation type")
         return
     
@@ -29,8 +40,14 @@ def test():
         restored_nodes,assignments=sudoku.sudokuSolverCP()
         print("restored nodes",restored_nodes,"assignments",assignments)
     elif type=="GA":
-        restart,generation=sudoku.sudokuSolverGA()
+        restart,generation=sudoku.sudokuSolverGA(observer=PrintObserver(2*sudoku.size**2))
         print("restart",restart,"generation",generation)
+    elif type=="SA":
+        restart,iterations=sudoku.sudokuSolverSA(observer=PrintObserver(2*sudoku.size**2))
+        print("restart",restart,"iterations",iterations)
+    elif type=="DLX":
+        restored_nodes,assignments=sudoku.sudokuSolverDLX()
+        print("restored nodes",restored_nodes,"assignments",assignments)
     
     end_time = time.perf_counter()
     
@@ -39,6 +56,277 @@ def test():
     
     print(sudoku.checkSudoku())
     
+def batch(argv:list[str]):
+    """
+    Batch subcommand: solves the puzzles of a text or binary file (see PuzzleIO) or of text stdin with a pool of processes
+    and prints one JSON result per line. Solutions can also be written to a text or binary file. A summary is printed on stderr.
+    
+    Args:
+        argv (list[str]): subcommand arguments.
+    """
+    
+    parser=argparse.ArgumentParser(prog="main.py batch",description="Solve many sudoku puzzles in parallel.")
+    parser.add_argument("file",nargs="?",default="-",help="text or binary puzzle file ('-' or missing for text stdin)")
+    parser.add_argument("--output",default=None,help="file where the solutions are written, in input order")
+    parser.add_argument("--format",choices=["text","binary"],default="text",help="format of the output file")
+    parser.add_argument("--quiet",action="store_true",help="do not print the JSON results")
+    parser.add_argument("--method",choices=METHODS,default="CP")
+    parser.add_argument("--workers",type=int,default=None,help="number of processes (default: one per core)")
+    parser.add_argument("--chunksize",type=int,default=64)
+    parser.add_argument("--unordered",action="store_true",help="print results as they complete")
+    parser.add_argument("--backend",choices=["set","bitmask"],default="bitmask",help="CP domain representation")
+    parser.add_argument("--propagation",choices=PROPAGATION_LEVELS,default="forward",help="CP propagation level")
+    parser.add_argument("--timeout",type=float,default=None,help="CP, GA and SA: seconds before a puzzle is given up (the best board is written)")
+    parser.add_argument("--max-nodes",type=int,default=None,help="CP: assigned nodes before a puzzle is given up")
+    parser.add_argument("--max-generations",type=int,default=None,help="GA: generations before a puzzle is given up")
+    parser.add_argument("--max-iterations",type=int,default=None,help="SA: moves before a puzzle is given up")
+    parser.add_argument("--limit",type=int,default=None,help="CP bitmask: count the solutions up to LIMIT (2 checks uniqueness)")
+    parser.add_argument("--seed",type=int,default=None,help="CP bitmask: random seed of the search order (default: deterministic order)")
+    parser.add_argument("--restarts",choices=RESTART_POLICIES,default=None,help="CP bitmask: restart policy of the seeded search (seed 0 without --seed)")
+    parser.add_argument("--restart-base",type=int,default=100,help="CP bitmask: backtracks of the first run of the restart policy")
+    parser.add_argument("--presolve",choices=PROPAGATION_LEVELS,default=None,help="GA: propagation level of the CP presolve (default: none)")
+    args=parser.parse_args(argv)
+    
+    #the 'set' backend only has the forward propagation and the deterministic search
+    if args.method=="CP" and args.backend=="set":
+        for flag,given in (("--limit",args.limit is not None),("--seed",args.seed is not None),("--restarts",args.restarts is not None),
+                           ("--propagation",args.propagation!="forward")):
+            if given:
+                parser.error(flag+" needs --backend bitmask")
+    
+    options={}
+    if args.method=="CP":
+        options={"backend":args.backend,"propagation":args.propagation}
+        if args.limit is not None:
+            options["limit"]=args.limit
+        if args.max_nodes is not None:
+            options["max_nodes"]=args.max_nodes
+        if args.seed is not None or args.restarts is not None:
+            options["seed"]=args.seed if args.seed is not None else 0
+        if args.restarts is not None:
+            options["restarts"]=args.restarts
+            options["restart_base"]=args.restart_base
+    elif args.method=="GA":
+        if args.presolve is not None:
+            options["presolve"]=args.presolve
+        if args.max_generations is not None:
+            options["max_generations"]=args.max_generations
+    elif args.method=="SA":
+        if args.max_iterations is not None:
+            options["max_iterations"]=args.max_iterations
+    if args.timeout is not None and args.method in ("CP","GA","SA"):
+        options["timeout"]=args.timeout
+    
+    #a bad line gets an error result instead of stopping the batch
+    puzzles=readText(sys.stdin.buffer,strict=False) if args.file=="-" else readPuzzles(args.file,strict=False)
+    
+    start_time = time.perf_counter()
+    summary={"puzzles":0,"solved":0,"errors":0}
+    
+    def solutions():
+        for result in solveMany(puzzles,method=args.method,workers=args.workers,
+                                chunksize=args.chunksize,ordered=not args.unordered or args.output is not None,**options):
+            summary["puzzles"]+=1
+            summary["solved"]+=result["solved"]
+            summary["errors"]+=result["status"]==ERROR
+            if not args.quiet:
+                print(json.dumps(result))
+            #an empty board keeps the output aligned with the input for a line that is not a puzzle
+            yield parseLine(result["solution"]) if result["solution"] is not None else bytes(81)
+    
+    if args.output is None:
+        for _ in solutions():
+            pass
+    elif args.format=="binary":
+        writeBinary(args.output,solutions())
+    else:
+        writeText(args.output,solutions())
+    
+    execution_time = time.perf_counter() - start_time
+    print("puzzles",summary["puzzles"],"solved",summary["solved"],"errors",summary["errors"],"execution time",execution_time,file=sys.stderr)
+    
+def portfolio(argv:list[str]):
+    """
+    Portfolio subcommand: races several solver configurations on a puzzle (see Portfolio) and prints the solution and the winning engine.
+    
+    Args:
+        argv (list[str]): subcommand arguments.
+    """
+    
+    names=[name for name,_,_ in CONFIGURATIONS]
+    
+    parser=argparse.ArgumentParser(prog="main.py portfolio",description="Race several solvers on a sudoku puzzle.")
+    parser.add_argument("file",help="puzzle file (e.g. examples/hard/hard1.txt)")
+    parser.add_argument("--engines",nargs="+",choices=names,default=names,help="engines of the race (default: all)")
+    parser.add_argument("--timeout",type=float,default=None,help="seconds before giving up")
+    args=parser.parse_args(argv)
+    
+    sudoku=Sudoku(args.file)
+    print(sudoku,end='\n\n')
+    
+    winner=solvePortfolio(sudoku.toValues(),tuple(c for c in CONFIGURATIONS if c[0] in args.engines),args.timeout)
+    
+    for name,reason in winner["failures"].items():
+        print("engine",name,"failed:",reason)
+    
+    if winner["solution"] is None:
+        print("no engine found a solution")
+        return
+    
+    print("solution found by",winner["engine"],"in",winner["time"],"counters",winner["result"]["counters"])
+    print(Sudoku.fromLine(winner["solution"]))
+    
+def bench(argv:list[str]):
+    """
+    Bench subcommand: runs the benchmark suite on the example puzzles (see Benchmark), writes the results as JSON and
+    compares them with a baseline. Exits with status 1 when a regression exceeds the threshold.
+    
+    Args:
+        argv (list[str]): subcommand arguments.
+    """
+    
+    names=[name for name,_,_ in Benchmark.CONFIGURATIONS]
+    
+    parser=argparse.ArgumentParser(prog="main.py bench",description="Benchmark the solvers on the example puzzles.")
+    parser.add_argument("--configurations",nargs="+",choices=names,default=names,help="configurations to run (default: all)")
+    parser.add_argument("--difficulties",nargs="+",choices=Benchmark.DIFFICULTIES,default=list(Benchmark.DIFFICULTIES))
+    parser.add_argument("--repeats",type=int,default=3,help="timed runs per configuration and puzzle")
+    parser.add_argument("--seed",type=int,default=0,help="seed of the first repeat (repeat n uses seed+n)")
+    parser.add_argument("--timeout",type=float,default=60,help="seconds before a run is stopped")
+    parser.add_argument("--no-memory",action="store_true",help="skip the traced run that measures the peak memory")
+    parser.add_argument("--output",default="results/benchmark.json",help="results file")
+    parser.add_argument("--baseline",default=None,help="results file to compare with")
+    parser.add_argument("--threshold",type=float,default=0.2,help="allowed relative slowdown (0.2 = 20%%)")
+    parser.add_argument("--metric",choices=["time","cpu_time"],default="time")
+    parser.add_argument("--min-time",type=float,default=0.005,help="allowed absolute slowdown in seconds")
+    args=parser.parse_args(argv)
+    
+    puzzles=Benchmark.findPuzzles(difficulties=tuple(args.difficulties))
+    configurations=tuple(c for c in Benchmark.CONFIGURATIONS if c[0] in args.configurations)
+    
+    def progress(run:dict):
+        print(run["configuration"],run["puzzle"],"repeat",run["repeat"],run["status"],"{:.4f}".format(run["time"]) if "time" in run else "",file=sys.stderr)
+    
+    results=Benchmark.runBenchmark(puzzles,configurations,args.repeats,args.seed,args.timeout,not args.no_memory,progress)
+    Benchmark.save(results,args.output)
+    
+    table=[[name,puzzle,summary["solved"],summary["runs"],summary.get("time"),summary.get("cpu_time"),summary["peak_memory"]]
+           for name,puzzles in results["summary"].items() for puzzle,summary in puzzles.items()]
+    print(tabulate(table,headers=["configuration","puzzle","solved","runs","time","cpu time","peak memory"]))
+    
+    if args.baseline is None:
+        return
+    
+    regressions=Benchmark.compare(results,Benchmark.load(args.baseline),args.threshold,args.metric,args.min_time)
+    for regression in regressions:
+        print("regression:",regression["configuration"],regression["puzzle"],regression["reason"],
+              regression["baseline"],"->",regression["current"])
+    if regressions:
+        sys.exit(1)
+    print("no regressions")
+    
+def serve(argv:list[str]):
+    """
+    Serve subcommand: runs the solve service (see Service) until interrupted.
+    
+    Args:
+        argv (list[str]): subcommand arguments.
+    """
+    
+    parser=argparse.ArgumentParser(prog="main.py serve",description="Solve sudoku puzzles sent as line-delimited JSON over a socket.")
+    parser.add_argument("--host",default="127.0.0.1")
+    parser.add_argument("--port",type=int,default=8765)
+    parser.add_argument("--unix",default=None,help="Unix socket path, used instead of TCP")
+    parser.add_argument("--workers",type=int,default=None,help="number of processes (default: one per core)")
+    parser.add_argument("--queue-size",type=int,default=64,help="requests waiting for a worker before the clients are slowed down")
+    parser.add_argument("--timeout",type=float,default=30,help="default deadline of a request in seconds")
+    parser.add_argument("--cache-size",type=int,default=4096,help="solutions kept in memory by the symmetry cache (0 to disable it)")
+    parser.add_argument("--cache-file",default=None,help="SQLite file where the cache keeps its solutions across restarts")
+    args=parser.parse_args(argv)
+    
+    cache=None
+    if args.cache_size>0:
+        cache=SolutionCache(args.cache_size,args.cache_file)
+    
+    Service.serve(args.host,args.port,args.unix,args.workers,args.queue_size,args.timeout,cache)
+    
+def generate(argv:list[str]):
+    """
+    Generate subcommand: generates graded puzzles with a unique solution (see Generator) and streams them in the puzzle file format.
+    
+    Args:
+        argv (list[str]): subcommand arguments.
+    """
+    
+    parser=argparse.ArgumentParser(prog="main.py generate",description="Generate sudoku puzzles with a unique solution, graded by difficulty.")
+    parser.add_argument("count",type=int,help="number of puzzles")
+    parser.add_argument("--output",default="-",help="file where the puzzles are written ('-' for stdout)")
+    parser.add_argument("--format",choices=["text","binary"],default="text",help="format of the output file")
+    parser.add_argument("--json",action="store_true",help="print the JSON reports (solution, clues, difficulty, counters) to stderr")
+    parser.add_argument("--seed",type=int,default=0,help="seed of the first puzzle (puzzle n uses seed+n)")
+    parser.add_argument("--workers",type=int,default=None,help="number of processes (default: one per core)")
+    parser.add_argument("--size",type=int,choices=[3,4],default=3,help="box size (3 for 9x9, 4 for 16x16)")
+    parser.add_argument("--min-clues",type=int,default=0,help="clues below which no more clues are removed")
+    parser.add_argument("--difficulties",nargs="+",choices=Generator.DIFFICULTIES,default=list(Generator.DIFFICULTIES),help="difficulties to keep")
+    args=parser.parse_args(argv)
+    
+    start_time = time.perf_counter()
+    summary={difficulty:0 for difficulty in Generator.DIFFICULTIES}
+    
+    def puzzles():
+        for result in Generator.generatePuzzles(args.count,args.seed,args.workers,args.size,args.min_clues,tuple(args.difficulties)):
+            summary[result["difficulty"]]+=1
+            if args.json:
+                print(json.dumps(result),file=sys.stderr)
+            yield parseLine(result["puzzle"])
+    
+    if args.format=="binary":
+        if args.output=="-":
+            parser.error("the binary format needs an --output file")
+        writeBinary(args.output,puzzles())
+    elif args.output=="-":
+        for values in puzzles():
+            print(formatLine(values),flush=True)
+    else:
+        writeText(args.output,puzzles())
+    
+    execution_time = time.perf_counter() - start_time
+    print("puzzles",sum(summary.values()),summary,"execution time",execution_time,file=sys.stderr)
+    
+def validate(argv:list[str]):
+    """
+    Validate subcommand: checks stored solutions in vectorized chunks (see Validator) and prints a JSON report for each wrong board.
+    Exits with status 1 when a board is wrong.
+    
+    Args:
+        argv (list[str]): subcommand arguments.
+    """
+    
+    from Validator import validateStream
+    
+    parser=argparse.ArgumentParser(prog="main.py validate",description="Check that stored sudoku boards are solutions.")
+    parser.add_argument("file",nargs="?",default="-",help="text or binary board file ('-' or missing for text stdin)")
+    parser.add_argument("--chunksize",type=int,default=16384,help="boards checked in one vectorized pass")
+    parser.add_argument("--quiet",action="store_true",help="do not print the JSON reports")
+    args=parser.parse_args(argv)
+    
+    boards=readText(sys.stdin.buffer) if args.file=="-" else readPuzzles(args.file)
+    
+    start_time = time.perf_counter()
+    summary={"boards":0,"wrong":0}
+    
+    for report in validateStream(boards,args.chunksize):
+        summary["boards"]+=1
+        if not report["valid"]:
+            summary["wrong"]+=1
+            if not args.quiet:
+                print(json.dumps(report))
+    
+    execution_time = time.perf_counter() - start_time
+    print("boards",summary["boards"],"wrong",summary["wrong"],"execution time",execution_time,file=sys.stderr)
+    if summary["wrong"]:
+        sys.exit(1)
+    
 def main():
     
     #test()
@@ -51,10 +339,23 @@ def main():
     print(sudoku,end='\n\n')
     
     #sudoku.sudokuSolverCP()
-    sudoku.sudokuSolverGA()
+    sudoku.sudokuSolverGA(observer=PrintObserver(2*sudoku.size**2))
     
     print(sudoku)
     print(sudoku.checkSudoku())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv)>1 and sys.argv[1]=="batch":
+        batch(sys.argv[2:])
+    elif len(sys.argv)>1 and sys.argv[1]=="portfolio":
+        portfolio(sys.argv[2:])
+    elif len(sys.argv)>1 and sys.argv[1]=="bench":
+        bench(sys.argv[2:])
+    elif len(sys.argv)>1 and sys.argv[1]=="serve":
+        serve(sys.argv[2:])
+    elif len(sys.argv)>1 and sys.argv[1]=="generate":
+        generate(sys.argv[2:])
+    elif len(sys.argv)>1 and sys.argv[1]=="validate":
+        validate(sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Shared fixtures of the tests: the example puzzles with a solution.
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+
+import pytest
+
+from Sudoku import Sudoku
+from DLX import DancingLinks
+from BitBoard import BitBoard
+
+def _examples()->list[tuple[str,bytes,bytes]]:
+    """
+    Function that reads the example puzzles and solves them with DLX. Most of them have more than one solution.
+
+    Returns:
+        list[tuple[str,bytes,bytes]]: name, the 81 cell values and the 81 values of a solution of each puzzle.
+    """
+    examples=[]
+    for difficulty in ("easy","normal","medium","hard"):
+        folder=os.path.join(ROOT,"examples",difficulty)
+        for f in sorted(os.listdir(folder)):
+            if f.endswith(".txt"):
+                values=Sudoku(os.path.join(folder,f)).toValues()
+                dlx=DancingLinks(values)
+                dlx.solve()
+                examples.append((f[:-4],values,bytes(dlx.value)))
+    return examples
+
+EXAMPLES=_examples()
+
+#the example puzzles with exactly one solution
+UNIQUE=[(name,values,solution) for name,values,solution in EXAMPLES if BitBoard(values).countSolutions(2)[0]==1]
+
+@pytest.fixture(params=EXAMPLES,ids=[name for name,_,_ in EXAMPLES])
+def example(request)->tuple[str,bytes,bytes]:
+    return request.param
+
+@pytest.fixture(params=UNIQUE,ids=[name for name,_,_ in UNIQUE])
+def unique_example(request)->tuple[str,bytes,bytes]:
+    return request.param
@@ -0,0 +1,125 @@
+import pytest
+
+from conftest import UNIQUE
+from BitBoard import BitBoard,PROPAGATION_LEVELS
+from Budget import SOLVED,UNSATISFIABLE
+from Batch import solveOne
+from PuzzleIO import parseLine
+from Portfolio import isSolutionOf
+from Sudoku import Sudoku
+
+@pytest.mark.parametrize("propagation",PROPAGATION_LEVELS)
+def test_every_level_solves_the_examples(example,propagation):
+    _,values,_=example
+    bitboard=BitBoard(values,propagation)
+    bitboard.solve()
+    assert bitboard.status==SOLVED
+    assert isSolutionOf(values,bytes(bitboard.value))
+
+@pytest.mark.parametrize("propagation",PROPAGATION_LEVELS)
+def test_every_level_finds_the_unique_solution(unique_example,propagation):
+    _,values,solution=unique_example
+    bitboard=BitBoard(values,propagation)
+    bitboard.solve()
+    assert bytes(bitboard.value)==solution
+
+@pytest.mark.parametrize("propagation",PROPAGATION_LEVELS)
+def test_presolve_keeps_the_unique_solution_in_the_domains(unique_example,propagation):
+    _,values,solution=unique_example
+    bitboard=BitBoard(values,propagation)
+    assert bitboard.presolve()
+    for k,value in enumerate(bitboard.value):
+        if value:
+            assert value==solution[k]
+        else:
+            assert bitboard.domain[k]>>(solution[k]-1) & 1
+
+def test_stronger_levels_force_more_cells(example):
+    _,values,_=example
+    forced=[]
+    for propagation in PROPAGATION_LEVELS:
+        bitboard=BitBoard(values,propagation)
+        bitboard.presolve()
+        forced.append(sum(1 for value in bitboard.value if value))
+    assert forced==sorted(forced)
+
+def test_seeded_search_with_restarts_solves_the_examples(example):
+    _,values,_=example
+    bitboard=BitBoard(values,"forward",seed=7)
+    bitboard.solve(restarts="luby",restart_base=10)
+    assert isSolutionOf(values,bytes(bitboard.value))
+
+def test_unknown_level_is_rejected():
+    with pytest.raises(ValueError):
+        BitBoard(bytes(81),"strongest")
+
+@pytest.mark.parametrize("backend",("set","bitmask"))
+def test_cp_backends_fill_the_cells(example,backend):
+    _,values,_=example
+    sudoku=Sudoku.fromValues(values)
+    sudoku.sudokuSolverCP(backend=backend)
+    assert isSolutionOf(values,sudoku.toValues())
+    assert sudoku.solver_status["status"]==SOLVED
+
+def deadlyPattern(solution:bytes)->list[int]:
+    """
+    Function that finds 4 cells of a solution in 2 rows of a band and 2 cols of different stacks holding 2 digits crosswise
+    (a b / b a): without them the solution is a puzzle with exactly 2 solutions.
+    """
+    for r1 in range(9):
+        for r2 in range(r1+1,3*(r1//3)+3):
+            for c1 in range(9):
+                for c2 in range(3*(c1//3)+3,9):
+                    a,b=solution[r1*9+c1],solution[r1*9+c2]
+                    if solution[r2*9+c1]==b and solution[r2*9+c2]==a:
+                        return [r1*9+c1,r1*9+c2,r2*9+c1,r2*9+c2]
+    return None
+
+def test_unique_puzzles_have_one_solution(unique_example):
+    _,values,solution=unique_example
+    bitboard=BitBoard(values,"hidden")
+    n_solutions,solutions=bitboard.countSolutions(5,keep_solutions=True)
+    assert n_solutions==1
+    assert solutions==[solution]
+    assert bitboard.status==SOLVED
+    assert bytes(bitboard.value)==solution
+
+@pytest.mark.parametrize("propagation",PROPAGATION_LEVELS)
+def test_deadly_pattern_has_two_solutions(propagation):
+    for _,_,solution in UNIQUE:
+        cells=deadlyPattern(solution)
+        if cells is not None:
+            break
+    values=bytearray(solution)
+    for k in cells:
+        values[k]=0
+    n_solutions,solutions=BitBoard(bytes(values),propagation).countSolutions(10,keep_solutions=True)
+    assert n_solutions==2
+    assert solution in solutions
+    assert all(isSolutionOf(bytes(values),other) for other in solutions)
+
+def test_count_stops_at_the_limit():
+    n_solutions,solutions=BitBoard(bytes(81)).countSolutions(3,keep_solutions=True)
+    assert n_solutions==3
+    assert len(set(solutions))==3
+
+def test_count_without_solutions():
+    values=bytearray(UNIQUE[0][1])
+    empty=values.index(0)
+    #repeat a digit of the row of the empty cell
+    values[empty]=next(v for v in values[empty//9*9:empty//9*9+9] if v)
+    bitboard=BitBoard(bytes(values))
+    assert bitboard.countSolutions(2)==(0,[])
+    assert bitboard.status==UNSATISFIABLE
+
+def test_count_rejects_a_zero_limit():
+    with pytest.raises(ValueError):
+        BitBoard(bytes(81)).countSolutions(0)
+
+def test_batch_reports_the_count(unique_example):
+    _,values,solution=unique_example
+    result=solveOne(0,values,"CP",{"backend":"bitmask","limit":2})
+    assert result["counters"]["solutions"]==1
+    assert parseLine(result["solution"])==solution
+    result=solveOne(0,bytes(81),"CP",{"backend":"bitmask","limit":4})
+    assert result["counters"]["solutions"]==4
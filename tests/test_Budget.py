@@ -0,0 +1,125 @@
+import pytest
+
+from conftest import UNIQUE
+from Budget import Budget,SOLVED,TIMEOUT,UNSATISFIABLE
+from BitBoard import BitBoard
+from Sudoku import Sudoku
+
+HARD=UNIQUE[-1][1]
+
+def contradiction()->bytes:
+    """
+    Function that returns a puzzle without solution: a digit of the first row is repeated in an empty cell of the row.
+    """
+    values=bytearray(HARD)
+    empty=values.index(0)
+    row=empty//9*9
+    values[empty]=next(v for v in values[row:row+9] if v)
+    return bytes(values)
+
+def columnConflict()->bytes:
+    """
+    Function that returns a puzzle without solution whose rows can still be filled: an empty cell gets a digit of its col.
+    """
+    values=bytearray(HARD)
+    for k,value in enumerate(values):
+        row=set(values[k//9*9:k//9*9+9])
+        digit=next((values[r*9+k%9] for r in range(9) if values[r*9+k%9] and values[r*9+k%9] not in row),None)
+        if not value and digit is not None:
+            values[k]=digit
+            return bytes(values)
+
+def test_no_limits_no_budget():
+    assert Budget.of() is None
+    assert Budget.of(max_nodes=10) is not None
+
+def test_node_budget():
+    budget=Budget(max_nodes=3)
+    assert not budget.exhausted(2)
+    assert budget.reason is None
+    assert budget.exhausted(3)
+    assert budget.reason=="budget"
+
+def test_deadline():
+    assert not Budget(timeout=60).exhausted(10**9)
+    budget=Budget(timeout=0)
+    assert budget.exhausted(0)
+    assert budget.reason=="deadline"
+
+@pytest.mark.parametrize("limits,reason",[({"max_nodes":3},"budget"),({"timeout":0},"deadline")])
+def test_bitboard_timeout(limits,reason):
+    bitboard=BitBoard(bytes(81))
+    bitboard.solve(**limits)
+    assert bitboard.status==TIMEOUT
+    assert bitboard.budget.reason==reason
+    assert not bitboard.isSolved()
+
+def test_bitboard_count_timeout_is_a_lower_bound():
+    bitboard=BitBoard(bytes(81))
+    n_solutions,_=bitboard.countSolutions(1000,max_nodes=200)
+    assert 0<n_solutions<1000
+    assert bitboard.budget.reason=="budget"
+
+def test_bitboard_unsatisfiable():
+    bitboard=BitBoard(contradiction())
+    bitboard.solve()
+    assert bitboard.status==UNSATISFIABLE
+
+@pytest.mark.parametrize("backend",("set","bitmask"))
+def test_cp_status_transitions(backend):
+    sudoku=Sudoku.fromValues(bytes(81))
+    sudoku.sudokuSolverCP(backend=backend,max_nodes=5)
+    status=sudoku.solver_status
+    assert (status["status"],status["reason"])==(TIMEOUT,"budget")
+    assert status["satisfied_constraint"]<status["target"]
+
+    sudoku=Sudoku.fromValues(HARD)
+    sudoku.sudokuSolverCP(backend=backend,max_nodes=10**6)
+    assert (sudoku.solver_status["status"],sudoku.solver_status["reason"])==(SOLVED,None)
+    assert sudoku.solver_status["satisfied_constraint"]==sudoku.solver_status["target"]
+
+    values=contradiction()
+    sudoku=Sudoku.fromValues(values)
+    sudoku.sudokuSolverCP(backend=backend)
+    assert sudoku.solver_status["status"]==UNSATISFIABLE
+    assert sudoku.toValues()==values
+
+@pytest.mark.parametrize("backend",("cells","numpy"))
+def test_ga_status_transitions(backend):
+    if backend=="numpy":
+        pytest.importorskip("numpy")
+    sudoku=Sudoku.fromValues(HARD)
+    restarts,generations=sudoku.sudokuSolverGA(population_size=50,backend=backend,seed=0,max_generations=3)
+    status=sudoku.solver_status
+    assert generations<=3
+    assert (status["status"],status["reason"])==(TIMEOUT,"budget")
+    assert sudoku.checkSudoku()==(status["satisfied_constraint"]==status["target"])
+
+    sudoku=Sudoku.fromValues(HARD)
+    sudoku.sudokuSolverGA(population_size=50,backend=backend,seed=0,timeout=0)
+    assert (sudoku.solver_status["status"],sudoku.solver_status["reason"])==(TIMEOUT,"deadline")
+
+    sudoku=Sudoku.fromValues(contradiction())
+    assert sudoku.sudokuSolverGA(backend=backend,presolve="forward")==(0,0)
+    assert sudoku.solver_status["status"]==UNSATISFIABLE
+
+def test_island_status():
+    pytest.importorskip("numpy")
+    sudoku=Sudoku.fromValues(HARD)
+    sudoku.sudokuSolverGAIslands(n_islands=2,seed=0,max_generations=3,population_size=50)
+    assert (sudoku.solver_status["status"],sudoku.solver_status["reason"])==(TIMEOUT,"budget")
+
+@pytest.mark.parametrize("limits,reason",[({"max_iterations":5000},"budget"),({"timeout":0.2},"deadline")])
+def test_sa_timeout_keeps_the_fittest_board(limits,reason):
+    sudoku=Sudoku.fromValues(columnConflict())
+    restarts,iterations=sudoku.sudokuSolverSA(seed=0,**limits)
+    status=sudoku.solver_status
+    assert (status["status"],status["reason"])==(TIMEOUT,reason)
+    assert iterations<=limits.get("max_iterations",iterations)
+    assert 0<status["satisfied_constraint"]<status["target"]
+
+def test_sa_solved_status():
+    sudoku=Sudoku.fromValues(UNIQUE[0][1])
+    sudoku.sudokuSolverSA(seed=0,timeout=60)
+    assert (sudoku.solver_status["status"],sudoku.solver_status["reason"])==(SOLVED,None)
+    assert sudoku.toValues()==UNIQUE[0][2]
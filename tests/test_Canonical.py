@@ -0,0 +1,82 @@
+import random
+
+from conftest import EXAMPLES
+from Canonical import canonicalize,toCanonical,fromCanonical
+from Cache import SolutionCache
+
+def randomSymmetry(values:bytes,rng:random.Random)->bytes:
+    """
+    Function that applies a random sudoku symmetry to a board: digit relabeling, row and band swaps, col and stack swaps
+    and a transposition.
+    """
+    def order()->list[int]:
+        return [3*band+r for band in rng.sample(range(3),3) for r in rng.sample(range(3),3)]
+
+    digits=[0]+rng.sample(range(1,10),9)
+    rows=order()
+    cols=order()
+    out=bytes(digits[values[rows[r]*9+cols[c]]] for r in range(9) for c in range(9))
+    if rng.random()<0.5:
+        out=bytes(out[c*9+r] for r in range(9) for c in range(9))
+    return out
+
+def test_transform_round_trip(example):
+    _,values,solution=example
+    canonical,transform=canonicalize(values)
+    assert toCanonical(values,transform)==canonical
+    assert fromCanonical(canonical,transform)==values
+    assert fromCanonical(toCanonical(solution,transform),transform)==solution
+
+def test_equivalent_puzzles_share_the_canonical_form(example):
+    _,values,_=example
+    canonical,_=canonicalize(values)
+    rng=random.Random(values)
+    for _ in range(5):
+        assert canonicalize(randomSymmetry(values,rng))[0]==canonical
+
+def test_canonical_solution_maps_back_to_a_solution(example):
+    _,values,solution=example
+    rng=random.Random(solution)
+    other=randomSymmetry(values,rng)
+    canonical,transform=canonicalize(values)
+    other_canonical,other_transform=canonicalize(other)
+    assert other_canonical==canonical
+    mapped=fromCanonical(toCanonical(solution,transform),other_transform)
+    assert all(v==0 or v==m for v,m in zip(other,mapped))
+
+def test_sparse_grids_are_not_canonicalized():
+    assert canonicalize(bytes(81)) is None
+    assert canonicalize(bytes([5]+[0]*80)) is None
+    assert canonicalize(EXAMPLES[-1][1],max_beam=1) is None
+
+def test_cache_hits_equivalent_puzzles():
+    _,values,solution=EXAMPLES[0]
+    cache=SolutionCache()
+    assert cache.get(values) is None
+    assert cache.put(values,solution)
+    other=randomSymmetry(values,random.Random(0))
+    cached=cache.get(other)
+    assert cached is not None and all(v==0 or v==c for v,c in zip(other,cached))
+    assert cache.stats()["hits"]==1
+
+def test_cache_keeps_the_variants_apart(tmp_path):
+    _,values,solution=EXAMPLES[0]
+    path=str(tmp_path/"cache.db")
+    cache=SolutionCache(path=path)
+    assert cache.put(values,solution,"CP")
+    assert cache.get(values,"GA") is None
+    cache.close()
+    cache=SolutionCache(path=path)
+    assert cache.get(values,"CP")==solution
+    assert cache.stats()["disk_hits"]==1
+    cache.close()
+
+def test_cache_rejects_wrong_solutions_and_skips_sparse_grids():
+    _,values,solution=EXAMPLES[0]
+    cache=SolutionCache()
+    wrong=bytearray(solution)
+    wrong[0],wrong[1]=wrong[1],wrong[0]
+    assert not cache.put(values,bytes(wrong))
+    assert cache.get(bytes(81)) is None
+    assert cache.solve(bytes(81),lambda values: solution)==(solution,False)
+    assert cache.stats()["skipped"]==2
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from conftest import EXAMPLES
+from Sudoku import Sudoku
+
+PUZZLES=[values for name,values,_ in EXAMPLES if name in ("easy1","medium1","hard6")]
+
+def individual(values:bytes,seed:int)->Sudoku:
+    """
+    Function that returns a random GA individual of a puzzle: each row holds all the digits, the givens are kept.
+    """
+    random.seed(seed)
+    sudoku=Sudoku.fromValues(values)
+    sudoku._Sudoku__randomizeSudokuAndScore()
+    return sudoku
+
+def fullFitness(sudoku:Sudoku)->tuple:
+    """
+    Function that recomputes the fitness of an individual from scratch, with its counts.
+    """
+    fresh=Sudoku.fromValues(sudoku.toValues())
+    fresh._Sudoku__fitness()
+    return fresh.satisfied_constraint,fresh.col_score,fresh.box_scores,fresh.col_counts,fresh.box_counts
+
+def deltaFitness(sudoku:Sudoku)->tuple:
+    return sudoku.satisfied_constraint,sudoku.col_score,sudoku.box_scores,sudoku.col_counts,sudoku.box_counts
+
+@pytest.mark.parametrize("values",PUZZLES)
+def test_swap_delta_matches_a_full_recompute(values):
+    sudoku=individual(values,0)
+    rng=random.Random(1)
+    for _ in range(500):
+        r=rng.randrange(9)
+        c1,c2=rng.sample(range(9),2)
+        predicted=sudoku._Sudoku__swapDelta(r,c1,c2)
+        before=sudoku.satisfied_constraint
+        sudoku._Sudoku__swapCells(r,c1,c2)
+        assert sudoku.satisfied_constraint-before==predicted
+        assert deltaFitness(sudoku)==fullFitness(sudoku)
+
+@pytest.mark.parametrize("values",PUZZLES)
+def test_mutation_delta_matches_a_full_recompute(values):
+    sudoku=individual(values,2)
+    for _ in range(100):
+        sudoku._Sudoku__mutation(3,2)
+        assert deltaFitness(sudoku)==fullFitness(sudoku)
+    assert all(cell.value==values[r*9+c] for r,row in enumerate(sudoku.board) for c,cell in enumerate(row) if not cell.isEmpty)
+
+@pytest.mark.parametrize("values",PUZZLES)
+def test_crossover_fitness_matches_a_full_recompute(values):
+    parents=[individual(values,seed) for seed in range(6)]
+    random.seed(3)
+    for _ in range(100):
+        parent1,parent2=random.sample(parents,2)
+        child=Sudoku._Sudoku__getChild(parent1,parent2)
+        assert deltaFitness(child)==fullFitness(child)
+        child._Sudoku__mutation(2,1)
+        assert deltaFitness(child)==fullFitness(child)
+
+def test_solution_has_the_target_fitness():
+    _,values,solution=EXAMPLES[0]
+    sudoku=Sudoku.fromValues(solution)
+    sudoku._Sudoku__fitness()
+    assert sudoku.satisfied_constraint==2*9*9
+
+def test_numpy_fitness_matches_the_cells_fitness():
+    np=pytest.importorskip("numpy")
+    from GAPopulation import GAPopulation
+    boards=[individual(values,seed) for values in PUZZLES for seed in range(5)]
+    population=np.array([list(sudoku.toValues()) for sudoku in boards],dtype=np.uint8).reshape(-1,9,9)
+    assert GAPopulation.fitnessOf(population).tolist()==[sudoku.satisfied_constraint for sudoku in boards]
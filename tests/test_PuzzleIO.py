@@ -0,0 +1,83 @@
+import io
+import random
+
+import pytest
+
+from conftest import EXAMPLES
+from PuzzleIO import (parseLine,formatLine,pack,unpack,readText,writeText,readBinary,writeBinary,readPuzzles,
+                      isBinary,BinaryPuzzleFile,MAGIC,RECORD_SIZE)
+
+PUZZLES=[values for _,values,_ in EXAMPLES]+[solution for _,_,solution in EXAMPLES]
+
+def randomBoard(size:int,rng:random.Random)->bytes:
+    return bytes(rng.choice((0,rng.randint(1,size))) for _ in range(size*size))
+
+@pytest.mark.parametrize("size",(9,16,25,36))
+def test_text_line_round_trip(size):
+    rng=random.Random(size)
+    for _ in range(20):
+        values=randomBoard(size,rng)
+        assert parseLine(formatLine(values))==values
+
+def test_large_boards_are_written_as_numbers():
+    values=bytes([36]+[0]*1295)
+    line=formatLine(values)
+    assert line.startswith("36 . .")
+    assert parseLine(line)==values
+
+def test_empty_cell_symbols():
+    line=formatLine(PUZZLES[0])
+    assert parseLine(line)==parseLine(line.replace(".","0"))==parseLine(line.replace(".","_"))
+
+def test_pack_round_trip():
+    for values in PUZZLES:
+        record=pack(values)
+        assert len(record)==RECORD_SIZE
+        assert unpack(record)==values
+
+def test_pack_rejects_large_boards():
+    with pytest.raises(ValueError):
+        pack(bytes(256))
+
+def test_text_file_round_trip(tmp_path):
+    path=str(tmp_path/"puzzles.txt")
+    writeText(path,PUZZLES)
+    assert not isBinary(path)
+    assert list(readText(path))==PUZZLES
+    assert list(readPuzzles(path))==PUZZLES
+
+def test_text_file_skips_blank_lines_and_comments():
+    text=b"# header\n\n"+formatLine(PUZZLES[0]).encode()+b"\n   \n# end\n"
+    assert list(readText(io.BytesIO(text)))==[PUZZLES[0]]
+
+def test_text_file_bad_lines():
+    text=formatLine(PUZZLES[0]).encode()+b"\nnot a puzzle\n"+formatLine(PUZZLES[1]).encode()+b"\n"
+    with pytest.raises(ValueError,match="line 2"):
+        list(readText(io.BytesIO(text)))
+    assert list(readText(io.BytesIO(text),strict=False))==[PUZZLES[0],"not a puzzle",PUZZLES[1]]
+
+def test_binary_file_round_trip(tmp_path):
+    path=str(tmp_path/"puzzles.bin")
+    writeBinary(path,PUZZLES)
+    assert isBinary(path)
+    assert list(readBinary(path))==PUZZLES
+    assert list(readPuzzles(path))==PUZZLES
+
+def test_binary_file_random_access(tmp_path):
+    path=str(tmp_path/"puzzles.bin")
+    writeBinary(path,PUZZLES)
+    with BinaryPuzzleFile(path) as puzzles:
+        assert len(puzzles)==len(PUZZLES)
+        assert puzzles[3]==PUZZLES[3]
+        assert puzzles[-1]==PUZZLES[-1]
+        with pytest.raises(IndexError):
+            puzzles[len(PUZZLES)]
+
+def test_binary_file_rejects_bad_files(tmp_path):
+    path=tmp_path/"puzzles.bin"
+    path.write_bytes(b"nothing")
+    with pytest.raises(ValueError,match="Not a binary"):
+        BinaryPuzzleFile(str(path))
+    path.write_bytes(MAGIC+pack(PUZZLES[0])[:-1])
+    with pytest.raises(ValueError,match="Truncated"):
+        BinaryPuzzleFile(str(path))
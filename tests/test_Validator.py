@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+np=pytest.importorskip("numpy")
+
+from conftest import EXAMPLES
+from Sudoku import Sudoku
+from Validator import checkBoards,validateBoards,validateStream
+
+def patternSolution(n:int)->bytes:
+    """
+    Function that returns a solution of an n^2 x n^2 board built from a shifted pattern.
+    """
+    size=n*n
+    return bytes((n*(r%n)+r//n+c)%size+1 for r in range(size) for c in range(size))
+
+def corruptions(solution:bytes,rng:random.Random,count:int)->list[bytes]:
+    """
+    Function that returns wrong boards made from a solution: swapped cells, changed digits and empty cells.
+    """
+    size=round(len(solution)**0.5)
+    boards=[]
+    for m in range(count):
+        values=bytearray(solution)
+        k1,k2=rng.sample(range(len(values)),2)
+        if m%3==0:
+            #two cells of the same row
+            k2=k1//size*size+(k1+rng.randrange(1,size))%size
+            values[k1],values[k2]=values[k2],values[k1]
+        elif m%3==1:
+            values[k1]=(values[k1]+rng.randrange(1,size))%size+1
+        else:
+            values[k1]=0
+        boards.append(bytes(values))
+    return boards
+
+def boardsOf(solution:bytes,seed:int)->list[bytes]:
+    return [solution]+corruptions(solution,random.Random(seed),30)
+
+def checkSudoku(values:bytes)->bool:
+    return Sudoku.fromValues(values).checkSudoku()
+
+@pytest.mark.parametrize("name,solution",[(name,solution) for name,_,solution in EXAMPLES[::4]]+
+                                        [("pattern16",patternSolution(4)),("pattern25",patternSolution(5))])
+def test_check_boards_agrees_with_check_sudoku(name,solution):
+    boards=boardsOf(solution,len(solution))
+    assert checkBoards(boards).tolist()==[checkSudoku(values) for values in boards]
+
+def test_check_boards_accepts_arrays():
+    boards=boardsOf(EXAMPLES[0][2],0)
+    expected=checkBoards(boards)
+    stacked=np.frombuffer(b"".join(boards),dtype=np.uint8).reshape(-1,9,9)
+    assert checkBoards(stacked).tolist()==expected.tolist()
+    assert checkBoards(stacked.astype(np.int64),chunksize=7).tolist()==expected.tolist()
+
+def test_reports_name_the_wrong_units():
+    solution=EXAMPLES[0][2]
+    values=bytearray(solution)
+    #swap two cells of row 0 in different squares: cols 0 and 4 and squares 0 and 1 break
+    values[0],values[4]=values[4],values[0]
+    report=validateBoards([solution,bytes(values)])[1]
+    assert not report["valid"]
+    assert sorted((error["unit"],error["index"]) for error in report["errors"])==[("col",0),("col",4),("square",0),("square",1)]
+    col0=next(error for error in report["errors"] if (error["unit"],error["index"])==("col",0))
+    assert col0["missing"]==[solution[0]]
+    assert col0["duplicates"]==[solution[4]]
+    assert report["invalid_cells"]==[]
+
+def test_reports_empty_cells():
+    values=bytearray(EXAMPLES[0][2])
+    values[10]=0
+    report=validateBoards([bytes(values)])[0]
+    assert report["invalid_cells"]==[10]
+    assert {error["unit"] for error in report["errors"]}=={"row","col","square"}
+
+def test_stream_matches_the_batch():
+    boards=boardsOf(EXAMPLES[0][2],1)
+    reports=list(validateStream(iter(boards),chunksize=4,errors_only=True))
+    expected=validateBoards(boards,errors_only=True)
+    assert reports==expected
+    assert [report["index"] for report in reports]==[m for m,correct in enumerate(checkBoards(boards)) if not correct]